@@ -0,0 +1 @@
+# Cache module
\ No newline at end of file
@@ -0,0 +1,281 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from Core.Tree import Tree
+
+
+# À incrémenter à chaque changement de la méthode de pricing : les anciennes entrées deviennent inaccessibles
+ENGINE_VERSION = "trinomial-2"
+
+
+class PriceCache:
+    """
+    Cache persistant des résultats de pricing (prix, Greeks, convergence) dans une base SQLite locale.
+    Survit aux redémarrages du serveur et se partage entre processus : le journal WAL
+    autorise des lectures concurrentes pendant qu'un processus écrit.
+
+    Les clés sont dérivées des paramètres canoniques de la requête et de ENGINE_VERSION.
+    Les entrées les moins récemment utilisées sont évincées au-delà de max_bytes, et les plus
+    utilisées sont préchargées en mémoire au démarrage.
+    """
+
+    def __init__(self, path=None, max_bytes=64 * 1024 * 1024, preload=256, eviction_interval=32):
+        """
+        Args:
+            path (str): Fichier SQLite (par défaut PRICE_CACHE_PATH, sinon le répertoire temporaire).
+            max_bytes (int): Taille maximale des valeurs en cache.
+            preload (int): Nombre d'entrées les plus utilisées chargées en mémoire au démarrage.
+            eviction_interval (int): Nombre d'écritures entre deux contrôles de taille.
+        """
+        self.path = path or os.environ.get('PRICE_CACHE_PATH') or os.path.join(tempfile.gettempdir(), 'pricer_cache.sqlite')
+        self.max_bytes = max_bytes
+        self.memory_size = max(preload, 1)
+        self.eviction_interval = eviction_interval
+        self._local = threading.local()
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._pending_hits = {}
+        self.hits = 0
+        self.misses = 0
+
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, namespace TEXT NOT NULL, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "hits INTEGER NOT NULL DEFAULT 0, created REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+
+        if preload:
+            self.preload(preload)
+
+
+
+    def _connection(self):
+        """
+        Connexion propre au thread courant (une connexion SQLite ne se partage pas entre threads).
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+
+
+    @staticmethod
+    def make_key(namespace, params):
+        """
+        Construit la clé canonique : hachage des paramètres triés, de l'espace de noms et de ENGINE_VERSION.
+
+        Args:
+            namespace (str): Type de résultat ("greeks", "price", ...).
+            params (dict): Paramètres déterminant entièrement le résultat.
+
+        Returns:
+            str: Clé hexadécimale.
+        """
+        canonical = json.dumps({'engine': ENGINE_VERSION, 'namespace': namespace, 'params': params},
+                               sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+
+    @staticmethod
+    def pricing_params(market, option, N, **extra):
+        """
+        Paramètres canoniques d'un pricing par arbre (marché, option, N et options supplémentaires).
+        L'étape de détachement du dividende en fait partie : sans dates d'option, elle dépend
+        de la date du jour, et le résultat change d'un jour à l'autre à paramètres égaux.
+        """
+        return {
+            'S0': market.S0, 'rate': market.rate, 'sigma': market.sigma,
+            'dividend': market.dividend, 'ex_div_date': market.ex_div_date,
+            'dividend_step': Tree.compute_dividend_step(market, option, N),
+            'K': option.K, 'type': option.type, 'style': option.style,
+            'payoff_params': option.payoff_params, 'T': option.T, 'N': N,
+            **extra
+        }
+
+
+
+    def get(self, namespace, params):
+        """
+        Retourne la valeur en cache, ou None si absente.
+        """
+        key = self.make_key(namespace, params)
+        with self._lock:
+            payload = self._memory.get(key)
+            if payload is not None:
+                self._memory.move_to_end(key)
+
+        if payload is None:
+            row = self._connection().execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                with self._lock:
+                    self.misses += 1
+                return None
+            payload = row[0]
+
+        with self._lock:
+            self.hits += 1
+            self._remember(key, payload)
+            self._pending_hits[key] = self._pending_hits.get(key, 0) + 1
+            flush = len(self._pending_hits) >= self.eviction_interval
+        if flush:
+            self.flush_hits()
+        # Désérialisation à chaque lecture : l'appelant reçoit une copie indépendante
+        return json.loads(payload)
+
+
+
+    def put(self, namespace, params, value):
+        """
+        Enregistre une valeur sérialisable en JSON.
+        """
+        key = self.make_key(namespace, params)
+        payload = json.dumps(value)
+        now = time.time()
+        try:
+            with self._connection() as connection:
+                connection.execute(
+                    "INSERT INTO entries (key, namespace, value, size, hits, created, last_access) "
+                    "VALUES (?, ?, ?, ?, 0, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value, size = excluded.size, "
+                    "last_access = excluded.last_access",
+                    (key, namespace, payload, len(payload), now, now)
+                )
+        except sqlite3.OperationalError as e:
+            # Base verrouillée trop longtemps par un autre processus : le résultat n'est simplement pas persisté
+            print(f"Price cache write skipped: {e}")
+            return
+
+        with self._lock:
+            self._remember(key, payload)
+            self._writes += 1
+            check_size = self._writes % self.eviction_interval == 0
+        if check_size:
+            self.evict()
+
+
+
+    def get_or_compute(self, namespace, params, compute):
+        """
+        Retourne la valeur en cache ou la calcule avec compute() puis l'enregistre.
+        """
+        value = self.get(namespace, params)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.put(namespace, params, value)
+        return value
+
+
+
+    def evict(self):
+        """
+        Supprime les entrées les moins récemment utilisées jusqu'à revenir sous 90% de max_bytes.
+        """
+        self.flush_hits()
+        try:
+            with self._connection() as connection:
+                total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+                if total <= self.max_bytes:
+                    return
+                target = total - int(0.9 * self.max_bytes)
+                freed = 0
+                victims = []
+                for key, size in connection.execute("SELECT key, size FROM entries ORDER BY last_access"):
+                    victims.append((key,))
+                    freed += size
+                    if freed >= target:
+                        break
+                connection.executemany("DELETE FROM entries WHERE key = ?", victims)
+        except sqlite3.OperationalError as e:
+            print(f"Price cache eviction skipped: {e}")
+            return
+
+        with self._lock:
+            for (key,) in victims:
+                self._memory.pop(key, None)
+
+
+
+    def preload(self, limit):
+        """
+        Charge en mémoire les entrées les plus utilisées (warm start après un redémarrage).
+
+        Returns:
+            int: Nombre d'entrées préchargées.
+        """
+        rows = self._connection().execute(
+            "SELECT key, value FROM entries ORDER BY hits DESC, last_access DESC LIMIT ?", (limit,)
+        ).fetchall()
+        with self._lock:
+            # Ordre inverse : les plus utilisées sont les dernières évincées de la mémoire
+            for key, payload in reversed(rows):
+                self._remember(key, payload)
+        return len(rows)
+
+
+
+    def stats(self):
+        """
+        Retourne le nombre d'entrées, la taille occupée et les compteurs de hits/misses.
+        """
+        entries, size = self._connection().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        with self._lock:
+            return {
+                'entries': entries, 'bytes': size, 'max_bytes': self.max_bytes,
+                'memory_entries': len(self._memory), 'hits': self.hits, 'misses': self.misses,
+                'engine_version': ENGINE_VERSION, 'path': self.path
+            }
+
+
+
+    def clear(self):
+        """
+        Vide le cache (disque et mémoire).
+        """
+        with self._connection() as connection:
+            connection.execute("DELETE FROM entries")
+        with self._lock:
+            self._memory.clear()
+
+
+
+    def _remember(self, key, payload):
+        self._memory[key] = payload
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+
+
+    def flush_hits(self):
+        """
+        Reporte sur disque les compteurs d'utilisation accumulés en mémoire (utilisés par
+        l'éviction et le préchargement) ; ignoré si la base est occupée.
+        """
+        with self._lock:
+            pending, self._pending_hits = self._pending_hits, {}
+        if not pending:
+            return
+        now = time.time()
+        try:
+            with self._connection() as connection:
+                connection.executemany(
+                    "UPDATE entries SET hits = hits + ?, last_access = ? WHERE key = ?",
+                    [(count, now, key) for key, count in pending.items()]
+                )
+        except sqlite3.OperationalError:
+            pass
@@ -0,0 +1,88 @@
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Regroupement des requêtes identiques simultanées : le premier appelant calcule,
+    les doublons arrivés pendant le calcul attendent le même Future et reçoivent
+    le même résultat (ou la même exception).
+    """
+
+    def __init__(self):
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+
+
+    @staticmethod
+    def make_key(namespace, params):
+        """
+        Clé canonique d'une requête : hachage de ses paramètres triés.
+
+        Args:
+            namespace (str): Nom du point d'entrée ("calculate", "convergence", ...).
+            params (dict): Paramètres JSON de la requête.
+
+        Returns:
+            str: Clé hexadécimale.
+        """
+        canonical = json.dumps({'namespace': namespace, 'params': params},
+                               sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+
+    def do(self, key, compute):
+        """
+        Exécute compute() une seule fois pour toutes les demandes simultanées de même clé.
+
+        Args:
+            key (str): Clé canonique de la requête.
+            compute (callable): Calcul sans argument.
+
+        Returns:
+            tuple: (résultat, shared) où shared vaut True si le résultat vient d'un autre appelant.
+        """
+        with self._lock:
+            self.calls += 1
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            future.set_result(compute())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            # Les requêtes arrivant après la fin du calcul relancent un calcul (pas de mise en cache ici)
+            with self._lock:
+                del self._in_flight[key]
+        return future.result(), False
+
+
+
+    def stats(self):
+        """
+        Retourne les compteurs : appels, calculs effectués, requêtes regroupées et calculs en cours.
+        """
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'executions': self.executions,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._in_flight)
+            }
@@ -1,23 +1,67 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify
 import sys
 import os
 import time
+from API.cache.price_cache import PriceCache
+from API.cache.single_flight import SingleFlight
+from API.serialization.compression import ResponseCompressor
+from API.serialization.json_provider import dumps
+from API.visualization.tree_cache import TreeCache
 from API.visualization.tree_visualizer import TreeVisualizer
 from Core.BlackScholes import BlackScholes
-from Core.Greeks import Greeks
+from Core.Greeks import Greeks, SelectiveGreeks
 from Core.Option import Option
+from Core.Tree import Tree
 from datetime import datetime
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 api_bp = Blueprint('api', __name__)
 
+# Réseaux construits par /api/tree, relus par fenêtres via /api/tree/window
+tree_cache = TreeCache(ttl=300, max_bytes=256 * 1024 * 1024)
+
+# Prix et Greeks persistés sur disque, partagés entre processus et conservés aux redémarrages
+price_cache = PriceCache()
+
+# Compression gzip/brotli négociée des réponses volumineuses de l'API
+response_compressor = ResponseCompressor.from_env()
+api_bp.after_request(response_compressor.compress)
+
+# Plafond serveur des processus lancés par /api/portfolio (le corps de requête ne peut que le réduire)
+MAX_PORTFOLIO_WORKERS = int(os.environ.get('PORTFOLIO_MAX_WORKERS', os.cpu_count() or 1))
+
+# Regroupement des requêtes /api/calculate et /api/convergence identiques et simultanées
+single_flight = SingleFlight()
+
+# Moteurs de pricing sélectionnables par le paramètre "engine" de /api/calculate
+ANALYTIC_ENGINES = ['barone_adesi_whaley', 'bjerksund_stensland', 'control_variate']
+ENGINES = ['trinomial', 'leisen_reimer', 'local_vol'] + ANALYTIC_ENGINES
+
+
+def _request_params():
+    """Corps JSON de la requête s'il s'agit d'un objet, None s'il est absent ou malformé"""
+    params = request.get_json(silent=True)
+    return params if isinstance(params, dict) else None
+
+
+def _invalid_body():
+    return jsonify({'success': False, 'error': 'Corps de requête invalide : objet JSON attendu'}), 400
+
 
 @api_bp.route('/api/calculate', methods=['POST'])
 def api_calculate():
     """Calculate option with provided parameters"""
+    params = _request_params()
+    if params is None:
+        return _invalid_body()
+    # Les requêtes identiques simultanées partagent un seul calcul
+    (payload, status), _ = single_flight.do(SingleFlight.make_key('calculate', params), lambda: _calculate(params))
+    return jsonify(payload), status
+
+
+def _calculate(params):
+    """Pricing, Greeks and tree data of one option: (payload, HTTP status)"""
     try:
-        params = request.json
-        
         # Validation des paramètres requis
         required_params = ['S0', 'K', 'start_date', 'maturity_date', 'r', 'sigma', 'N']
         optional_params = ['option_type', 'option_style', 'dividend', 'threshold', 'ex_div_date']
@@ -25,10 +69,10 @@ def api_calculate():
         # Vérifier les paramètres requis
         for param in required_params:
             if param not in params:
-                return jsonify({
+                return {
                     'success': False,
                     'error': f'Paramètre manquant: {param}'
-                }), 400
+                }, 400
         
         # Paramètres optionnels avec valeurs par défaut
         option_type = params.get('option_type', 'call')
@@ -38,7 +82,7 @@ def api_calculate():
         ex_div_date = params.get('ex_div_date', None)
         
         # Validation des valeurs optionnelles
-        if option_type not in ['call', 'put']:
+        if option_type not in Option.PAYOFFS:
             option_type = 'call'
         if option_style not in ['european', 'american']:
             option_style = 'european'
@@ -49,7 +93,7 @@ def api_calculate():
             try:
                 ex_div_date_obj = datetime.strptime(ex_div_date, '%Y-%m-%d')
             except ValueError:
-                return jsonify({'success': False, 'error': 'Format de date ex-dividende invalide. Utilisez YYYY-MM-DD'}), 400
+                return {'success': False, 'error': 'Format de date ex-dividende invalide. Utilisez YYYY-MM-DD'}, 400
         
         # Create option with dates (T will be calculated automatically)
         try:
@@ -58,24 +102,36 @@ def api_calculate():
                 opt_type=option_type,
                 style=option_style,
                 start_date=params['start_date'],
-                maturity_date=params['maturity_date']
+                maturity_date=params['maturity_date'],
+                payoff_params=params.get('payoff_params')
             )
             T_calculated = option_obj.T
             
         except ValueError as e:
-            return jsonify({'success': False, 'error': str(e)}), 400
+            return {'success': False, 'error': str(e)}, 400
         
         # Validation des autres valeurs
         if params['r'] < 0:
-            return jsonify({'success': False, 'error': 'Le taux r doit être positif ou nul'}), 400
+            return {'success': False, 'error': 'Le taux r doit être positif ou nul'}, 400
         if params['sigma'] <= 0:
-            return jsonify({'success': False, 'error': 'La volatilité sigma doit être positive'}), 400
+            return {'success': False, 'error': 'La volatilité sigma doit être positive'}, 400
         if params['N'] <= 0:
-            return jsonify({'success': False, 'error': 'Le nombre d\'étapes N doit être positif'}), 400
+            return {'success': False, 'error': 'Le nombre d\'étapes N doit être positif'}, 400
         if params['S0'] <= 0:
-            return jsonify({'success': False, 'error': 'Spot price S0 must be positive'}), 400
+            return {'success': False, 'error': 'Spot price S0 must be positive'}, 400
         if params['K'] <= 0:
-            return jsonify({'success': False, 'error': 'Le strike K doit être positif'}), 400
+            return {'success': False, 'error': 'Le strike K doit être positif'}, 400
+        
+        # Moteur de pricing : trinomial (avec visualisation) ou moteur en prix seul (Leisen-Reimer, volatilité locale, analytique)
+        engine = params.get('engine', 'trinomial')
+        if engine not in ENGINES:
+            return {'success': False, 'error': f"Moteur inconnu : {engine} (parmi {', '.join(ENGINES)})"}, 400
+        if engine != 'trinomial':
+            return _calculate_with_engine(params, option_obj, dividend, ex_div_date_obj, engine)
+
+        # Budget de temps : pricing progressif (N croissants), sans données de visualisation
+        if params.get('deadline_ms') is not None:
+            return _calculate_with_deadline(params, option_obj, dividend, ex_div_date_obj, threshold)
         
         # Validation de la combinaison threshold/N pour avertir du pruning excessif
         warning_message = None
@@ -103,7 +159,8 @@ def api_calculate():
             option_style=option_style,
             dividend=dividend,
             threshold=threshold,
-            ex_div_date=ex_div_date_obj
+            ex_div_date=ex_div_date_obj,
+            payoff_params=params.get('payoff_params')
         )
         trinomial_end_time = time.time()
         trinomial_execution_time = trinomial_end_time - trinomial_start_time
@@ -126,12 +183,17 @@ def api_calculate():
                 K=params['K'],
                 opt_type=option_type,
                 style=option_style,
-                T=T_calculated
+                T=T_calculated,
+                payoff_params=params.get('payoff_params')
             )
             
             # Calculate Greeks with smaller steps for faster computation
-            greeks_calculator = Greeks(market, option, min(params['N'], 100))  # Limit N for Greeks
-            greeks_data = greeks_calculator.calculate_all_greeks()
+            greeks_N = min(params['N'], 100)  # Limit N for Greeks
+            greeks_calculator = Greeks(market, option, greeks_N)
+            greeks_data = price_cache.get_or_compute(
+                'greeks', PriceCache.pricing_params(market, option, greeks_N),
+                greeks_calculator.calculate_all_greeks
+            )
             print(f"Greeks calculated: {greeks_data}")
             
         except Exception as e:
@@ -158,6 +220,12 @@ def api_calculate():
             
             data['black_scholes_price'] = bs_price
             
+            # Approximations analytiques américaines affichées à côté du prix trinomial
+            if option_style == 'american' and option_type in ('call', 'put'):
+                data['american_approximations'] = {
+                    method: bs_model.american_price(option_type, method) for method in BlackScholes.AMERICAN_METHODS
+                }
+            
             # Ajouter les temps d'exécution
             data['execution_times'] = {
                 'trinomial_time': trinomial_execution_time,
@@ -188,91 +256,275 @@ def api_calculate():
             'T_days': round(T_calculated * 365)
         }
         
-        return jsonify({
+        return {
             'success': True,
             'data': data,
             'price': data["tree_params"]["final_price"],
             'greeks': greeks_data
-        })
+        }, 200
         
     except Exception as e:
-        return jsonify({
+        return {
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500
+
+
+def _calculate_with_engine(params, option, dividend, ex_div_date, engine):
+    """Price from a price-only engine (no tree data): (payload, HTTP status)"""
+    from Core.LeisenReimer import LeisenReimerTree
+    from Core.LocalVol import LocalVolSurface, LocalVolTree
+    from Core.Market import Market
+
+    market = Market(S0=params['S0'], rate=params['r'], sigma=params['sigma'],
+                    dividend=dividend, ex_div_date=ex_div_date)
+    if engine in ANALYTIC_ENGINES:
+        return _calculate_analytic(params, market, option, engine)
+
+    start_time = time.time()
+    try:
+        if engine == 'leisen_reimer':
+            pricer = LeisenReimerTree(market, option, params['N'])
+            extra = {}
+        else:
+            # Surface fournie par l'appelant : {"spots": [...], "times": [...], "vols": [[...], ...]}
+            grid = params.get('local_vol')
+            if not isinstance(grid, dict) or not all(key in grid for key in ('spots', 'times', 'vols')):
+                raise ValueError("Paramètre local_vol manquant : {spots, times, vols} requis")
+            pricer = LocalVolTree(market, option, params['N'],
+                                  LocalVolSurface(grid['spots'], grid['times'], grid['vols']))
+            extra = {'local_vol': grid}
+        price = price_cache.get_or_compute(
+            'price', PriceCache.pricing_params(market, option, pricer.N, engine=engine, **extra),
+            pricer.get_option_price
+        )
+    except ValueError as e:
+        return {'success': False, 'error': str(e)}, 400
+    execution_time = time.time() - start_time
+
+    data = {'engine': engine, 'price': price, 'N_used': pricer.N, 'execution_time': execution_time}
+    if option.type in ('call', 'put'):
+        data['black_scholes_price'] = BlackScholes(params['S0'], option.K, option.T, params['r'], params['sigma']).price(option.type)
+
+    return {
+        'success': True,
+        'data': data,
+        'price': price,
+        'N_used': pricer.N
+    }, 200
+
+
+def _calculate_analytic(params, market, option, engine):
+    """Closed-form American approximation, or tree price with the analytic European as control variate"""
+    from Core.RollingTree import RollingTree
+
+    if option.type not in ('call', 'put'):
+        return {'success': False, 'error': f"Le moteur {engine} ne traite que les calls et puts"}, 400
+    if market.dividend and market.ex_div_date is not None:
+        return {'success': False, 'error': f"Le moteur {engine} ne prend pas en compte le dividende discret"}, 400
+
+    start_time = time.time()
+    bs_model = BlackScholes(market.S0, option.K, option.T, market.rate, market.sigma)
+    european = bs_model.price(option.type)
+    data = {'engine': engine, 'black_scholes_price': european}
+
+    if engine == 'control_variate':
+        # Prix américain de l'arbre corrigé de l'erreur de l'arbre sur l'européenne (même géométrie)
+        tree = RollingTree(market, option, params['N'])
+        european_option = Option(K=option.K, opt_type=option.type, style='european',
+                                 T=option.T, payoff_params=option.payoff_params)
+        tree_price = tree.price_option(option)
+        tree_european = tree.price_option(european_option)
+        price = tree_price - tree_european + european
+        data.update({'tree_price': tree_price, 'tree_european_price': tree_european, 'N_used': params['N']})
+    elif option.style == 'american':
+        price = bs_model.american_price(option.type, engine)
+    else:
+        price = european
+
+    data['price'] = price
+    data['execution_time'] = time.time() - start_time
+    return {
+        'success': True,
+        'data': data,
+        'price': price
+    }, 200
+
+
+def _calculate_with_deadline(params, option, dividend, ex_div_date, threshold):
+    """Best price reachable within params['deadline_ms']: (payload, HTTP status)"""
+    from Core.Market import Market
+    from Core.Progressive import ProgressivePricer
+
+    market = Market(S0=params['S0'], rate=params['r'], sigma=params['sigma'],
+                    dividend=dividend, ex_div_date=ex_div_date)
+    try:
+        pricer = ProgressivePricer(market, option, params['N'], params['deadline_ms'],
+                                   threshold=threshold, extrapolate=params.get('extrapolate', False))
+        result = pricer.price()
+    except ValueError as e:
+        return {'success': False, 'error': str(e)}, 400
+
+    if option.type in ('call', 'put'):
+        result['black_scholes_price'] = BlackScholes(params['S0'], option.K, option.T, params['r'], params['sigma']).price(option.type)
+
+    return {
+        'success': True,
+        'data': result,
+        'price': result['price'],
+        'N_used': result['N_used'],
+        'error_estimate': result['error_estimate']
+    }, 200
 
 
 @api_bp.route('/api/tree', methods=['POST'])
 def api_tree():
-    """Get tree data only for visualization"""
+    """Build a tree, keep it server-side under a handle and return a first window"""
+    params = _request_params()
+    if params is None:
+        return _invalid_body()
+    payload, status = _tree(params)
+    return jsonify(payload), status
+
+
+@api_bp.route('/api/tree/stream', methods=['POST'])
+def api_tree_stream():
+    """Same as /api/tree, streamed as server-sent events: build and backpropagation progress, then the result"""
+    params = _request_params()
+    if params is None:
+        return _invalid_body()
+    return _event_stream(lambda progress: _tree(params, progress))
+
+
+def _tree(params, progress_callback=None):
+    """Build, cache and window a lattice: (payload, HTTP status)"""
     try:
-        params = request.json
-        
-        # Validation des paramètres requis
-        required_params = ['S0', 'K', 'start_date', 'maturity_date', 'r', 'sigma', 'N']
-        
-        for param in required_params:
-            if param not in params:
-                return jsonify({
-                    'success': False,
-                    'error': f'Paramètre manquant: {param}'
-                }), 400
-        
-        # Création de l'option pour obtenir T
         try:
-            option_obj = Option(
-                K=params['K'],
-                start_date=params['start_date'],
-                maturity_date=params['maturity_date']
-            )
-            T_calculated = option_obj.T
+            market, option = _build_market_and_option(params)
         except ValueError as e:
-            return jsonify({'success': False, 'error': str(e)}), 400
-                
+            return {'success': False, 'error': str(e)}, 400
+
+        from Core.Lattice import Lattice
+
+        threshold = params.get('threshold', 0.0)
+        warning_message = None
+        try:
+            lattice = Lattice(market, option, params['N'], threshold=threshold, progress_callback=progress_callback)
+        except ValueError:
+            # Pruning trop agressif : fallback sans pruning, comme le visualiseur
+            lattice = Lattice(market, option, params['N'], threshold=0.0, progress_callback=progress_callback)
+            warning_message = f"Pruning avec threshold={threshold:.1%} trop agressif, utilisé threshold=0.0%"
+        trinomial_price = lattice.build()
+
+        try:
+            tree_handle = tree_cache.put(lattice)
+        except ValueError as e:
+            return {'success': False, 'error': str(e)}, 400
+
+        # Première fenêtre : les premières étapes seulement
+        window_steps = params.get('window_steps', 20)
+        data = TreeVisualizer().create_window_data(lattice, step_start=0, step_end=window_steps)
+
+        try:
+            black_scholes_price = BlackScholes(market.S0, option.K, option.T, market.rate, market.sigma).price(option.type)
         except Exception as e:
             print(f"Erreur Black-Scholes: {e}")
-            data['black_scholes_price'] = None
-        
-        trinomial_price = data["tree_params"]["final_price"]
-        
-        # Informations sur l'option
+            black_scholes_price = None
+
         data['option_info'] = {
-            'type': option_type,
-            'style': option_style
+            'type': option.type,
+            'style': option.style
         }
-        
-        # Tree information
+
+        # Informations de l'arbre (nœuds et liens de la première fenêtre)
         data['tree_info'] = {
             'node_count': len(data['nodes']),
             'edge_count': len(data['edges']),
             'steps': params['N']
         }
-        
-        return jsonify({
+
+        return {
             'success': True,
+            'tree_handle': tree_handle,
+            'ttl': tree_cache.ttl,
             'data': data,
             'trinomial_price': trinomial_price,
-            'black_scholes_price': data.get('black_scholes_price'),
-            'difference': trinomial_price - data.get('black_scholes_price', 0) if data.get('black_scholes_price') else None,
+            'black_scholes_price': black_scholes_price,
+            'difference': trinomial_price - black_scholes_price if black_scholes_price is not None else None,
             'warning': warning_message
+        }, 200
+
+    except Exception as e:
+        print(f"Error in api_tree: {e}")
+        import traceback
+        traceback.print_exc()
+        return {
+            'success': False,
+            'error': f'Calculation error: {str(e)}'
+        }, 500
+
+
+@api_bp.route('/api/tree/window', methods=['POST'])
+def api_tree_window():
+    """Return a step range and/or spot window of a tree cached by /api/tree"""
+    try:
+        params = _request_params()
+        if params is None:
+            return _invalid_body()
+
+        lattice = tree_cache.get(params.get('tree_handle'))
+        if lattice is None:
+            return jsonify({
+                'success': False,
+                'error': 'Arbre inconnu ou expiré, relancer /api/tree'
+            }), 404
+
+        data = TreeVisualizer().create_window_data(
+            lattice,
+            step_start=params.get('step_start', 0),
+            step_end=params.get('step_end'),
+            spot_min=params.get('spot_min'),
+            spot_max=params.get('spot_max')
+        )
+
+        return jsonify({
+            'success': True,
+            'data': data
         })
-        
+
     except Exception as e:
-        print(f"Error in api_calculate: {e}")
+        print(f"Error in api_tree_window: {e}")
         import traceback
         traceback.print_exc()
         return jsonify({
             'success': False,
-            'error': f'Calculation error: {str(e)}'
+            'error': f'Tree window error: {str(e)}'
         }), 500
 
 
 @api_bp.route('/api/convergence', methods=['POST'])
 def api_convergence():
     """Generate convergence analysis data"""
+    params = _request_params()
+    if params is None:
+        return _invalid_body()
+    # Les requêtes identiques simultanées partagent un seul calcul
+    (payload, status), _ = single_flight.do(SingleFlight.make_key('convergence', params), lambda: _convergence(params))
+    return jsonify(payload), status
+
+
+@api_bp.route('/api/convergence/stream', methods=['POST'])
+def api_convergence_stream():
+    """Same as /api/convergence, streamed as server-sent events: one progress event per N, then the result"""
+    params = _request_params()
+    if params is None:
+        return _invalid_body()
+    return _event_stream(lambda progress: _convergence(params, progress))
+
+
+def _convergence(params, progress_callback=None):
+    """Convergence of the tree price with N: (payload, HTTP status)"""
     try:
-        params = request.json
-        
         # Utiliser toujours la même progression jusqu'à 500
         steps = [5, 10, 15, 20, 25, 30, 40, 50, 75, 100, 150, 200, 300, 500]
         
@@ -280,12 +532,14 @@ def api_convergence():
         
         # Import nécessaire
         from Core.Market import Market
-        from Core.Tree import Tree
+        from Core.RollingTree import RollingTree
+        from Core.LeisenReimer import LeisenReimerTree
         from Core.Option import Option
         from Core.Greeks import Greeks
         import time
         
         results = []
+        convergence_start = time.time()
         
         for N in steps:
             try:
@@ -302,38 +556,391 @@ def api_convergence():
                     opt_type=params.get('option_type', 'call'),
                     style=params.get('option_style', 'european'),
                     start_date=params['start_date'],
-                    maturity_date=params['maturity_date']
+                    maturity_date=params['maturity_date'],
+                    payoff_params=params.get('payoff_params')
                 )
                 
-                tree = Tree(market, option, N)
+                # Seul le prix à la racine est utile : mode prix seul en mémoire O(N)
+                trinomial_price = price_cache.get_or_compute(
+                    'price', PriceCache.pricing_params(market, option, N),
+                    lambda: RollingTree(market, option, N).get_option_price()
+                )
                 
-                # Calculer le prix trinomial
-                trinomial_price = tree.get_option_price()
+                # Binomial de Leisen-Reimer au même N (arrondi à l'impair), pour comparaison
+                binomial = LeisenReimerTree(market, option, N)
+                leisen_reimer_price = price_cache.get_or_compute(
+                    'price', PriceCache.pricing_params(market, option, binomial.N, engine='leisen_reimer'),
+                    binomial.get_option_price
+                )
                 
                 # Calculer Black-Scholes pour comparaison
                 bs = BlackScholes(market.S0, option.K, option.T, market.rate, market.sigma)
-                blackscholes_price = bs.call_price() if option.type == 'call' else bs.put_price()
+                blackscholes_price = bs.price(option.type) if option.type in ('call', 'put') else None
                 
                 results.append({
                     'N': N,
                     'trinomial_price': trinomial_price,
+                    'leisen_reimer_price': leisen_reimer_price,
                     'blackscholes_price': blackscholes_price
                 })
+
+                if progress_callback is not None:
+                    progress_callback({'phase': 'convergence', 'step': len(results), 'total_steps': len(steps),
+                                       'N': N, 'trinomial_price': trinomial_price,
+                                       'elapsed': time.time() - convergence_start})
                 
             except Exception as e:
                 print(f"Error for N={N}: {e}")
                 continue
         
-        return jsonify({
+        return {
             'success': True,
             'data': results
-        })
+        }, 200
         
     except Exception as e:
         print(f"Error in api_convergence: {e}")
         import traceback
         traceback.print_exc()
-        return jsonify({
+        return {
             'success': False,
             'error': f'Convergence calculation error: {str(e)}'
+        }, 500
+
+
+class _StreamCancelled(BaseException):
+    """
+    Levée par le callback de progression quand le client du flux s'est déconnecté.
+    Hérite de BaseException (comme GeneratorExit) pour traverser les except Exception des calculs.
+    """
+
+
+def _event_stream(compute, min_interval=0.05):
+    """
+    Exécute compute(progress_callback) dans un thread et diffuse sa progression en
+    server-sent events : des événements "progress" (au plus un toutes les min_interval
+    secondes, plus le dernier de chaque phase), puis un événement "result" portant
+    le même contenu que la réponse JSON de l'endpoint non diffusé. Si le client se
+    déconnecte, le calcul est interrompu au prochain appel du callback de progression.
+    """
+    import queue
+    import threading
+
+    events = queue.Queue()
+    last_sent = {'time': 0.0}
+    cancelled = threading.Event()
+
+    def progress(event):
+        if cancelled.is_set():
+            raise _StreamCancelled()
+        now = time.time()
+        if event['step'] == event['total_steps'] or now - last_sent['time'] >= min_interval:
+            last_sent['time'] = now
+            events.put(('progress', event))
+
+    def run():
+        try:
+            payload, status = compute(progress)
+            events.put(('result', {**payload, 'status': status}))
+        except _StreamCancelled:
+            return
+        except Exception as e:
+            events.put(('result', {'success': False, 'error': str(e), 'status': 500}))
+
+    def generate():
+        threading.Thread(target=run, daemon=True).start()
+        try:
+            while True:
+                name, data = events.get()
+                yield f"event: {name}\ndata: {dumps(data).decode('utf-8')}\n\n"
+                if name == 'result':
+                    return
+        except GeneratorExit:
+            # Client déconnecté : arrêter le calcul en cours
+            cancelled.set()
+            raise
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+def _build_market_and_option(params, default_style='european'):
+    """
+    Construit les objets Market et Option à partir des paramètres JSON d'une requête.
+
+    Raises:
+        ValueError: Si un paramètre requis manque ou est invalide.
+    """
+    from Core.Market import Market
+
+    required_params = ['S0', 'K', 'start_date', 'maturity_date', 'r', 'sigma', 'N']
+    for param in required_params:
+        if param not in params:
+            raise ValueError(f'Paramètre manquant: {param}')
+
+    if params['r'] < 0:
+        raise ValueError('Le taux r doit être positif ou nul')
+    if params['sigma'] <= 0:
+        raise ValueError('La volatilité sigma doit être positive')
+    if params['N'] <= 0:
+        raise ValueError('Le nombre d\'étapes N doit être positif')
+    if params['S0'] <= 0:
+        raise ValueError('Spot price S0 must be positive')
+    if params['K'] <= 0:
+        raise ValueError('Le strike K doit être positif')
+
+    option_type = params.get('option_type', 'call')
+    option_style = params.get('option_style', default_style)
+    if option_type not in Option.PAYOFFS:
+        option_type = 'call'
+    if option_style not in ['european', 'american']:
+        option_style = default_style
+
+    ex_div_date_obj = None
+    if params.get('ex_div_date'):
+        try:
+            ex_div_date_obj = datetime.strptime(params['ex_div_date'], '%Y-%m-%d')
+        except ValueError:
+            raise ValueError('Format de date ex-dividende invalide. Utilisez YYYY-MM-DD')
+
+    market = Market(
+        S0=params['S0'],
+        rate=params['r'],
+        sigma=params['sigma'],
+        dividend=params.get('dividend', 0.0),
+        ex_div_date=ex_div_date_obj
+    )
+    option = Option(
+        K=params['K'],
+        opt_type=option_type,
+        style=option_style,
+        start_date=params['start_date'],
+        maturity_date=params['maturity_date'],
+        payoff_params=params.get('payoff_params')
+    )
+    return market, option
+
+
+@api_bp.route('/api/exercise_boundary', methods=['POST'])
+def api_exercise_boundary():
+    """Early-exercise boundary of an American option (cached per market, strike, T, N)"""
+    try:
+        params = _request_params()
+        if params is None:
+            return _invalid_body()
+
+        try:
+            market, option = _build_market_and_option(params, default_style='american')
+            if option.style != 'american':
+                raise ValueError('La frontière d\'exercice n\'existe que pour une option américaine')
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        from Core.ExerciseBoundary import ExerciseBoundary
+
+        start_time = time.time()
+        boundary = ExerciseBoundary(market, option, params['N'])
+        execution_time = time.time() - start_time
+
+        return jsonify({
+            'success': True,
+            'price': boundary.price,
+            'boundary': boundary.get_boundary(),
+            'cached': boundary.cached,
+            'execution_time': execution_time
+        })
+
+    except Exception as e:
+        print(f"Error in api_exercise_boundary: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': f'Exercise boundary calculation error: {str(e)}'
         }), 500
+
+
+@api_bp.route('/api/greeks', methods=['POST'])
+def api_greeks():
+    """Selected Greeks of one option, each with its own method (lattice, bump or analytic)"""
+    try:
+        params = _request_params()
+        if params is None:
+            return _invalid_body()
+
+        try:
+            market, option = _build_market_and_option(params)
+            greeks = params.get('greeks', SelectiveGreeks.GREEK_NAMES)
+            if isinstance(greeks, str):
+                greeks = [greeks]
+            calculator = SelectiveGreeks(market, option, params['N'], threshold=params.get('threshold', 0.0))
+            start_time = time.time()
+            result = calculator.compute(greeks, params.get('methods', 'lattice'), params.get('bumps'))
+            execution_time = time.time() - start_time
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        return jsonify({
+            'success': True,
+            'price': result['price'],
+            'base_time_ms': result['base_time_ms'],
+            'greeks': result['greeks'],
+            'execution_time': execution_time
+        })
+
+    except Exception as e:
+        print(f"Error in api_greeks: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': f'Greeks calculation error: {str(e)}'
+        }), 500
+
+
+@api_bp.route('/api/portfolio', methods=['POST'])
+def api_portfolio():
+    """Aggregated and per-position price and Greeks of a portfolio of options"""
+    try:
+        params = _request_params()
+        if params is None:
+            return _invalid_body()
+        positions_params = params.get('positions')
+        if not positions_params:
+            return jsonify({'success': False, 'error': 'Paramètre manquant: positions'}), 400
+
+        from Core.Portfolio import Portfolio, Position
+
+        # Les paramètres de premier niveau servent de valeurs par défaut (sous-jacent commun)
+        defaults = {key: value for key, value in params.items() if key not in ('positions', 'max_workers')}
+
+        # Nombre de processus demandé borné côté serveur au nombre de CPU
+        max_workers = params.get('max_workers')
+        if max_workers is not None:
+            try:
+                max_workers = int(max_workers)
+            except (TypeError, ValueError):
+                return jsonify({'success': False, 'error': 'max_workers doit être un entier'}), 400
+            if max_workers < 1:
+                return jsonify({'success': False, 'error': 'max_workers doit être supérieur ou égal à 1'}), 400
+            max_workers = min(max_workers, MAX_PORTFOLIO_WORKERS)
+
+        portfolio = Portfolio(max_workers=max_workers)
+        for index, position_params in enumerate(positions_params):
+            merged = {**defaults, **position_params}
+            try:
+                market, option = _build_market_and_option(merged)
+            except ValueError as e:
+                return jsonify({'success': False, 'error': f'Position {index}: {e}'}), 400
+            portfolio.add_position(Position(
+                quantity=merged.get('quantity', 1.0),
+                market=market,
+                option=option,
+                N=merged['N'],
+                position_id=merged.get('id', index)
+            ))
+
+        start_time = time.time()
+        risk = portfolio.compute_risk()
+        execution_time = time.time() - start_time
+
+        return jsonify({
+            'success': True,
+            'data': risk,
+            'execution_time': execution_time
+        })
+
+    except Exception as e:
+        print(f"Error in api_portfolio: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': f'Portfolio calculation error: {str(e)}'
+        }), 500
+
+
+@api_bp.route('/api/scenarios', methods=['POST'])
+def api_scenarios():
+    """Spot x volatility P&L grid for one option or a portfolio"""
+    try:
+        params = _request_params()
+        if params is None:
+            return _invalid_body()
+
+        for param in ['spot_shifts', 'vol_shifts']:
+            if not params.get(param):
+                return jsonify({'success': False, 'error': f'Paramètre manquant: {param}'}), 400
+
+        from Core.Portfolio import Position
+        from Core.Scenarios import ScenarioGrid
+
+        # Sans liste de positions, les paramètres de premier niveau décrivent une option unique
+        defaults = {key: value for key, value in params.items()
+                    if key not in ('positions', 'spot_shifts', 'vol_shifts', 'rate_shift', 'time_shift', 'model')}
+        positions = []
+        for index, position_params in enumerate(params.get('positions') or [{}]):
+            merged = {**defaults, **position_params}
+            try:
+                market, option = _build_market_and_option(merged)
+            except ValueError as e:
+                return jsonify({'success': False, 'error': f'Position {index}: {e}'}), 400
+            positions.append(Position(merged.get('quantity', 1.0), market, option, merged['N'], merged.get('id', index)))
+
+        start_time = time.time()
+        try:
+            grid = ScenarioGrid(
+                positions,
+                spot_shifts=params['spot_shifts'],
+                vol_shifts=params['vol_shifts'],
+                rate_shift=params.get('rate_shift', 0.0),
+                time_shift=params.get('time_shift', 0.0),
+                model=params.get('model', 'auto')
+            )
+            data = grid.compute()
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        data['execution_time'] = time.time() - start_time
+
+        return jsonify({
+            'success': True,
+            'data': data
+        })
+
+    except Exception as e:
+        print(f"Error in api_scenarios: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': f'Scenario calculation error: {str(e)}'
+        }), 500
+
+
+@api_bp.route('/api/cache/stats', methods=['GET'])
+def api_cache_stats():
+    """Occupancy and hit counters of the server-side caches"""
+    return jsonify({
+        'success': True,
+        'data': {
+            'price_cache': price_cache.stats(),
+            'tree_cache': tree_cache.stats(),
+            'geometry_cache': Tree.geometry_cache.stats()
+        }
+    })
+
+
+@api_bp.route('/api/metrics', methods=['GET'])
+def api_metrics():
+    """Request coalescing counters and cache statistics"""
+    return jsonify({
+        'success': True,
+        'data': {
+            'coalescing': single_flight.stats(),
+            'price_cache': price_cache.stats(),
+            'tree_cache': tree_cache.stats(),
+            'geometry_cache': Tree.geometry_cache.stats(),
+            'serialization': current_app.json.stats() if hasattr(current_app.json, 'stats') else None,
+            'compression': response_compressor.stats()
+        }
+    })
@@ -0,0 +1 @@
+# Serialization module
\ No newline at end of file
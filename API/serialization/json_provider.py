@@ -0,0 +1,147 @@
+"""
+Encodage JSON des réponses de l'API.
+
+orjson est utilisé s'il est installé (pip install orjson), la bibliothèque standard
+sinon. Dans les deux cas les flottants non finis (inf/nan, ex: d1 et d2 de
+BlackScholes à l'échéance) sont écrits null, pour produire un JSON valide, et les
+flottants peuvent être arrondis à un nombre de décimales fixé : variable
+d'environnement API_JSON_DECIMALS, ou paramètre de requête ?precision=.
+"""
+import json
+import math
+import os
+import threading
+import time
+import numpy as np
+from flask import has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+MAX_DECIMALS = 17
+
+
+
+def prepare(value, decimals=None):
+    """
+    Convertit récursivement une valeur en types JSON natifs : tableaux et scalaires NumPy
+    en listes et nombres Python, flottants non finis en None, flottants arrondis à
+    decimals décimales si demandé.
+    """
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            return None
+        return value if decimals is None else round(value, decimals)
+    if isinstance(value, dict):
+        return {key: prepare(item, decimals) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [prepare(item, decimals) for item in value]
+    if isinstance(value, (np.ndarray, np.generic)):
+        return prepare(value.tolist(), decimals)
+    return value
+
+
+
+def _default(value):
+    # Tableaux NumPy non contigus (refusés par orjson), puis types gérés par Flask (dates, Decimal, ...)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return DefaultJSONProvider.default(value)
+
+
+
+def dumps(value, decimals=None):
+    """
+    Sérialise une valeur en JSON compact.
+
+    Returns:
+        bytes: Document JSON encodé en UTF-8.
+    """
+    if ORJSON_AVAILABLE:
+        # orjson écrit déjà null pour inf/nan et sérialise les tableaux NumPy ; dates au format de Flask
+        if decimals is not None:
+            value = prepare(value, decimals)
+        return orjson.dumps(value, default=_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(prepare(value, decimals), separators=(',', ':'), allow_nan=False,
+                      default=_default).encode('utf-8')
+
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Fournisseur JSON de l'application (utilisé par jsonify) : encodage par dumps() et
+    durée de sérialisation de chaque réponse, publiée dans l'en-tête Server-Timing et
+    cumulée dans stats().
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        env_decimals = os.environ.get('API_JSON_DECIMALS')
+        self.decimals = int(env_decimals) if env_decimals else None
+        self._lock = threading.Lock()
+        self.responses = 0
+        self.total_bytes = 0
+        self.total_time = 0.0
+
+
+
+    def request_decimals(self):
+        """
+        Nombre de décimales de la réponse en cours : paramètre ?precision= (entier de 0 à 17),
+        sinon la valeur par défaut de l'application.
+        """
+        precision = request.args.get('precision') if has_request_context() else None
+        if precision is not None and precision.isdigit():
+            return min(int(precision), MAX_DECIMALS)
+        return self.decimals
+
+
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(prepare(obj), **kwargs)
+        return dumps(obj).decode('utf-8')
+
+
+
+    def loads(self, s, **kwargs):
+        if ORJSON_AVAILABLE and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        start = time.perf_counter()
+        body = dumps(obj, self.request_decimals())
+        elapsed = time.perf_counter() - start
+
+        response = self._app.response_class(body, mimetype=self.mimetype)
+        response.headers['Server-Timing'] = f'serialize;dur={elapsed * 1000:.3f}'
+        with self._lock:
+            self.responses += 1
+            self.total_bytes += len(body)
+            self.total_time += elapsed
+        return response
+
+
+
+    def stats(self):
+        """
+        Retourne l'encodeur utilisé et les compteurs de sérialisation.
+        """
+        with self._lock:
+            return {
+                'encoder': 'orjson' if ORJSON_AVAILABLE else 'json',
+                'decimals': self.decimals,
+                'responses': self.responses,
+                'bytes': self.total_bytes,
+                'mean_time_ms': self.total_time * 1000 / self.responses if self.responses else 0.0
+            }
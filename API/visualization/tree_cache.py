@@ -0,0 +1,81 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+class TreeCache:
+    """
+    Cache serveur des réseaux récemment construits, accessibles par un identifiant (handle).
+    Les entrées expirent après ttl secondes et les plus anciennes sont évincées
+    dès que la mémoire totale dépasse max_bytes.
+    """
+
+    def __init__(self, ttl=300, max_bytes=256 * 1024 * 1024):
+        """
+        Args:
+            ttl (float): Durée de vie d'une entrée en secondes (prolongée à chaque accès).
+            max_bytes (int): Mémoire maximale occupée par les réseaux en cache.
+        """
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+
+
+    def put(self, lattice):
+        """
+        Met un réseau en cache et retourne son identifiant.
+        """
+        size = lattice.nbytes()
+        if size > self.max_bytes:
+            raise ValueError("Réseau trop volumineux pour le cache serveur")
+
+        handle = uuid.uuid4().hex
+        with self._lock:
+            self._purge_expired()
+            self._entries[handle] = {'lattice': lattice, 'size': size, 'last_access': time.time()}
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes:
+                self._evict(next(iter(self._entries)))
+        return handle
+
+
+
+    def get(self, handle):
+        """
+        Retourne le réseau associé à l'identifiant, ou None s'il a expiré ou été évincé.
+        """
+        with self._lock:
+            self._purge_expired()
+            entry = self._entries.get(handle)
+            if entry is None:
+                return None
+            entry['last_access'] = time.time()
+            self._entries.move_to_end(handle)
+            return entry['lattice']
+
+
+
+    def stats(self):
+        """
+        Retourne le nombre d'entrées et la mémoire occupée.
+        """
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._total_bytes, 'max_bytes': self.max_bytes}
+
+
+
+    def _purge_expired(self):
+        now = time.time()
+        expired = [handle for handle, entry in self._entries.items() if now - entry['last_access'] > self.ttl]
+        for handle in expired:
+            self._evict(handle)
+
+
+
+    def _evict(self, handle):
+        entry = self._entries.pop(handle)
+        self._total_bytes -= entry['size']
@@ -1,5 +1,6 @@
 import sys
 import os
+import numpy as np
 from Core.Market import Market
 from Core.Option import Option
 from Core.Tree import Tree
@@ -12,17 +13,16 @@ class TreeVisualizer:
     def __init__(self):
         pass
     
-    def create_tree_data(self, S0, K, T, r, sigma, N, option_type='call', option_style='european', dividend=0.0, threshold=0.0, ex_div_date=None):
+    def create_tree_data(self, S0, K, T, r, sigma, N, option_type='call', option_style='european', dividend=0.0, threshold=0.0, ex_div_date=None, payoff_params=None):
         print(f"Creation arbre: S0={S0}, K={K}, T={T}, r={r}, sigma={sigma}, N={N}, dividend={dividend}, threshold={threshold}, ex_div_date={ex_div_date}")
         
         market = Market(S0=S0, rate=r, sigma=sigma, dividend=dividend, ex_div_date=ex_div_date)
         
-        if option_type.lower() == 'call':
-            option = Option(T=T, K=K, opt_type='call', style=option_style)
-        else:
-            option = Option(T=T, K=K, opt_type='put', style=option_style)
+        if option_type.lower() not in Option.PAYOFFS:
+            option_type = 'put'
+        option = Option(T=T, K=K, opt_type=option_type.lower(), style=option_style, payoff_params=payoff_params)
         
-        tree = Tree(market=market, option=option, N=N, threshold=threshold)
+        tree = Tree(market=market, option=option, N=N, threshold=threshold, use_geometry_cache=False)
         original_threshold = threshold  # Garder le threshold original pour les statistiques
         fallback_used = False
         warning_message = None
@@ -34,7 +34,7 @@ class TreeVisualizer:
                 print(f"⚠️ AVERTISSEMENT: Pruning trop agressif avec threshold={threshold}, tentative de fallback avec threshold réduit")
                 # Fallback: réduire le threshold automatiquement
                 fallback_threshold = max(0.0, threshold * 0.5)
-                tree_fallback = Tree(market=market, option=option, N=N, threshold=fallback_threshold)
+                tree_fallback = Tree(market=market, option=option, N=N, threshold=fallback_threshold, use_geometry_cache=False)
                 option_price = tree_fallback.get_option_price()
                 tree = tree_fallback  # Utiliser l'arbre de fallback
                 fallback_used = True
@@ -45,7 +45,7 @@ class TreeVisualizer:
             if "'NoneType' object has no attribute 'tree'" in str(e):
                 print(f"⚠️ AVERTISSEMENT: Pruning avec threshold={threshold} a échoué, utilisation du fallback sans pruning")
                 # Fallback: arbre sans pruning
-                tree_fallback = Tree(market=market, option=option, N=N, threshold=0.0)
+                tree_fallback = Tree(market=market, option=option, N=N, threshold=0.0, use_geometry_cache=False)
                 option_price = tree_fallback.get_option_price()
                 tree = tree_fallback  # Utiliser l'arbre de fallback
                 fallback_used = True
@@ -56,7 +56,7 @@ class TreeVisualizer:
         except Exception as e:
             print(f"⚠️ ERREUR: {str(e)}, tentative de fallback sans pruning")
             # Fallback: arbre sans pruning
-            tree_fallback = Tree(market=market, option=option, N=N, threshold=0.0)
+            tree_fallback = Tree(market=market, option=option, N=N, threshold=0.0, use_geometry_cache=False)
             option_price = tree_fallback.get_option_price()
             tree = tree_fallback  # Utiliser l'arbre de fallback
             fallback_used = True
@@ -159,3 +159,90 @@ class TreeVisualizer:
             result['nodes_ignored_by_original_threshold'] = nodes_ignored_by_original_threshold
         
         return result
+
+
+    def create_window_data(self, lattice, step_start=0, step_end=None, spot_min=None, spot_max=None):
+        """
+        Extrait une fenêtre (plage d'étapes et/ou de spots) d'un réseau Lattice déjà construit,
+        au même format que create_tree_data (nodes, edges, tree_params), avec des statistiques de synthèse.
+        """
+        N = lattice.N
+        step_start = max(0, int(step_start))
+        step_end = N if step_end is None else min(N, int(step_end))
+        low = float('-inf') if spot_min is None else spot_min
+        high = float('inf') if spot_max is None else spot_max
+
+        nodes_data = []
+        edges_data = []
+        window_values = []
+
+        for step in range(step_start, step_end + 1):
+            values = lattice.values[step]
+            selected = lattice.exists[step] & (values >= low) & (values <= high)
+            is_final_step = (step == N)
+
+            for k in np.flatnonzero(selected):
+                j = int(k) - step
+                node_id = f"node_{step}_{j}"
+                value = float(values[k])
+                option_value = float(lattice.option_values[step][k])
+                window_values.append(value)
+
+                nodes_data.append({
+                    'id': node_id,
+                    'step': step,
+                    'value': value,
+                    'option_value': option_value,
+                    'payoff': option_value if is_final_step else lattice.option.payoff(value),
+                    'cum_prob': float(lattice.cum_prob[step][k]),
+                    'prob_up': float(lattice.prob_up[step][k]),
+                    'prob_mid': float(lattice.prob_mid[step][k]),
+                    'prob_down': float(lattice.prob_down[step][k])
+                })
+
+                # Liens vers l'étape suivante, seulement si la cible est dans la fenêtre
+                if step < step_end and lattice.expanded[step][k]:
+                    next_values = lattice.values[step + 1]
+                    for offset, direction, probabilities in ((2, 'up', lattice.prob_up),
+                                                             (1, 'middle', lattice.prob_mid),
+                                                             (0, 'down', lattice.prob_down)):
+                        target = k + offset
+                        if low <= next_values[target] <= high:
+                            edges_data.append({
+                                'source': node_id,
+                                'target': f"node_{step + 1}_{int(target) - step - 1}",
+                                'direction': direction,
+                                'probability': float(probabilities[step][k])
+                            })
+
+        summary = {
+            'N': N,
+            'final_price': lattice.price,
+            'total_node_count': lattice.get_node_count(),
+            'window_node_count': len(nodes_data),
+            'window_edge_count': len(edges_data),
+            'step_start': step_start,
+            'step_end': step_end,
+            'spot_min': min(window_values) if window_values else None,
+            'spot_max': max(window_values) if window_values else None
+        }
+
+        market, option = lattice.market, lattice.option
+        tree_params = {
+            'S0': market.S0,
+            'K': option.K,
+            'T': option.T,
+            'r': market.rate,
+            'sigma': market.sigma,
+            'N': N,
+            'final_price': lattice.price,
+            'option_type': option.type,
+            'option_style': option.style
+        }
+
+        return {
+            'nodes': nodes_data,
+            'edges': edges_data,
+            'tree_params': tree_params,
+            'summary': summary
+        }
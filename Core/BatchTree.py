@@ -0,0 +1,170 @@
+import numpy as np
+from Core import Kernels
+
+
+class BatchTree:
+    """
+    Arbres trinomiaux de M contrats empilés et évalués en parallèle : chaque étape est
+    un tableau de forme (M, 2 * step + 1), une ligne par contrat avec ses propres S0,
+    K, T, r et sigma, et un même nombre d'étapes N. Mêmes géométrie et probabilités que
+    RollingTree (sans dividende discret ni pruning), payoffs call et put.
+
+    Backend "numpy" : couches 2-D vectorisées. Backend "numba" : noyau compilé, lignes
+    réparties sur les cœurs disponibles.
+    """
+
+    def __init__(self, S0, K, T, r, sigma, is_call, american, N, backend=None):
+        """
+        Args:
+            S0, K, T, r, sigma (array_like): Paramètres des contrats (diffusés en vecteurs de taille M).
+            is_call (array_like of bool): True pour un call, False pour un put.
+            american (array_like of bool): True pour un exercice américain.
+            N (int): Nombre d'étapes, commun à tous les contrats.
+            backend (str): "numba" ou "numpy" (par défaut celui détecté à l'import).
+        """
+        S0, K, T, r, sigma, is_call, american = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(S0, dtype=float)), np.asarray(K, dtype=float), np.asarray(T, dtype=float),
+            np.asarray(r, dtype=float), np.asarray(sigma, dtype=float),
+            np.asarray(is_call, dtype=bool), np.asarray(american, dtype=bool)
+        )
+        if N <= 0:
+            raise ValueError("Le nombre d'étapes N doit être positif")
+        if np.any(T <= 0) or np.any(sigma <= 0) or np.any(S0 <= 0):
+            raise ValueError("S0, T et sigma doivent être positifs")
+
+        self.N = N
+        self.backend = backend or Kernels.BACKEND
+        Kernels.get_kernels(self.backend)
+        self.S0, self.K, self.T, self.r, self.sigma = S0, K, T, r, sigma
+        self.is_call, self.american = is_call, american
+        self.any_american = bool(american.any())
+
+        # Paramètres par ligne, en colonnes (M, 1) pour la diffusion sur les couches
+        self.deltaT = (T / N)[:, None]
+        self.alpha = np.exp(sigma[:, None] * np.sqrt(3 * self.deltaT))
+        self.discount_factor = np.exp(-r[:, None] * self.deltaT)
+        self.growth = np.exp(r[:, None] * self.deltaT)
+        self.prob_up, self.prob_mid, self.prob_down = self.compute_probabilities()
+
+        # alpha^j pour j = -N..N, une ligne par contrat (backend NumPy)
+        self.alpha_powers = self.alpha ** np.arange(-N, N + 1, dtype=float) if self.backend == 'numpy' else None
+
+
+
+    @classmethod
+    def from_options(cls, markets, options, N, backend=None):
+        """
+        Construit le lot à partir de listes d'instances Market et Option.
+
+        Raises:
+            ValueError: Si un contrat porte un dividende discret ou un payoff autre que call/put.
+        """
+        if any(market.dividend and market.ex_div_date is not None for market in markets):
+            raise ValueError("BatchTree ne prend pas en compte le dividende discret")
+        if any(option.type not in ('call', 'put') for option in options):
+            raise ValueError("BatchTree ne traite que les calls et puts")
+        return cls(
+            [market.S0 for market in markets], [option.K for option in options], [option.T for option in options],
+            [market.rate for market in markets], [market.sigma for market in markets],
+            [option.type == 'call' for option in options], [option.style == 'american' for option in options],
+            N, backend=backend
+        )
+
+
+
+    def compute_probabilities(self):
+        """
+        Probabilités de transition par appariement des moments (cf. RollingTree.compute_probabilities),
+        une valeur par contrat.
+
+        Returns:
+            tuple: (p_up, p_mid, p_down), tableaux de forme (M, 1).
+        """
+        alpha = self.alpha
+        variance_ratio = np.expm1(self.sigma[:, None] ** 2 * self.deltaT)
+        p_down = variance_ratio / ((1 - alpha) * (alpha ** (-2) - 1))
+        p_up = p_down / alpha
+        return p_up, 1 - p_up - p_down, p_down
+
+
+
+    def layer_values(self, step):
+        """
+        Spots des nœuds d'une étape pour tous les contrats.
+
+        Returns:
+            np.ndarray: Tableau de forme (M, 2 * step + 1).
+        """
+        if self.alpha_powers is None:
+            powers = self.alpha ** np.arange(-step, step + 1, dtype=float)
+        else:
+            powers = self.alpha_powers[:, self.N - step:self.N + step + 1]
+        return powers * (self.S0[:, None] * self.growth ** step)
+
+
+
+    def payoff(self, spots):
+        """
+        Payoffs call ou put selon la ligne.
+        """
+        return np.where(self.is_call[:, None], np.maximum(spots - self.K[:, None], 0.0),
+                        np.maximum(self.K[:, None] - spots, 0.0))
+
+
+
+    def price(self):
+        """
+        Évalue tous les contrats en une seule rétropropagation vectorisée. Les lignes
+        américaines sont regroupées en tête du lot pour que l'exercice anticipé ne porte
+        que sur un bloc contigu, et les couches alternent entre deux tableaux préalloués.
+
+        Returns:
+            np.ndarray: Prix des M contrats, dans l'ordre d'entrée.
+        """
+        if self.backend == 'numba':
+            return Kernels.batch_backward_numba(
+                self.S0, self.K, self.alpha[:, 0], self.growth[:, 0],
+                *((p * self.discount_factor)[:, 0] for p in (self.prob_up, self.prob_mid, self.prob_down)),
+                self.is_call, self.american, self.N
+            )
+
+        order = np.argsort(~self.american, kind='stable')
+        n_american = int(self.american.sum())
+        M, width = len(order), 2 * self.N + 1
+
+        up = (self.prob_up * self.discount_factor)[order]
+        mid = (self.prob_mid * self.discount_factor)[order]
+        down = (self.prob_down * self.discount_factor)[order]
+        alpha_powers = self.alpha_powers[order[:n_american]]
+        spot = self.S0[order[:n_american], None]
+        growth = self.growth[order[:n_american]]
+        strike = self.K[order][:, None]
+        # max(V, +/-(S - K)) = max(V, payoff) puisque V >= 0
+        sign = np.where(self.is_call[order], 1.0, -1.0)[:, None]
+
+        current = np.empty((M, width))
+        following = np.empty((M, width))
+        scratch = np.empty((M, width))
+        current[:] = self.payoff(self.layer_values(self.N))[order]
+
+        for step in range(self.N - 1, -1, -1):
+            size = 2 * step + 1
+            values, children, buffer = following[:, :size], current[:, :size + 2], scratch[:, :size]
+            np.multiply(up, children[:, 2:], out=values)
+            np.multiply(mid, children[:, 1:-1], out=buffer)
+            values += buffer
+            np.multiply(down, children[:, :-2], out=buffer)
+            values += buffer
+
+            if n_american:
+                exercise = buffer[:n_american]
+                np.multiply(alpha_powers[:, self.N - step:self.N + step + 1], spot * growth ** step, out=exercise)
+                exercise -= strike[:n_american]
+                exercise *= sign[:n_american]
+                np.maximum(values[:n_american], exercise, out=values[:n_american])
+
+            current, following = following, current
+
+        prices = np.empty(M)
+        prices[order] = current[:, 0]
+        return prices
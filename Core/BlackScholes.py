@@ -1,4 +1,5 @@
 import math
+import numpy as np
 from scipy.stats import norm
 
 class BlackScholes:
@@ -207,4 +208,256 @@ class BlackScholes:
             'theta': self.theta(option_type),
             'vega': self.vega(),
             'rho': self.rho(option_type)
-        }
\ No newline at end of file
+        }
+
+
+
+    @staticmethod
+    def batch_price(S, K, T, r, sigma, is_call):
+        """
+        Calcule en une seule passe vectorisée les prix Black-Scholes d'un lot d'options européennes
+        
+        Args:
+            S, K, T, r, sigma (array_like): Paramètres des options (diffusés par NumPy)
+            is_call (array_like of bool): True pour un call, False pour un put
+            
+        Returns:
+            np.ndarray: Prix des options
+        """
+        S, K, T, r, sigma, is_call = np.broadcast_arrays(
+            np.asarray(S, dtype=float), np.asarray(K, dtype=float), np.asarray(T, dtype=float),
+            np.asarray(r, dtype=float), np.asarray(sigma, dtype=float), np.asarray(is_call, dtype=bool)
+        )
+        
+        expired = T <= 0
+        T_safe = np.where(expired, 1.0, T)
+        sqrt_T = np.sqrt(T_safe)
+        d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T_safe) / (sigma * sqrt_T)
+        d2 = d1 - sigma * sqrt_T
+        discounted_K = K * np.exp(-r * T_safe)
+        
+        call = S * norm.cdf(d1) - discounted_K * norm.cdf(d2)
+        put = discounted_K * norm.cdf(-d2) - S * norm.cdf(-d1)
+        prices = np.where(is_call, call, put)
+        
+        intrinsic = np.where(is_call, np.maximum(S - K, 0.0), np.maximum(K - S, 0.0))
+        return np.where(expired, intrinsic, prices)
+    
+
+
+    @staticmethod
+    def batch_vega(S, K, T, r, sigma):
+        """
+        Calcule en une seule passe vectorisée les vegas Black-Scholes (par unité de volatilité)
+        d'un lot d'options européennes, identiques pour un call et un put
+        
+        Args:
+            S, K, T, r, sigma (array_like): Paramètres des options (diffusés par NumPy)
+            
+        Returns:
+            np.ndarray: Vegas des options (nuls à maturité)
+        """
+        S, K, T, r, sigma = np.broadcast_arrays(
+            np.asarray(S, dtype=float), np.asarray(K, dtype=float), np.asarray(T, dtype=float),
+            np.asarray(r, dtype=float), np.asarray(sigma, dtype=float)
+        )
+        
+        expired = T <= 0
+        T_safe = np.where(expired, 1.0, T)
+        sqrt_T = np.sqrt(T_safe)
+        d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T_safe) / (sigma * sqrt_T)
+        return np.where(expired, 0.0, S * norm.pdf(d1) * sqrt_T)
+    
+
+
+    @staticmethod
+    def batch_greeks(S, K, T, r, sigma, is_call):
+        """
+        Calcule en une seule passe vectorisée les grecques Black-Scholes d'un lot d'options européennes,
+        avec les conventions de la classe Greeks (theta par jour, vega et rho pour 1%)
+        
+        Args:
+            S, K, T, r, sigma (array_like): Paramètres des options (diffusés par NumPy)
+            is_call (array_like of bool): True pour un call, False pour un put
+            
+        Returns:
+            dict: Tableaux 'delta', 'gamma', 'theta', 'vega', 'rho' (nuls à maturité, sauf delta)
+        """
+        S, K, T, r, sigma, is_call = np.broadcast_arrays(
+            np.asarray(S, dtype=float), np.asarray(K, dtype=float), np.asarray(T, dtype=float),
+            np.asarray(r, dtype=float), np.asarray(sigma, dtype=float), np.asarray(is_call, dtype=bool)
+        )
+        
+        expired = T <= 0
+        T_safe = np.where(expired, 1.0, T)
+        sqrt_T = np.sqrt(T_safe)
+        d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T_safe) / (sigma * sqrt_T)
+        d2 = d1 - sigma * sqrt_T
+        discounted_K = K * np.exp(-r * T_safe)
+        density = norm.pdf(d1)
+        
+        delta = np.where(is_call, norm.cdf(d1), norm.cdf(d1) - 1)
+        gamma = density / (S * sigma * sqrt_T)
+        theta = (-S * density * sigma / (2 * sqrt_T)
+                 + np.where(is_call, -r * discounted_K * norm.cdf(d2), r * discounted_K * norm.cdf(-d2)))
+        vega = S * density * sqrt_T
+        rho = np.where(is_call, K * T_safe * np.exp(-r * T_safe) * norm.cdf(d2),
+                       -K * T_safe * np.exp(-r * T_safe) * norm.cdf(-d2))
+        
+        expired_delta = np.where(is_call, (S > K).astype(float), -(S < K).astype(float))
+        return {
+            'delta': np.where(expired, expired_delta, delta),
+            'gamma': np.where(expired, 0.0, gamma),
+            'theta': np.where(expired, 0.0, theta / 365),
+            'vega': np.where(expired, 0.0, vega / 100),
+            'rho': np.where(expired, 0.0, rho / 100)
+        }
+
+
+
+    # Approximations analytiques d'options américaines (sans dividende continu : coût de portage b = r,
+    # le call américain vaut alors le call européen et seul le put a une prime d'exercice anticipé)
+    AMERICAN_METHODS = ('barone_adesi_whaley', 'bjerksund_stensland')
+
+
+
+    def american_price(self, option_type='put', method='barone_adesi_whaley'):
+        """
+        Calcule le prix approché d'une option américaine
+        
+        Args:
+            option_type (str): Type d'option ('call' ou 'put')
+            method (str): 'barone_adesi_whaley' ou 'bjerksund_stensland'
+            
+        Returns:
+            float: Prix de l'option américaine
+        """
+        if option_type.lower() not in ('call', 'put'):
+            raise ValueError("option_type doit être 'call' ou 'put'")
+        return float(BlackScholes.batch_american_price(
+            self.S, self.K, self.T, self.r, self.sigma, option_type.lower() == 'call', method
+        ))
+    
+
+
+    @staticmethod
+    def _carry_price(S, K, T, r, b, sigma, is_call):
+        """
+        Prix européen vectorisé avec coût de portage b (Black-Scholes généralisé), pour T > 0
+        """
+        sqrt_T = np.sqrt(T)
+        d1 = (np.log(S / K) + (b + 0.5 * sigma**2) * T) / (sigma * sqrt_T)
+        d2 = d1 - sigma * sqrt_T
+        carry = np.exp((b - r) * T)
+        discount = np.exp(-r * T)
+        call = S * carry * norm.cdf(d1) - K * discount * norm.cdf(d2)
+        put = K * discount * norm.cdf(-d2) - S * carry * norm.cdf(-d1)
+        return np.where(is_call, call, put)
+    
+
+
+    @staticmethod
+    def _baw_put(S, K, T, r, b, sigma, tolerance=1e-8, max_iterations=100):
+        """
+        Put américain de Barone-Adesi et Whaley (1987), pour T > 0 : le spot critique S**
+        est obtenu par itérations de Newton menées simultanément sur tout le lot
+        """
+        sqrt_T = np.sqrt(T)
+        M = 2 * r / sigma**2
+        N_carry = 2 * b / sigma**2
+        K_T = -np.expm1(-r * T)
+        q1 = (-(N_carry - 1) - np.sqrt((N_carry - 1)**2 + 4 * M / K_T)) / 2
+        carry = np.exp((b - r) * T)
+
+        # Point de départ : spot critique asymptotique (T infini) ramené à la maturité
+        q1_infinite = (-(N_carry - 1) - np.sqrt((N_carry - 1)**2 + 4 * M)) / 2
+        S_infinite = K / (1 - 1 / q1_infinite)
+        h1 = (b * T - 2 * sigma * sqrt_T) * K / (K - S_infinite)
+        critical = S_infinite + (K - S_infinite) * np.exp(h1)
+
+        for _ in range(max_iterations):
+            d1 = (np.log(critical / K) + (b + 0.5 * sigma**2) * T) / (sigma * sqrt_T)
+            rhs = (BlackScholes._carry_price(critical, K, T, r, b, sigma, False)
+                   - (1 - carry * norm.cdf(-d1)) * critical / q1)
+            slope = (-carry * norm.cdf(-d1) * (1 - 1 / q1)
+                     - (1 + carry * norm.pdf(-d1) / (sigma * sqrt_T)) / q1)
+            converged = np.abs(K - critical - rhs) / K < tolerance
+            if np.all(converged):
+                break
+            critical = np.where(converged, critical, (K - rhs + slope * critical) / (1 + slope))
+
+        d1 = (np.log(critical / K) + (b + 0.5 * sigma**2) * T) / (sigma * sqrt_T)
+        A1 = -(critical / q1) * (1 - carry * norm.cdf(-d1))
+        european = BlackScholes._carry_price(S, K, T, r, b, sigma, False)
+        return np.where(S > critical, european + A1 * (S / critical) ** q1, K - S)
+    
+
+
+    @staticmethod
+    def _bjerksund_stensland_call(S, K, T, r, b, sigma):
+        """
+        Call américain de Bjerksund et Stensland (1993, frontière d'exercice plate), pour T > 0
+        """
+        sqrt_T = np.sqrt(T)
+        european = BlackScholes._carry_price(S, K, T, r, b, sigma, True)
+        early = b < r
+        b_safe = np.where(early, b, r - 1.0)
+
+        beta = (0.5 - b_safe / sigma**2) + np.sqrt((b_safe / sigma**2 - 0.5)**2 + 2 * r / sigma**2)
+        B_infinite = beta / (beta - 1) * K
+        B_zero = np.maximum(K, r / (r - b_safe) * K)
+        h = -(b_safe * T + 2 * sigma * sqrt_T) * B_zero / (B_infinite - B_zero)
+        trigger = B_zero + (B_infinite - B_zero) * (1 - np.exp(h))
+        alpha = (trigger - K) * trigger ** (-beta)
+
+        def phi(gamma, H):
+            lam = (-r + gamma * b_safe + 0.5 * gamma * (gamma - 1) * sigma**2) * T
+            d = -(np.log(S / H) + (b_safe + (gamma - 0.5) * sigma**2) * T) / (sigma * sqrt_T)
+            kappa = 2 * b_safe / sigma**2 + (2 * gamma - 1)
+            return np.exp(lam) * S ** gamma * (
+                norm.cdf(d) - (trigger / S) ** kappa * norm.cdf(d - 2 * np.log(trigger / S) / (sigma * sqrt_T))
+            )
+
+        american = (alpha * S ** beta - alpha * phi(beta, trigger) + phi(1, trigger) - phi(1, K)
+                    - K * phi(0, trigger) + K * phi(0, K))
+        american = np.where(S >= trigger, S - K, american)
+        return np.where(early, np.maximum(american, european), european)
+    
+
+
+    @staticmethod
+    def batch_american_price(S, K, T, r, sigma, is_call, method='barone_adesi_whaley'):
+        """
+        Calcule en une seule passe vectorisée les prix approchés d'un lot d'options américaines
+        
+        Args:
+            S, K, T, r, sigma (array_like): Paramètres des options (diffusés par NumPy)
+            is_call (array_like of bool): True pour un call, False pour un put
+            method (str): 'barone_adesi_whaley' ou 'bjerksund_stensland' (version 1993)
+            
+        Returns:
+            np.ndarray: Prix des options américaines
+        """
+        if method not in BlackScholes.AMERICAN_METHODS:
+            raise ValueError(f"method doit être parmi {', '.join(BlackScholes.AMERICAN_METHODS)}")
+        S, K, T, r, sigma, is_call = np.broadcast_arrays(
+            np.asarray(S, dtype=float), np.asarray(K, dtype=float), np.asarray(T, dtype=float),
+            np.asarray(r, dtype=float), np.asarray(sigma, dtype=float), np.asarray(is_call, dtype=bool)
+        )
+        
+        expired = T <= 0
+        T_safe = np.where(expired, 1.0, T)
+        b = r
+        
+        # Sans taux positif, pas d'exercice anticipé du put : prix européen
+        european = BlackScholes._carry_price(S, K, T_safe, r, b, sigma, is_call)
+        r_safe = np.where(r > 0, r, 1e-8)
+        if method == 'barone_adesi_whaley':
+            put = BlackScholes._baw_put(S, K, T_safe, r_safe, r_safe, sigma)
+        else:
+            # Symétrie put-call de Bjerksund-Stensland : P(S, K, r, b) = C(K, S, r - b, -b)
+            put = BlackScholes._bjerksund_stensland_call(K, S, T_safe, r_safe - r_safe, -r_safe, sigma)
+        prices = np.where(is_call | (r <= 0), european, np.maximum(put, european))
+        
+        intrinsic = np.where(is_call, np.maximum(S - K, 0.0), np.maximum(K - S, 0.0))
+        return np.where(expired, intrinsic, np.maximum(prices, intrinsic))
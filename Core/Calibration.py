@@ -0,0 +1,270 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from Core.BlackScholes import BlackScholes
+from Core.Market import Market
+from Core.Option import Option
+from Core.RollingTree import RollingTree
+
+
+class Quote:
+
+    def __init__(self, option: Option, price: float, weight: float = 1.0):
+        """
+        Initialise une cotation de marché.
+
+        Args:
+            option (Option): L'option cotée.
+            price (float): Prix coté.
+            weight (float): Poids de la cotation dans l'erreur de pricing.
+        """
+        if price < 0:
+            raise ValueError("Le prix coté doit être positif ou nul")
+        if weight < 0:
+            raise ValueError("Le poids d'une cotation doit être positif ou nul")
+
+        self.option = option
+        self.price = float(price)
+        self.weight = float(weight)
+
+
+
+    def maturity_key(self):
+        """
+        Clé de regroupement par maturité : les cotations d'une même maturité partagent un arbre.
+        """
+        return (self.option.T, self.option.start_date, self.option.end_date)
+
+
+
+def _uses_black_scholes(market, option):
+    """
+    Black-Scholes est exact pour un call ou put européen sans dividende discret.
+    """
+    has_dividend = market.dividend and market.ex_div_date is not None
+    return option.type in ('call', 'put') and option.style == 'european' and not has_dividend
+
+
+
+def _model_prices(market, sigma, quotes, N):
+    """
+    Prix modèles d'un groupe de cotations d'une même maturité et leurs dérivées par rapport à sigma :
+    Black-Scholes vectorisé pour les européennes vanilles, un seul arbre (mode prix seul) partagé par
+    tous les strikes pour les autres, avec la vega adjointe de RollingTree.price_with_sensitivities.
+
+    Returns:
+        tuple: (prix (Q,), dérivées par rapport à sigma (Q,))
+    """
+    shocked = Market(S0=market.S0, rate=market.rate, sigma=sigma,
+                     dividend=market.dividend, ex_div_date=market.ex_div_date)
+    prices = np.empty(len(quotes))
+    vegas = np.empty(len(quotes))
+
+    analytic = [i for i, quote in enumerate(quotes) if _uses_black_scholes(market, quote.option)]
+    if analytic:
+        K = np.array([quotes[i].option.K for i in analytic])
+        T = quotes[analytic[0]].option.T
+        is_call = np.array([quotes[i].option.type == 'call' for i in analytic])
+        prices[analytic] = BlackScholes.batch_price(market.S0, K, T, market.rate, sigma, is_call)
+        vegas[analytic] = BlackScholes.batch_vega(market.S0, K, T, market.rate, sigma)
+
+    lattice = [i for i in range(len(quotes)) if i not in set(analytic)]
+    if lattice:
+        tree = RollingTree(shocked, quotes[lattice[0]].option, N)
+        for i in lattice:
+            sensitivities = tree.price_with_sensitivities(quotes[i].option)
+            prices[i] = sensitivities['price']
+            # La vega de price_with_sensitivities est exprimée pour 1% de volatilité
+            vegas[i] = sensitivities['vega'] * 100
+
+    return prices, vegas
+
+
+
+def _weighted_residuals(market, sigma, groups, N):
+    """
+    Résidus pondérés (prix modèle - prix coté) * sqrt(poids) et jacobien par rapport à sigma,
+    concaténés sur tous les groupes de maturité.
+    """
+    residuals, jacobian = [], []
+    for quotes in groups:
+        prices, vegas = _model_prices(market, sigma, quotes, N)
+        sqrt_weights = np.sqrt([quote.weight for quote in quotes])
+        residuals.append((prices - np.array([quote.price for quote in quotes])) * sqrt_weights)
+        jacobian.append(vegas * sqrt_weights)
+    return np.concatenate(residuals), np.concatenate(jacobian)
+
+
+
+def _fit_sigma(market, groups, N, initial_sigma, sigma_bounds, tolerance, max_iterations):
+    """
+    Ajuste une volatilité unique aux groupes de cotations par Gauss-Newton amorti
+    (pas divisé par deux tant que l'erreur pondérée ne diminue pas), borné à sigma_bounds.
+    Un pas de Gauss-Newton qui pousse sigma au-delà d'une borne déjà atteinte arrête
+    l'ajustement avec at_bound=True et converged=False.
+
+    Returns:
+        dict: {sigma, objective, iterations, converged, at_bound}
+    """
+    low, high = sigma_bounds
+    sigma = min(max(initial_sigma, low), high)
+    residuals, jacobian = _weighted_residuals(market, sigma, groups, N)
+    objective = float(residuals @ residuals)
+    converged = False
+    at_bound = False
+
+    iteration = 0
+    for iteration in range(1, max_iterations + 1):
+        curvature = float(jacobian @ jacobian)
+        if curvature <= 0:
+            break
+        step = -float(jacobian @ residuals) / curvature
+        # Optimum au-delà de la borne : sigma y est bloqué, l'arrêt n'est pas une convergence
+        if (sigma <= low and step < 0) or (sigma >= high and step > 0):
+            at_bound = abs(step) >= tolerance
+            converged = not at_bound
+            break
+
+        # Recherche linéaire : on garde le premier pas (éventuellement réduit) qui améliore l'erreur
+        while True:
+            candidate = min(max(sigma + step, low), high)
+            candidate_residuals, candidate_jacobian = _weighted_residuals(market, candidate, groups, N)
+            candidate_objective = float(candidate_residuals @ candidate_residuals)
+            if candidate_objective <= objective or abs(step) < tolerance:
+                break
+            step /= 2
+
+        moved = abs(candidate - sigma)
+        sigma, residuals, jacobian, objective = candidate, candidate_residuals, candidate_jacobian, candidate_objective
+        if moved < tolerance:
+            converged = True
+            break
+
+    return {'sigma': sigma, 'objective': objective, 'iterations': iteration, 'converged': converged,
+            'at_bound': at_bound}
+
+
+
+class VolatilityCalibrator:
+    """
+    Calibration de la volatilité sur une chaîne d'options cotées : une volatilité unique
+    ou une structure par terme (une volatilité par maturité, maturités traitées en parallèle).
+    Chaque calibration repart de la solution précédente (warm start).
+    """
+
+    def __init__(self, market: Market, quotes, N: int = 200, max_workers=None,
+                 sigma_bounds=(0.01, 3.0), tolerance=1e-6, max_iterations=30):
+        """
+        Initialise la calibration.
+
+        Args:
+            market (Market): Le marché du sous-jacent (sa volatilité sert de point de départ).
+            quotes (list): Liste d'instances de Quote.
+            N (int): Le nombre de pas des arbres pour les options non européennes vanilles.
+            max_workers (int): Nombre maximal de processus (None = nombre de CPU, 1 = séquentiel).
+            sigma_bounds (tuple): Bornes de la volatilité calibrée.
+            tolerance (float): Critère d'arrêt sur la variation de sigma.
+            max_iterations (int): Nombre maximal d'itérations de Gauss-Newton par ajustement.
+        """
+        if not quotes:
+            raise ValueError("Au moins une cotation est nécessaire")
+
+        self.market = market
+        self.quotes = list(quotes)
+        self.N = N
+        self.max_workers = max_workers
+        self.sigma_bounds = sigma_bounds
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self.previous_solution = {}
+
+
+
+    def group_quotes(self):
+        """
+        Regroupe les indices des cotations par maturité, de la plus courte à la plus longue.
+
+        Returns:
+            dict: Clé de maturité -> liste d'indices de cotations.
+        """
+        groups = {}
+        for index, quote in enumerate(self.quotes):
+            groups.setdefault(quote.maturity_key(), []).append(index)
+        return dict(sorted(groups.items(), key=lambda item: item[0][0]))
+
+
+
+    def _initial_sigma(self, key):
+        return self.previous_solution.get(key, self.previous_solution.get('sigma', self.market.sigma))
+
+
+
+    def calibrate(self, term_structure=False):
+        """
+        Minimise l'erreur de pricing pondérée sum(poids * (prix modèle - prix coté)^2).
+
+        Args:
+            term_structure (bool): True pour une volatilité par maturité, False pour une volatilité unique.
+
+        Returns:
+            dict: {'parameters', 'residuals', 'rmse', 'solve_time', 'warm_start'}
+        """
+        start_time = time.time()
+        warm_start = bool(self.previous_solution)
+        groups = self.group_quotes()
+
+        if term_structure:
+            keys = list(groups)
+            tasks = [
+                (self.market, [[self.quotes[i] for i in groups[key]]], self.N, self._initial_sigma(key),
+                 self.sigma_bounds, self.tolerance, self.max_iterations)
+                for key in keys
+            ]
+
+            if len(tasks) > 1 and self.max_workers != 1:
+                with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                    fits = list(executor.map(_fit_sigma, *zip(*tasks)))
+            else:
+                fits = [_fit_sigma(*task) for task in tasks]
+
+            sigma_by_key = {key: fit['sigma'] for key, fit in zip(keys, fits)}
+            parameters = {'term_structure': [
+                {'T': key[0], 'sigma': fit['sigma'], 'iterations': fit['iterations'], 'converged': fit['converged'],
+                 'at_bound': fit['at_bound']}
+                for key, fit in zip(keys, fits)
+            ]}
+            self.previous_solution = dict(sigma_by_key)
+        else:
+            fit = _fit_sigma(self.market, [[self.quotes[i] for i in indices] for indices in groups.values()],
+                             self.N, self._initial_sigma('sigma'), self.sigma_bounds, self.tolerance, self.max_iterations)
+            sigma_by_key = {key: fit['sigma'] for key in groups}
+            parameters = {'sigma': fit['sigma'], 'iterations': fit['iterations'], 'converged': fit['converged'],
+                          'at_bound': fit['at_bound']}
+            self.previous_solution = {'sigma': fit['sigma']}
+
+        residuals = [None] * len(self.quotes)
+        for key, indices in groups.items():
+            quotes = [self.quotes[i] for i in indices]
+            prices, _ = _model_prices(self.market, sigma_by_key[key], quotes, self.N)
+            for index, quote, price in zip(indices, quotes, prices):
+                residuals[index] = {
+                    'K': quote.option.K,
+                    'T': quote.option.T,
+                    'option_type': quote.option.type,
+                    'option_style': quote.option.style,
+                    'quote': quote.price,
+                    'model_price': float(price),
+                    'residual': float(price - quote.price)
+                }
+
+        weights = np.array([quote.weight for quote in self.quotes])
+        errors = np.array([residual['residual'] for residual in residuals])
+        rmse = float(np.sqrt((weights * errors ** 2).sum() / weights.sum())) if weights.sum() > 0 else 0.0
+
+        return {
+            'parameters': parameters,
+            'residuals': residuals,
+            'rmse': rmse,
+            'solve_time': time.time() - start_time,
+            'warm_start': warm_start
+        }
@@ -0,0 +1,142 @@
+import threading
+from collections import OrderedDict
+from Core.Tree import Tree
+
+
+class ExerciseBoundary:
+    """
+    Frontière d'exercice anticipé d'une option américaine, extraite de la
+    rétropropagation de l'arbre trinomial et mise en cache par (marché, strike, T, N).
+    """
+
+    max_cache_size = 128
+    _cache = OrderedDict()
+    _lock = threading.Lock()
+
+    def __init__(self, market, option, N):
+        """
+        Initialise la frontière d'exercice pour une option américaine.
+
+        Args:
+            market: Instance de la classe Market.
+            option: Instance de la classe Option (style "american").
+            N: Nombre d'étapes dans l'arbre.
+        """
+        if option.style != "american":
+            raise ValueError("La frontière d'exercice n'existe que pour une option américaine")
+
+        self.market = market
+        self.option = option
+        self.N = N
+        self.key = self.cache_key(market, option, N)
+        self.cached = False
+
+        entry = self._get_cached(self.key)
+        if entry is None:
+            tree = Tree(market, option, N)
+            price = tree.get_option_price()
+            entry = {
+                'price': price,
+                'deltaT': tree.deltaT,
+                'boundary': tree.get_exercise_boundary()
+            }
+            self._store(self.key, entry)
+        else:
+            self.cached = True
+
+        self.price = entry['price']
+        self.deltaT = entry['deltaT']
+        self.boundary = entry['boundary']
+
+
+
+    @staticmethod
+    def cache_key(market, option, N):
+        """
+        Construit la clé de cache à partir des paramètres du marché, du strike, de T et de N.
+
+        Returns:
+            tuple: Clé hashable identifiant la frontière.
+        """
+        return (
+            market.S0, market.rate, market.sigma, market.dividend, market.ex_div_date,
+            option.K, option.type, tuple(sorted(option.payoff_params.items())),
+            option.T, option.start_date, option.end_date, N
+        )
+
+
+
+    @classmethod
+    def _get_cached(cls, key):
+        with cls._lock:
+            entry = cls._cache.get(key)
+            if entry is not None:
+                cls._cache.move_to_end(key)
+            return entry
+
+
+
+    @classmethod
+    def _store(cls, key, entry):
+        with cls._lock:
+            cls._cache[key] = entry
+            cls._cache.move_to_end(key)
+            while len(cls._cache) > cls.max_cache_size:
+                cls._cache.popitem(last=False)
+
+
+
+    @classmethod
+    def clear_cache(cls):
+        """
+        Vide le cache des frontières d'exercice.
+        """
+        with cls._lock:
+            cls._cache.clear()
+
+
+
+    def get_boundary(self):
+        """
+        Retourne la courbe de la frontière d'exercice.
+
+        Returns:
+            list: Points {step, time, spot} de la frontière.
+        """
+        return self.boundary
+
+
+
+    def critical_spot(self, t):
+        """
+        Retourne le spot critique à l'instant t (étape la plus proche de l'arbre).
+
+        Args:
+            t (float): Instant en années, entre 0 et T.
+
+        Returns:
+            float: Spot critique, ou None si aucun exercice à cette date.
+        """
+        step = min(max(int(round(t / self.deltaT)), 0), self.N)
+        return self.boundary[step]['spot']
+
+
+
+    def is_exercise_optimal(self, S, t):
+        """
+        Indique si l'exercice immédiat est optimal pour un spot S à l'instant t,
+        sans reconstruire d'arbre.
+
+        Args:
+            S (float): Prix du sous-jacent.
+            t (float): Instant en années.
+
+        Returns:
+            bool: True si S se trouve dans la région d'exercice.
+        """
+        spot = self.critical_spot(t)
+        if spot is None:
+            return False
+        if self.option.type.endswith("put"):
+            return S <= spot
+        return S >= spot
@@ -0,0 +1,127 @@
+import sys
+import threading
+from collections import OrderedDict
+
+
+class GeometryCache:
+    """
+    Cache des géométries d'arbres trinomiaux déjà construites (nœuds, probabilités,
+    probabilités cumulées, étape de dividende), partagées par toutes les options d'un
+    même sous-jacent : la géométrie ne dépend que de (S0, r, sigma, dividende, T, N,
+    seuil de pruning), pas du strike, du payoff ni du style d'exercice.
+
+    Les géométries les moins récemment utilisées sont évincées dès que la mémoire
+    estimée dépasse max_bytes.
+    """
+
+    def __init__(self, max_bytes=128 * 1024 * 1024):
+        """
+        Args:
+            max_bytes (int): Mémoire maximale (estimée) occupée par les géométries en cache.
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+
+
+    @staticmethod
+    def cache_key(market, option, N, threshold, dividend_step):
+        """
+        Construit la clé de cache à partir des seuls paramètres côté marché.
+        L'étape de dividende (déjà calculée) remplace la date ex-dividende.
+
+        Returns:
+            tuple: Clé hashable identifiant la géométrie.
+        """
+        dividend = market.dividend if dividend_step is not None else None
+        return (market.S0, market.rate, market.sigma, dividend, dividend_step, float(option.T), N, threshold)
+
+
+
+    @staticmethod
+    def node_nbytes(node):
+        """
+        Mémoire propre à un nœud : l'objet Node, son dictionnaire d'attributs et les flottants
+        qu'il porte (valeur, probabilités, prix...), comptés une fois chacun. Les références
+        vers les voisins et l'arbre, None et les booléens ne sont pas comptés.
+        """
+        floats = {id(value): value for value in node.__dict__.values() if isinstance(value, float)}
+        return (sys.getsizeof(node) + sys.getsizeof(node.__dict__)
+                + sum(sys.getsizeof(value) for value in floats.values()))
+
+
+
+    @staticmethod
+    def estimate_nbytes(tree, sample_size=64):
+        """
+        Estime la mémoire occupée par les nœuds d'un arbre construit, à partir de la taille
+        moyenne d'un échantillon de nœuds répartis sur toutes les étapes.
+        """
+        layers = tree.nodes_by_step
+        nodes = sum(len(layer) for layer in layers)
+        stride = max(1, len(layers) // sample_size)
+        sample = [layer[len(layer) // 2] for layer in layers[::stride] if layer]
+        node_bytes = sum(GeometryCache.node_nbytes(node) for node in sample) / len(sample)
+        return int(nodes * node_bytes) + sum(sys.getsizeof(layer) for layer in layers)
+
+
+
+    def get(self, key):
+        """
+        Retourne l'arbre propriétaire de la géométrie, ou None si elle n'est pas en cache.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry['tree']
+
+
+
+    def put(self, key, tree):
+        """
+        Met en cache la géométrie d'un arbre construit (ignorée si elle dépasse à elle seule max_bytes).
+        """
+        size = self.estimate_nbytes(tree)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._evict(key)
+            self._entries[key] = {'tree': tree, 'size': size}
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes:
+                self._evict(next(iter(self._entries)))
+
+
+
+    def clear(self):
+        """
+        Vide le cache des géométries.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+
+
+    def stats(self):
+        """
+        Retourne le nombre d'entrées, la mémoire estimée et les compteurs de hits/misses.
+        """
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._total_bytes, 'max_bytes': self.max_bytes,
+                    'hits': self.hits, 'misses': self.misses}
+
+
+
+    def _evict(self, key):
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry['size']
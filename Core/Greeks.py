@@ -1,4 +1,6 @@
-from Core.Tree import Tree
+import time
+from Core.BlackScholes import BlackScholes
+from Core.RollingTree import RollingTree
 from Core.Market import Market
 from Core.Option import Option
 
@@ -76,7 +78,7 @@ class Greeks:
         """
         # Créer un nouveau marché avec le prix modifié
         temp_market = Market(S0=S, sigma=self.market.sigma, rate=self.market.rate)
-        model_tree = Tree(temp_market, self.option, self.N)
+        model_tree = RollingTree(temp_market, self.option, self.N)
         return model_tree.get_option_price()
 
 
@@ -93,7 +95,7 @@ class Greeks:
         """
         # Créer un nouveau marché avec la volatilité modifiée
         temp_market = Market(S0=self.market.S0, sigma=sigma, rate=self.market.rate)
-        model_tree = Tree(temp_market, self.option, self.N)
+        model_tree = RollingTree(temp_market, self.option, self.N)
         return model_tree.get_option_price()
 
 
@@ -110,7 +112,7 @@ class Greeks:
         """
 
         temp_market = Market(S0=self.market.S0, sigma=self.market.sigma, rate=rate)
-        model_tree = Tree(temp_market, self.option, self.N)
+        model_tree = RollingTree(temp_market, self.option, self.N)
         return model_tree.get_option_price()
 
 
@@ -126,8 +128,8 @@ class Greeks:
             float: Le prix de l'option pour le temps à maturité donné.
         """
 
-        temp_option = Option(K=self.option.K, T=T, opt_type=self.option.type)
-        model_tree = Tree(self.market, temp_option, self.N)
+        temp_option = Option(K=self.option.K, T=T, opt_type=self.option.type, payoff_params=self.option.payoff_params)
+        model_tree = RollingTree(self.market, temp_option, self.N)
         return model_tree.get_option_price()
     
 
@@ -212,6 +214,24 @@ class Greeks:
 
 
 
+    def compute_adjoint_greeks(self):
+        """
+        Calcule le prix, Delta, Vega et Rho en une seule rétropropagation (dérivées adjointes),
+        au lieu des 6 arbres supplémentaires des différences centrales.
+
+        Returns:
+            dict: Un dictionnaire contenant Delta, Vega (pour 1%), Rho (pour 1%) et le prix de l'option de base.
+        """
+        sensitivities = RollingTree(self.market, self.option, self.N).price_with_sensitivities()
+        return {
+            'delta': sensitivities['delta'],
+            'vega': sensitivities['vega'],
+            'rho': sensitivities['rho'],
+            'base_price': sensitivities['price']
+        }
+
+
+
     def calculate_all_greeks(self):
         """
         Calcule tous les Greeks et retourne un dictionnaire.
@@ -219,7 +239,7 @@ class Greeks:
         Returns:
             dict: Un dictionnaire contenant Delta, Gamma, Theta, Vega, Rho et le prix de l'option de base.
         """
-        base_tree = Tree(self.market, self.option, self.N)
+        base_tree = RollingTree(self.market, self.option, self.N)
         base_price = base_tree.get_option_price()
         
         greeks = {
@@ -230,4 +250,184 @@ class Greeks:
             'rho': self.compute_rho(),
             'base_price': base_price
         }
-        return greeks
\ No newline at end of file
+        return greeks
+
+
+
+
+class SelectiveGreeks:
+    """
+    Calcul à la demande d'une sélection de Greeks, chacun par la méthode choisie :
+    - "lattice" : extraits de l'arbre (delta, vega, rho par dérivées adjointes en une
+      rétropropagation ; gamma et theta à partir des nœuds de l'étape 2) ;
+    - "bump" : différences centrales avec chocs configurables ;
+    - "analytic" : formules de Black-Scholes (call/put européens uniquement).
+    La valorisation de base est faite une seule fois : avec une méthode "lattice", c'est la
+    rétropropagation adjointe elle-même, qui donne aussi les nœuds de l'étape 2.
+    """
+
+    GREEK_NAMES = ['delta', 'gamma', 'theta', 'vega', 'rho']
+    METHODS = ['lattice', 'bump', 'analytic']
+
+    # Chocs par défaut, identiques à ceux de la classe Greeks
+    DEFAULT_BUMPS = {'delta': 0.001, 'gamma': 3.1, 'theta': 1 / 365, 'vega': 0.01, 'rho': 0.01}
+
+    def __init__(self, market: Market, option: Option, N: int, threshold: float = 0.0):
+        """
+        Args:
+            market (Market): Le marché.
+            option (Option): L'option.
+            N (int): Le nombre de pas de l'arbre (sans plafond).
+            threshold (float): Seuil de pruning des arbres.
+        """
+        self.market = market
+        self.option = option
+        self.N = N
+        self.threshold = threshold
+        self._base_tree = None
+        self._base_price = None
+        self._sensitivities = None
+
+
+
+    def base_price(self, with_sensitivities=False):
+        """
+        Prix de base, partagé par tous les Greeks. Avec with_sensitivities, il est obtenu par la
+        rétropropagation adjointe, qui fournit dans la même passe delta, vega, rho et les nœuds
+        de l'étape 2 (gamma et theta) ; sinon par l'arbre en mode prix seul.
+        """
+        if with_sensitivities and self._sensitivities is None:
+            self._base_tree = RollingTree(self.market, self.option, self.N, threshold=self.threshold)
+            self._sensitivities = self._base_tree.price_with_sensitivities(capture_layer_two=True)
+            self._base_price = self._sensitivities['price']
+        elif self._base_price is None:
+            self._base_tree = RollingTree(self.market, self.option, self.N, threshold=self.threshold)
+            self._base_price = self._base_tree.get_option_price()
+        return self._base_price
+
+
+
+    def _reprice(self, S0=None, sigma=None, rate=None, T=None):
+        # Marché choqué avec dividende conservé (comme Portfolio), contrairement à la classe Greeks
+        market = self.market.with_overrides(S0=S0, rate=rate, sigma=sigma)
+        option = self.option if T is None else self.option.with_maturity(T)
+        return RollingTree(market, option, self.N, threshold=self.threshold).get_option_price()
+
+
+
+    def _check_bump(self, name, h):
+        """
+        Vérifie que le choc à la baisse laisse spot, volatilité et maturité positifs.
+
+        Raises:
+            ValueError: Si le choc est trop grand pour une différence centrale.
+        """
+        bounds = {'delta': ('S0', self.market.S0), 'gamma': ('S0', self.market.S0),
+                  'vega': ('sigma', self.market.sigma), 'theta': ('T', self.option.T)}
+        if name in bounds and h >= bounds[name][1]:
+            label, value = bounds[name]
+            raise ValueError(f"Le choc de {name} ({h:g}) doit être inférieur à {label} ({value:g})")
+
+
+
+    def _bump(self, name, h):
+        S0, sigma, rate, T = self.market.S0, self.market.sigma, self.market.rate, self.option.T
+        if name == 'delta':
+            return (self._reprice(S0=S0 + h) - self._reprice(S0=S0 - h)) / (2 * h)
+        if name == 'gamma':
+            return (self._reprice(S0=S0 + h) - 2 * self.base_price() + self._reprice(S0=S0 - h)) / h ** 2
+        if name == 'theta':
+            return -(self._reprice(T=T + h) - self._reprice(T=T - h)) / (2 * h) / 365
+        if name == 'vega':
+            return (self._reprice(sigma=sigma + h) - self._reprice(sigma=sigma - h)) / (2 * h) / 100
+        return (self._reprice(rate=rate + h) - self._reprice(rate=rate - h)) / (2 * h) / 100
+
+
+
+    def _lattice_greek(self, name):
+        self.base_price(with_sensitivities=True)
+        if name in ('delta', 'vega', 'rho'):
+            return self._sensitivities[name]
+
+        if self.N < 2:
+            raise ValueError("Gamma et theta extraits de l'arbre nécessitent N >= 2")
+        spots, values = (layer[1:4] for layer in self._sensitivities['layer_two'])
+
+        # Différences divisées sur les trois nœuds centraux de l'étape 2 (pas non uniforme)
+        slope_down = (values[1] - values[0]) / (spots[1] - spots[0])
+        slope_up = (values[2] - values[1]) / (spots[2] - spots[1])
+        if name == 'gamma':
+            return 2 * (slope_up - slope_down) / (spots[2] - spots[0])
+
+        # Theta : nœud central de l'étape 2 ramené au spot initial par un développement au premier ordre
+        delta_mid = (values[2] - values[0]) / (spots[2] - spots[0])
+        value_at_S0 = values[1] - delta_mid * (spots[1] - self.market.S0)
+        return (value_at_S0 - self._base_price) / (2 * self._base_tree.deltaT) / 365
+
+
+
+    def _analytic_greek(self, name):
+        if self.option.type not in ('call', 'put') or self.option.style != 'european':
+            raise ValueError("La méthode analytique n'est disponible que pour les calls et puts européens")
+        if self.market.dividend and self.market.ex_div_date is not None:
+            raise ValueError("La méthode analytique ne prend pas en compte le dividende discret")
+        greeks = BlackScholes.batch_greeks(self.market.S0, self.option.K, self.option.T,
+                                           self.market.rate, self.market.sigma, self.option.type == 'call')
+        return float(greeks[name])
+
+
+
+    def compute(self, greeks=None, methods=None, bumps=None):
+        """
+        Calcule uniquement les Greeks demandés.
+
+        Args:
+            greeks (list): Noms des Greeks (par défaut les cinq).
+            methods (str | dict): Méthode commune ou méthode par Greek (par défaut "lattice").
+            bumps (dict): Chocs par Greek pour la méthode "bump" (par défaut DEFAULT_BUMPS).
+
+        Returns:
+            dict: {'price', 'base_time_ms', 'greeks': {nom: {'value', 'method', 'time_ms'}}}
+
+        Raises:
+            ValueError: Greek ou méthode inconnus, ou méthode inapplicable à l'option.
+        """
+        greeks = list(greeks or self.GREEK_NAMES)
+        if not isinstance(methods, dict):
+            methods = {name: methods or 'lattice' for name in greeks}
+        bumps = {**self.DEFAULT_BUMPS, **(bumps or {})}
+
+        for name in greeks:
+            if name not in self.GREEK_NAMES:
+                raise ValueError(f"Greek inconnu : {name} (parmi {', '.join(self.GREEK_NAMES)})")
+            if methods.get(name, 'lattice') not in self.METHODS:
+                raise ValueError(f"Méthode inconnue pour {name} : {methods[name]} (parmi {', '.join(self.METHODS)})")
+            try:
+                bumps[name] = float(bumps[name])
+            except (TypeError, ValueError):
+                raise ValueError(f"Le choc de {name} doit être un nombre")
+            if not bumps[name] > 0:
+                raise ValueError(f"Le choc de {name} doit être positif")
+            if methods.get(name, 'lattice') == 'bump':
+                self._check_bump(name, bumps[name])
+
+        start = time.perf_counter()
+        price = self.base_price(with_sensitivities=any(methods.get(name, 'lattice') == 'lattice' for name in greeks))
+        base_time_ms = (time.perf_counter() - start) * 1000
+
+        results = {}
+        for name in greeks:
+            method = methods.get(name, 'lattice')
+            start = time.perf_counter()
+            if method == 'lattice':
+                value = self._lattice_greek(name)
+            elif method == 'bump':
+                value = self._bump(name, bumps[name])
+            else:
+                value = self._analytic_greek(name)
+            results[name] = {'value': float(value), 'method': method,
+                             'time_ms': (time.perf_counter() - start) * 1000}
+            if method == 'bump':
+                results[name]['bump'] = bumps[name]
+
+        return {'price': price, 'base_time_ms': base_time_ms, 'greeks': results}
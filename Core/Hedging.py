@@ -0,0 +1,241 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from Core.BlackScholes import BlackScholes
+from Core.Market import Market
+from Core.Option import Option
+from Core.RollingTree import RollingTree
+
+
+def simulate_paths(S0, rate, sigma, T, n_dates, n_paths, seed=None):
+    """
+    Simule des trajectoires du sous-jacent en mouvement brownien géométrique.
+
+    Args:
+        S0 (float): Spot initial.
+        rate (float): Dérive (taux sans risque sous la probabilité risque-neutre).
+        sigma (float): Volatilité réalisée des trajectoires.
+        T (float): Horizon en années.
+        n_dates (int): Nombre de pas de temps.
+        n_paths (int): Nombre de trajectoires.
+        seed (int): Graine du générateur aléatoire.
+
+    Returns:
+        np.ndarray: Matrice (n_paths, n_dates + 1), la première colonne valant S0.
+    """
+    dt = T / n_dates
+    rng = np.random.default_rng(seed)
+    increments = (rate - 0.5 * sigma ** 2) * dt + sigma * math.sqrt(dt) * rng.standard_normal((n_paths, n_dates))
+    log_paths = np.concatenate([np.zeros((n_paths, 1)), np.cumsum(increments, axis=1)], axis=1)
+    return S0 * np.exp(log_paths)
+
+
+
+def load_paths(path):
+    """
+    Charge une matrice de trajectoires (une ligne par trajectoire, une colonne par date)
+    depuis un fichier local .npy ou texte (.csv, séparateur virgule).
+
+    Returns:
+        np.ndarray: Matrice (n_paths, n_dates + 1).
+    """
+    paths = np.load(path) if str(path).endswith('.npy') else np.loadtxt(path, delimiter=',', ndmin=2)
+    paths = np.asarray(paths, dtype=float)
+    if paths.ndim != 2 or paths.shape[1] < 2:
+        raise ValueError("La matrice de trajectoires doit avoir au moins deux dates")
+    if not np.all(np.isfinite(paths)) or np.any(paths <= 0):
+        raise ValueError("Les trajectoires doivent être positives et finies")
+    return paths
+
+
+
+def _tree_delta_curve(market, option, tau, N, spots):
+    """
+    Valeurs et deltas de l'arbre pour tous les spots d'une date, à maturité résiduelle tau.
+
+    L'arbre est prolongé de m pas avant la date, avec le même pas de temps, pour que sa
+    couche m (à l'instant de la date) couvre tous les spots : valeurs et deltas des nœuds
+    de cette couche sont ensuite interpolés aux spots des trajectoires.
+
+    Returns:
+        tuple: (valeurs, deltas) aux spots demandés.
+    """
+    steps = max(int(math.ceil(N * tau / option.T - 1e-9)), 1)
+    deltaT = tau / steps
+    log_alpha = market.sigma * math.sqrt(3 * deltaT)
+    center = float(np.median(spots))
+    m = int(math.ceil(np.max(np.abs(np.log(spots / center))) / log_alpha)) + 1
+
+    # Spot initial tel que le nœud central de la couche m soit le spot médian
+    reference = Market(S0=center * math.exp(-market.rate * m * deltaT), rate=market.rate, sigma=market.sigma)
+    extended = Option(K=option.K, opt_type=option.type, style=option.style,
+                      T=tau + m * deltaT, payoff_params=option.payoff_params)
+    geometry = RollingTree(reference, extended, steps + m)
+
+    values = option.payoff_array(geometry.layer_values(steps + m))
+    for step in range(steps + m - 1, m - 1, -1):
+        size = 2 * step + 1
+        p_up, p_mid, p_down = geometry.layer_probabilities(step)
+        values = (p_up * values[2:size + 2] + p_mid * values[1:size + 1]
+                  + p_down * values[:size]) * geometry.discount_factor
+
+    node_spots = geometry.layer_values(m)
+    node_deltas = np.gradient(values, node_spots)
+    return np.interp(spots, node_spots, values), np.interp(spots, node_spots, node_deltas)
+
+
+
+def _hedge_chunk(market, option, paths, T, model, N, rebalance_every, delta_band, proportional_cost, fixed_cost):
+    """
+    Rejoue la couverture en delta d'une option vendue sur un paquet de trajectoires.
+    À chaque date, les deltas de toutes les trajectoires sont obtenus en un seul appel
+    (Black-Scholes vectorisé ou courbe de deltas d'un arbre).
+
+    Returns:
+        dict: Tableaux 'pnl', 'costs' et 'trades' (un élément par trajectoire).
+    """
+    n_paths, n_columns = paths.shape
+    n_dates = n_columns - 1
+    dt = T / n_dates
+    growth = math.exp(market.rate * dt)
+    is_call = option.type == 'call'
+
+    def hedge_values(spots, tau):
+        if model == 'tree':
+            return _tree_delta_curve(market, option, tau, N, spots)
+        greeks = BlackScholes.batch_greeks(spots, option.K, tau, market.rate, market.sigma, is_call)
+        return BlackScholes.batch_price(spots, option.K, tau, market.rate, market.sigma, is_call), greeks['delta']
+
+    def trading_cost(quantity, spots):
+        traded = np.abs(quantity) > 0
+        return np.abs(quantity) * spots * proportional_cost + np.where(traded, fixed_cost, 0.0)
+
+    # Vente de l'option au prix du modèle et couverture initiale
+    premium, held = hedge_values(paths[:, 0], T)
+    costs = trading_cost(held, paths[:, 0])
+    cash = premium - held * paths[:, 0] - costs
+    trades = (np.abs(held) > 0).astype(int)
+
+    for k in range(1, n_dates):
+        spots = paths[:, k]
+        cash *= growth
+        if k % rebalance_every:
+            continue
+        _, target = hedge_values(spots, T - k * dt)
+        quantity = target - held
+        if delta_band is not None:
+            quantity = np.where(np.abs(quantity) > delta_band, quantity, 0.0)
+        cost = trading_cost(quantity, spots)
+        cash -= quantity * spots + cost
+        held = held + quantity
+        costs += cost
+        trades += np.abs(quantity) > 0
+
+    # Maturité : liquidation de la couverture et paiement du payoff
+    final_spots = paths[:, -1]
+    cash *= growth
+    close_out = trading_cost(held, final_spots)
+    costs += close_out
+    trades += np.abs(held) > 0
+    pnl = cash + held * final_spots - close_out - option.payoff_array(final_spots)
+    return {'pnl': pnl, 'costs': costs, 'trades': trades}
+
+
+
+class HedgingSimulator:
+    """
+    Backtest de couverture en delta d'une option européenne vendue, sur une matrice de
+    trajectoires simulées ou historiques. Les deltas sont calculés pour toutes les
+    trajectoires d'une date en un seul appel vectorisé, et les paquets de trajectoires
+    sont répartis sur plusieurs processus.
+    """
+
+    def __init__(self, market: Market, option: Option, paths, model='black_scholes', N=100,
+                 rebalance_every=1, delta_band=None, proportional_cost=0.0, fixed_cost=0.0,
+                 chunk_size=10000, max_workers=None):
+        """
+        Args:
+            market (Market): Marché du modèle de couverture (taux et volatilité implicite), sans dividende.
+            option (Option): Option européenne vendue, de maturité égale à l'horizon des trajectoires.
+            paths (array): Matrice (n_paths, n_dates + 1) des spots, dates régulièrement espacées sur [0, T].
+            model (str): "black_scholes" ou "tree" (deltas de l'arbre trinomial à N pas sur la maturité).
+            N (int): Nombre de pas de l'arbre sur toute la maturité (modèle "tree").
+            rebalance_every (int): Réajustement toutes les rebalance_every dates.
+            delta_band (float): Réajustement seulement si l'écart de delta dépasse cette bande.
+            proportional_cost (float): Coût proportionnel au nominal échangé (ex: 0.0005 pour 5 bps).
+            fixed_cost (float): Coût fixe par transaction.
+            chunk_size (int): Nombre de trajectoires par paquet.
+            max_workers (int): Nombre de processus (1 pour tout calculer dans le processus courant).
+        """
+        if model not in ('black_scholes', 'tree'):
+            raise ValueError("model doit être 'black_scholes' ou 'tree'")
+        if option.type not in ('call', 'put') or option.style != 'european':
+            raise ValueError("La couverture n'est simulée que pour les calls et puts européens (exercice anticipé non modélisé)")
+        if market.dividend and market.ex_div_date is not None:
+            raise ValueError("Le dividende discret n'est pas pris en compte par le simulateur de couverture")
+        if rebalance_every < 1:
+            raise ValueError("rebalance_every doit être supérieur ou égal à 1")
+
+        self.market = market
+        self.option = option
+        self.paths = np.asarray(paths, dtype=float)
+        if self.paths.ndim != 2 or self.paths.shape[1] < 2:
+            raise ValueError("La matrice de trajectoires doit avoir au moins deux dates")
+        self.model = model
+        self.N = N
+        self.rebalance_every = rebalance_every
+        self.delta_band = delta_band
+        self.proportional_cost = proportional_cost
+        self.fixed_cost = fixed_cost
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+
+
+
+    def run(self):
+        """
+        Lance le backtest sur toutes les trajectoires.
+
+        Returns:
+            dict: {'pnl', 'costs', 'trades'} (tableaux par trajectoire) et 'summary' (statistiques du P&L).
+        """
+        chunks = [self.paths[i:i + self.chunk_size] for i in range(0, len(self.paths), self.chunk_size)]
+        tasks = [
+            (self.market, self.option, chunk, self.option.T, self.model, self.N, self.rebalance_every,
+             self.delta_band, self.proportional_cost, self.fixed_cost)
+            for chunk in chunks
+        ]
+
+        if len(tasks) > 1 and self.max_workers != 1:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                results = list(executor.map(_hedge_chunk, *zip(*tasks)))
+        else:
+            results = [_hedge_chunk(*task) for task in tasks]
+
+        output = {name: np.concatenate([result[name] for result in results]) for name in ('pnl', 'costs', 'trades')}
+        output['summary'] = self.summarize(output['pnl'], output['costs'], output['trades'])
+        return output
+
+
+
+    @staticmethod
+    def summarize(pnl, costs, trades):
+        """
+        Statistiques de la distribution du P&L de couverture.
+
+        Returns:
+            dict: Moyenne, écart-type, percentiles, VaR et expected shortfall à 95%, coûts et transactions moyens.
+        """
+        percentiles = np.percentile(pnl, [1, 5, 50, 95, 99])
+        var_95 = -percentiles[1]
+        tail = pnl[pnl <= percentiles[1]]
+        return {
+            'paths': int(len(pnl)),
+            'mean': float(pnl.mean()),
+            'std': float(pnl.std()),
+            'percentiles': {str(q): float(value) for q, value in zip([1, 5, 50, 95, 99], percentiles)},
+            'var_95': float(var_95),
+            'es_95': float(-tail.mean()) if len(tail) else float(var_95),
+            'mean_cost': float(costs.mean()),
+            'mean_trades': float(trades.mean())
+        }
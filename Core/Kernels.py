@@ -0,0 +1,394 @@
+"""
+Noyaux de calcul de l'arbre trinomial en mode tableau (utilisés par RollingTree).
+
+Deux implémentations partagent la même signature :
+- "numba" : boucles compilées à la volée, mises en cache sur disque (cache=True),
+  disponible seulement si Numba est installé ;
+- "numpy" : opérations vectorisées par couche, toujours disponible.
+
+Le backend est détecté à l'import ; la variable d'environnement PRICER_KERNEL_BACKEND
+permet de forcer "numpy".
+"""
+import os
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+
+def _propagate_cum_prob_numpy(N, p_up, p_mid, p_down, div_step, div_p_up, div_p_mid, div_p_down, threshold):
+    """
+    Propage les probabilités cumulées vers l'avant avec pruning (même règle que Tree.build_next_step :
+    un nœud n'est développé que si sa probabilité cumulée atteint le seuil).
+
+    Returns:
+        tuple: (lo, hi) indices extrêmes des nœuds développés à chaque étape (hi < lo si aucun).
+    """
+    lo = np.zeros(N + 1, dtype=np.int64)
+    hi = np.full(N + 1, -1, dtype=np.int64)
+    current = np.zeros(2 * N + 1)
+    following = np.zeros(2 * N + 1)
+    current[0] = 1.0
+
+    for step in range(N):
+        size = 2 * step + 1
+        layer = current[:size]
+        expanded = np.flatnonzero(layer >= threshold)
+        if expanded.size == 0:
+            return lo, hi
+        lo[step], hi[step] = expanded[0], expanded[-1]
+
+        if step + 1 == div_step:
+            pu, pm, pd = div_p_up, div_p_mid, div_p_down
+        else:
+            pu, pm, pd = p_up, p_mid, p_down
+
+        weights = np.where(layer >= threshold, layer, 0.0)
+        following[:size + 2] = 0.0
+        following[2:size + 2] += weights * pu
+        following[1:size + 1] += weights * pm
+        following[:size] += weights * pd
+        current, following = following, current
+
+    lo[N], hi[N] = 0, 2 * N
+    return lo, hi
+
+
+
+def _backward_induction_numpy(values, alpha_powers, S0, growth, discount, p_up, p_mid, p_down,
+                              div_step, dividend, div_p_up, div_p_mid, div_p_down, lo, hi,
+                              american, is_call, K, exercise=None):
+    """
+    Rétropropagation sur deux tableaux réutilisés, couche par couche.
+
+    Args:
+        values: Valeurs de l'option à maturité (2N + 1 nœuds, du plus bas au plus haut).
+        alpha_powers: alpha^j pour j = -N..N.
+        div_step: Étape ex-dividende (-1 si aucune).
+        div_p_up, div_p_mid, div_p_down: Probabilités des nœuds de l'étape div_step - 1.
+        lo, hi: Indices extrêmes des nœuds développés par étape (pruning).
+        american: True pour autoriser l'exercice anticipé.
+        is_call, K: Payoff d'exercice anticipé (call ou put).
+        exercise: Payoff vectorisé quelconque (spots -> valeurs), prioritaire sur is_call et K.
+            Propre au backend NumPy.
+
+    Returns:
+        float: Valeur de l'option à la racine.
+    """
+    N = (values.shape[0] - 1) // 2
+    current = values.copy()
+    previous = np.empty_like(current)
+    spots = np.empty_like(current)
+
+    for step in range(N - 1, -1, -1):
+        size = 2 * step + 1
+        if step + 1 == div_step:
+            pu, pm, pd = div_p_up, div_p_mid, div_p_down
+        else:
+            pu, pm, pd = p_up, p_mid, p_down
+
+        layer = previous[:size]
+        np.multiply(current[2:size + 2], pu, out=layer)
+        layer += pm * current[1:size + 1]
+        layer += pd * current[:size]
+        layer *= discount
+
+        if american:
+            layer_spots = np.multiply(alpha_powers[N - step:N + step + 1], S0 * growth ** step, out=spots[:size])
+            if step == div_step:
+                layer_spots -= dividend
+            if exercise is not None:
+                exercise_values = exercise(layer_spots)
+            else:
+                exercise_values = layer_spots - K if is_call else K - layer_spots
+                np.maximum(exercise_values, 0.0, out=exercise_values)
+            np.maximum(layer, exercise_values, out=layer)
+
+        # Nœuds non développés (pruning) : prix nul, comme dans Tree
+        layer[:lo[step]] = 0.0
+        layer[hi[step] + 1:] = 0.0
+
+        current, previous = previous, current
+
+    return float(current[0])
+
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(cache=True)
+    def _propagate_cum_prob_numba(N, p_up, p_mid, p_down, div_step, div_p_up, div_p_mid, div_p_down, threshold):
+        lo = np.zeros(N + 1, dtype=np.int64)
+        hi = np.full(N + 1, -1, dtype=np.int64)
+        current = np.zeros(2 * N + 1)
+        following = np.zeros(2 * N + 1)
+        current[0] = 1.0
+
+        for step in range(N):
+            size = 2 * step + 1
+            first = -1
+            last = -1
+            for k in range(size + 2):
+                following[k] = 0.0
+            for k in range(size):
+                weight = current[k]
+                if weight < threshold:
+                    continue
+                if first < 0:
+                    first = k
+                last = k
+                if step + 1 == div_step:
+                    following[k + 2] += weight * div_p_up[k]
+                    following[k + 1] += weight * div_p_mid[k]
+                    following[k] += weight * div_p_down[k]
+                else:
+                    following[k + 2] += weight * p_up
+                    following[k + 1] += weight * p_mid
+                    following[k] += weight * p_down
+            if first < 0:
+                return lo, hi
+            lo[step] = first
+            hi[step] = last
+            current, following = following, current
+
+        lo[N] = 0
+        hi[N] = 2 * N
+        return lo, hi
+
+
+    @njit(cache=True)
+    def _backward_induction_numba(values, alpha_powers, S0, growth, discount, p_up, p_mid, p_down,
+                                  div_step, dividend, div_p_up, div_p_mid, div_p_down, lo, hi,
+                                  american, is_call, K):
+        N = (values.shape[0] - 1) // 2
+        current = values.copy()
+        previous = np.empty_like(current)
+
+        for step in range(N - 1, -1, -1):
+            size = 2 * step + 1
+            first = lo[step]
+            last = hi[step]
+            for k in range(first):
+                previous[k] = 0.0
+            for k in range(last + 1, size):
+                previous[k] = 0.0
+
+            if step + 1 == div_step:
+                for k in range(first, last + 1):
+                    previous[k] = discount * (div_p_up[k] * current[k + 2] + div_p_mid[k] * current[k + 1]
+                                              + div_p_down[k] * current[k])
+            else:
+                for k in range(first, last + 1):
+                    previous[k] = discount * (p_up * current[k + 2] + p_mid * current[k + 1] + p_down * current[k])
+
+            if american:
+                scale = S0 * growth ** step
+                for k in range(first, last + 1):
+                    spot = alpha_powers[N - step + k] * scale
+                    if step == div_step:
+                        spot -= dividend
+                    exercise = spot - K if is_call else K - spot
+                    if exercise < 0.0:
+                        exercise = 0.0
+                    if exercise > previous[k]:
+                        previous[k] = exercise
+            current, previous = previous, current
+
+        return current[0]
+
+
+    @njit(cache=True)
+    def _backward_tangents_numba(values, tangents, alpha_powers, S0, growth, discount, ddiscount, deltaT, root3dt,
+                                 probs, dprobs, div_step, dividend, div_probs, div_dprobs, lo, hi,
+                                 american, is_call, K, layer_two):
+        """
+        Rétropropagation du prix et de ses dérivées par rapport à (S0, sigma, r) pour un call ou un put.
+
+        Args:
+            values, tangents: Payoffs à maturité (2N + 1) et leurs dérivées (3, 2N + 1).
+            probs, dprobs: Probabilités (up, mid, down) et leurs dérivées, de forme (3,) et (3, 3).
+            div_probs, div_dprobs: Idem pour l'étape div_step - 1, de forme (3, n) et (3, 3, n).
+            ddiscount: Dérivée du facteur d'actualisation par rapport à r.
+            root3dt: sqrt(3 * deltaT), dérivée de log(alpha) par rapport à sigma.
+            layer_two: Tableau de taille 5 rempli avec les valeurs des nœuds de l'étape 2 (si N >= 2).
+
+        Returns:
+            np.ndarray: (prix, dérivée S0, dérivée sigma, dérivée r).
+        """
+        N = (values.shape[0] - 1) // 2
+        # État par nœud : (valeur, dérivée S0, dérivée sigma, dérivée r), contigu par nœud
+        current = np.empty((values.shape[0], 4))
+        current[:, 0] = values
+        current[:, 1:] = tangents.T
+        previous = np.empty_like(current)
+        sign = 1.0 if is_call else -1.0
+
+        for step in range(N - 1, -1, -1):
+            size = 2 * step + 1
+            first = lo[step]
+            last = hi[step]
+            for k in range(size):
+                if k < first or k > last:
+                    for d in range(4):
+                        previous[k, d] = 0.0
+
+            if step + 1 == div_step:
+                for k in range(first, last + 1):
+                    pu = div_probs[0, k]
+                    pm = div_probs[1, k]
+                    pd = div_probs[2, k]
+                    up = current[k + 2, 0]
+                    mid = current[k + 1, 0]
+                    down = current[k, 0]
+                    expectation = pu * up + pm * mid + pd * down
+                    previous[k, 0] = discount * expectation
+                    for d in range(3):
+                        previous[k, d + 1] = discount * (
+                            div_dprobs[d, 0, k] * up + div_dprobs[d, 1, k] * mid + div_dprobs[d, 2, k] * down
+                            + pu * current[k + 2, d + 1] + pm * current[k + 1, d + 1] + pd * current[k, d + 1])
+                    previous[k, 3] += ddiscount * expectation
+            else:
+                # Hors dividende, seules les dérivées par rapport à sigma et r touchent les probabilités
+                pu, pm, pd = probs[0], probs[1], probs[2]
+                dvu, dvm, dvd = dprobs[1, 0], dprobs[1, 1], dprobs[1, 2]
+                dru, drm, drd = dprobs[2, 0], dprobs[2, 1], dprobs[2, 2]
+                for k in range(first, last + 1):
+                    up = current[k + 2, 0]
+                    mid = current[k + 1, 0]
+                    down = current[k, 0]
+                    expectation = pu * up + pm * mid + pd * down
+                    previous[k, 0] = discount * expectation
+                    previous[k, 1] = discount * (pu * current[k + 2, 1] + pm * current[k + 1, 1] + pd * current[k, 1])
+                    previous[k, 2] = discount * (dvu * up + dvm * mid + dvd * down
+                                                 + pu * current[k + 2, 2] + pm * current[k + 1, 2] + pd * current[k, 2])
+                    previous[k, 3] = (discount * (dru * up + drm * mid + drd * down
+                                                  + pu * current[k + 2, 3] + pm * current[k + 1, 3] + pd * current[k, 3])
+                                      + ddiscount * expectation)
+
+            if american:
+                scale = S0 * growth ** step
+                for k in range(first, last + 1):
+                    undivided = alpha_powers[N - step + k] * scale
+                    spot = undivided - dividend if step == div_step else undivided
+                    exercise = sign * (spot - K)
+                    if exercise > 0.0 and exercise > previous[k, 0]:
+                        previous[k, 0] = exercise
+                        previous[k, 1] = sign * undivided / S0
+                        previous[k, 2] = sign * undivided * (k - step) * root3dt
+                        previous[k, 3] = sign * undivided * step * deltaT
+
+            if step == 2:
+                for k in range(5):
+                    layer_two[k] = previous[k, 0]
+
+            current, previous = previous, current
+
+        return current[0].copy()
+
+
+
+    @njit(cache=True)
+    def _binomial_backward_numba(values, ratio_powers, S0, down, p_up, p_down, div_step, dividend,
+                                 div_time, rate, deltaT, american, is_call, K):
+        # Arbre binomial recombinant (LeisenReimerTree) : spot S0 * d^step * (u/d)^k,
+        # augmenté de la valeur actualisée du dividende avant son détachement
+        N = values.shape[0] - 1
+        current = values.copy()
+        for step in range(N - 1, -1, -1):
+            base = S0 * down ** step
+            carry = 0.0
+            if div_step >= 0 and step < div_step:
+                carry = dividend * np.exp(-rate * (div_time - step * deltaT))
+            for k in range(step + 1):
+                value = p_up * current[k + 1] + p_down * current[k]
+                if american:
+                    spot = base * ratio_powers[k] + carry
+                    exercise = spot - K if is_call else K - spot
+                    if exercise > value:
+                        value = exercise
+                current[k] = value
+        return current[0]
+
+
+    @njit(cache=True, parallel=True)
+    def _batch_backward_numba(S0, K, alpha, growth, p_up, p_mid, p_down, is_call, american, N):
+        # Lot de contrats (BatchTree) : une rétropropagation par ligne, lignes réparties sur les cœurs
+        M = S0.shape[0]
+        prices = np.empty(M)
+        for row in prange(M):
+            width = 2 * N + 1
+            current = np.empty(width)
+            powers = np.empty(width)
+            powers[N] = 1.0
+            for j in range(1, N + 1):
+                powers[N + j] = powers[N + j - 1] * alpha[row]
+                powers[N - j] = powers[N - j + 1] / alpha[row]
+            sign = 1.0 if is_call[row] else -1.0
+            forward = S0[row] * growth[row] ** N
+            for k in range(width):
+                current[k] = max(sign * (forward * powers[k] - K[row]), 0.0)
+
+            for step in range(N - 1, -1, -1):
+                forward = S0[row] * growth[row] ** step
+                for k in range(2 * step + 1):
+                    value = p_up[row] * current[k + 2] + p_mid[row] * current[k + 1] + p_down[row] * current[k]
+                    if american[row]:
+                        exercise = sign * (forward * powers[N - step + k] - K[row])
+                        if exercise > value:
+                            value = exercise
+                    current[k] = value
+            prices[row] = current[0]
+        return prices
+
+
+BACKENDS = {'numpy': (_propagate_cum_prob_numpy, _backward_induction_numpy)}
+if NUMBA_AVAILABLE:
+    BACKENDS['numba'] = (_propagate_cum_prob_numba, _backward_induction_numba)
+    backward_tangents_numba = _backward_tangents_numba
+    binomial_backward_numba = _binomial_backward_numba
+    batch_backward_numba = _batch_backward_numba
+
+BACKEND = os.environ.get('PRICER_KERNEL_BACKEND', 'numba' if NUMBA_AVAILABLE else 'numpy')
+if BACKEND not in BACKENDS:
+    BACKEND = 'numpy'
+
+
+
+def get_kernels(backend=None):
+    """
+    Retourne les noyaux (propagate_cum_prob, backward_induction) du backend demandé.
+
+    Args:
+        backend (str): "numba" ou "numpy" (par défaut le backend détecté à l'import).
+
+    Returns:
+        tuple: Les deux fonctions noyaux.
+    """
+    backend = backend or BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de noyaux indisponible : {backend}")
+    return BACKENDS[backend]
+
+
+
+def warm_up(backend=None):
+    """
+    Déclenche le chargement des noyaux compilés (depuis le cache disque s'il existe)
+    pour que la première requête ne paie pas la compilation.
+    """
+    propagate_cum_prob, backward_induction = get_kernels(backend)
+    empty = np.empty(0)
+    lo, hi = propagate_cum_prob(2, 0.2, 0.6, 0.2, -1, empty, empty, empty, 0.0)
+    backward_induction(np.zeros(5), np.ones(5), 1.0, 1.0, 1.0, 0.2, 0.6, 0.2,
+                       -1, 0.0, empty, empty, empty, lo, hi, True, True, 1.0)
+    if (backend or BACKEND) == 'numba':
+        _backward_tangents_numba(np.zeros(5), np.zeros((3, 5)), np.ones(5), 1.0, 1.0, 1.0, 0.0, 1.0, 1.0,
+                                 np.full(3, 1 / 3), np.zeros((3, 3)), -1, 0.0, np.zeros((3, 0)),
+                                 np.zeros((3, 3, 0)), lo, hi, True, True, 1.0, np.zeros(5))
+        _binomial_backward_numba(np.zeros(3), np.ones(3), 1.0, 1.0, 0.5, 0.5, -1, 0.0, 0.0, 0.0, 1.0, True, True, 1.0)
+        _batch_backward_numba(np.ones(1), np.ones(1), np.full(1, 1.1), np.ones(1), np.full(1, 0.2), np.full(1, 0.6),
+                              np.full(1, 0.2), np.ones(1, dtype=np.bool_), np.ones(1, dtype=np.bool_), 2)
@@ -0,0 +1,178 @@
+import time
+import numpy as np
+from Core.RollingTree import RollingTree
+
+
+class Lattice:
+    """
+    Arbre trinomial complet sous forme de tableaux par étape (valeurs du sous-jacent,
+    probabilités, probabilités cumulées et prix de l'option), sans objets Node.
+
+    Même réseau que Tree, pruning et dividende compris : les nœuds de l'étape i sont
+    rangés du plus bas (j = -i) au plus haut (j = +i). Les nœuds non atteints à cause
+    du pruning sont signalés par le masque exists.
+    """
+
+    def __init__(self, market, option, N, threshold=0.0, progress_callback=None):
+        """
+        Initialise le réseau.
+
+        Args:
+            market: Instance de la classe Market contenant les paramètres du marché.
+            option: Instance de la classe Option contenant les paramètres de l'option.
+            N: Nombre d'étapes dans l'arbre.
+            threshold: Seuil de probabilité cumulée pour le pruning des nœuds.
+            progress_callback: Fonction optionnelle appelée après chaque étape de build()
+                avec un dictionnaire {phase, step, total_steps, nodes, elapsed} (comme Tree).
+        """
+
+        self.N = N
+        self.market = market
+        self.option = option
+        self.threshold = threshold
+        self.progress_callback = progress_callback
+        self.geometry = RollingTree(market, option, N, threshold=threshold)
+        self.deltaT = self.geometry.deltaT
+
+        self.values = []
+        self.cum_prob = []
+        self.exists = []
+        self.expanded = []
+        self.prob_up = []
+        self.prob_mid = []
+        self.prob_down = []
+        self.option_values = []
+        self.price = None
+
+
+
+    def iter_forward(self):
+        """
+        Parcourt l'arbre vers l'avant, une étape à la fois, sans conserver les étapes précédentes.
+
+        Yields:
+            dict: Tableaux de l'étape (step, values, cum_prob, exists, expanded, prob_up, prob_mid, prob_down).
+                  Les probabilités sont nulles pour les nœuds non développés et à la dernière étape.
+        """
+
+        cum_prob = np.ones(1)
+        exists = np.ones(1, dtype=bool)
+
+        for step in range(self.N + 1):
+            size = 2 * step + 1
+            values = self.geometry.layer_values(step)
+
+            if step == self.N:
+                expanded = np.zeros(size, dtype=bool)
+                zeros = np.zeros(size)
+                yield {'step': step, 'values': values, 'cum_prob': cum_prob, 'exists': exists,
+                       'expanded': expanded, 'prob_up': zeros, 'prob_mid': zeros, 'prob_down': zeros}
+                return
+
+            # Même règle de pruning que Tree.build_next_step
+            expanded = exists & (cum_prob >= self.threshold)
+            p_up, p_mid, p_down = self.geometry.layer_probabilities(step)
+            p_up = np.where(expanded, p_up, 0.0)
+            p_mid = np.where(expanded, p_mid, 0.0)
+            p_down = np.where(expanded, p_down, 0.0)
+
+            yield {'step': step, 'values': values, 'cum_prob': cum_prob, 'exists': exists,
+                   'expanded': expanded, 'prob_up': p_up, 'prob_mid': p_mid, 'prob_down': p_down}
+
+            next_cum_prob = np.zeros(size + 2)
+            next_cum_prob[2:] += cum_prob * p_up
+            next_cum_prob[1:size + 1] += cum_prob * p_mid
+            next_cum_prob[:size] += cum_prob * p_down
+
+            next_exists = np.zeros(size + 2, dtype=bool)
+            next_exists[2:] |= expanded
+            next_exists[1:size + 1] |= expanded
+            next_exists[:size] |= expanded
+
+            cum_prob, exists = next_cum_prob, next_exists
+
+
+
+    def backward_step(self, step, values, expanded, p_up, p_mid, p_down, next_option_values):
+        """
+        Calcule les prix de l'option d'une étape à partir de ceux de l'étape suivante.
+
+        Returns:
+            np.ndarray: Prix de l'option aux nœuds de l'étape (nuls pour les nœuds non développés).
+        """
+
+        size = 2 * step + 1
+        continuation = (p_up * next_option_values[2:size + 2]
+                        + p_mid * next_option_values[1:size + 1]
+                        + p_down * next_option_values[:size]) * self.geometry.discount_factor
+        if self.option.style == "american":
+            continuation = np.maximum(continuation, self.geometry.payoff(values))
+        return np.where(expanded, continuation, 0.0)
+
+
+
+    def build(self):
+        """
+        Construit toutes les étapes puis rétropropage les prix de l'option.
+
+        Returns:
+            float: Le prix de l'option à la racine.
+        """
+
+        progress = self.progress_callback
+        if progress is not None:
+            start_time = time.perf_counter()
+            nodes = 0
+
+        for layer in self.iter_forward():
+            self.values.append(layer['values'])
+            self.cum_prob.append(layer['cum_prob'])
+            self.exists.append(layer['exists'])
+            self.expanded.append(layer['expanded'])
+            self.prob_up.append(layer['prob_up'])
+            self.prob_mid.append(layer['prob_mid'])
+            self.prob_down.append(layer['prob_down'])
+            if progress is not None and layer['step'] > 0:
+                nodes += int(layer['exists'].sum())
+                progress({'phase': 'build', 'step': layer['step'], 'total_steps': self.N,
+                          'nodes': nodes + 1, 'elapsed': time.perf_counter() - start_time})
+
+        if progress is not None:
+            start_time = time.perf_counter()
+            nodes = int(self.exists[self.N].sum())
+
+        self.option_values = [None] * (self.N + 1)
+        self.option_values[self.N] = self.geometry.payoff(self.values[self.N])
+        for step in range(self.N - 1, -1, -1):
+            self.option_values[step] = self.backward_step(
+                step, self.values[step], self.expanded[step],
+                self.prob_up[step], self.prob_mid[step], self.prob_down[step],
+                self.option_values[step + 1]
+            )
+            if progress is not None:
+                nodes += int(self.exists[step].sum())
+                progress({'phase': 'backpropagation', 'step': self.N - step, 'total_steps': self.N,
+                          'nodes': nodes, 'elapsed': time.perf_counter() - start_time})
+
+        self.price = float(self.option_values[0][0])
+        return self.price
+
+
+
+    def get_node_count(self):
+        """
+        Retourne le nombre de nœuds existants (hors nœuds non atteints à cause du pruning).
+        """
+
+        return int(sum(exists.sum() for exists in self.exists))
+
+
+
+    def nbytes(self):
+        """
+        Retourne la mémoire occupée par les tableaux du réseau, en octets.
+        """
+
+        arrays = (self.values, self.cum_prob, self.exists, self.expanded,
+                  self.prob_up, self.prob_mid, self.prob_down, self.option_values)
+        return int(sum(layer.nbytes for layers in arrays for layer in layers if layer is not None))
@@ -0,0 +1,194 @@
+import json
+import os
+import numpy as np
+from Core.Lattice import Lattice
+
+
+# Tableaux exportés : un fichier .npy par colonne, tous les nœuds de toutes les étapes bout à bout.
+# Les nœuds de l'étape i occupent les positions i^2 à (i + 1)^2 - 1 (du plus bas au plus haut).
+COLUMNS = {
+    'values': np.float64,
+    'cum_prob': np.float64,
+    'prob_up': np.float64,
+    'prob_mid': np.float64,
+    'prob_down': np.float64,
+    'exists': np.bool_,
+    'expanded': np.bool_,
+    'option_values': np.float64,
+}
+
+METADATA_FILE = 'lattice.json'
+
+
+def step_slice(step):
+    """
+    Positions des nœuds d'une étape dans les tableaux exportés.
+    """
+    return slice(step * step, (step + 1) * (step + 1))
+
+
+
+class _ColumnFile:
+    """
+    Fichier .npy d'une colonne, écrit et relu par tranches avec des accès fichier directs :
+    contrairement à une projection en mémoire, les pages écrites ne restent pas dans
+    la mémoire du processus.
+    """
+
+    def __init__(self, path, dtype, size):
+        # open_memmap écrit l'en-tête .npy et réserve le fichier ; on ne garde que le décalage des données
+        header = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(size,))
+        self.offset = header.offset
+        del header
+        self.dtype = np.dtype(dtype)
+        self.file = open(path, 'r+b')
+
+
+
+    def write(self, positions, values):
+        self.file.seek(self.offset + positions.start * self.dtype.itemsize)
+        self.file.write(np.ascontiguousarray(values, dtype=self.dtype).tobytes())
+
+
+
+    def read(self, positions):
+        self.file.seek(self.offset + positions.start * self.dtype.itemsize)
+        return np.fromfile(self.file, dtype=self.dtype, count=positions.stop - positions.start)
+
+
+
+    def close(self):
+        self.file.close()
+
+
+
+def export_lattice(market, option, N, path, threshold=0.0):
+    """
+    Construit l'arbre et l'écrit dans un répertoire de fichiers .npy (un par colonne),
+    une étape à la fois : la construction vers l'avant (Lattice.iter_forward) écrit chaque
+    étape dès qu'elle est calculée, puis la rétropropagation relit sur disque l'étape i + 1.
+    La mémoire utilisée reste celle d'une étape, quel que soit N.
+
+    Args:
+        market: Instance de la classe Market.
+        option: Instance de la classe Option.
+        N: Nombre d'étapes dans l'arbre.
+        path: Répertoire de destination (créé si besoin).
+        threshold: Seuil de probabilité cumulée pour le pruning des nœuds.
+
+    Returns:
+        LatticeReader: Lecteur du réseau exporté.
+    """
+    os.makedirs(path, exist_ok=True)
+    lattice = Lattice(market, option, N, threshold=threshold)
+    size = (N + 1) * (N + 1)
+    files = {name: _ColumnFile(os.path.join(path, f'{name}.npy'), dtype, size) for name, dtype in COLUMNS.items()}
+
+    try:
+        for layer in lattice.iter_forward():
+            positions = step_slice(layer['step'])
+            for name in COLUMNS:
+                if name != 'option_values':
+                    files[name].write(positions, layer[name])
+
+        next_option_values = lattice.geometry.payoff(files['values'].read(step_slice(N)))
+        files['option_values'].write(step_slice(N), next_option_values)
+        for step in range(N - 1, -1, -1):
+            positions = step_slice(step)
+            next_option_values = lattice.backward_step(
+                step, files['values'].read(positions), files['expanded'].read(positions),
+                files['prob_up'].read(positions), files['prob_mid'].read(positions), files['prob_down'].read(positions),
+                next_option_values
+            )
+            files['option_values'].write(positions, next_option_values)
+    finally:
+        for column in files.values():
+            column.close()
+
+    metadata = {
+        'N': N,
+        'deltaT': lattice.deltaT,
+        'threshold': threshold,
+        'price': float(next_option_values[0]),
+        'market': {'S0': market.S0, 'rate': market.rate, 'sigma': market.sigma, 'dividend': market.dividend,
+                   'ex_div_date': market.ex_div_date.isoformat() if market.ex_div_date else None},
+        'option': {'K': option.K, 'type': option.type, 'style': option.style, 'T': option.T,
+                   'payoff_params': option.payoff_params},
+        'columns': list(COLUMNS),
+    }
+    with open(os.path.join(path, METADATA_FILE), 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+    return LatticeReader(path)
+
+
+
+class LatticeReader:
+    """
+    Lecture paresseuse d'un réseau exporté par export_lattice : les fichiers sont projetés
+    en mémoire à la première utilisation et seules les étapes lues sont chargées.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: Répertoire produit par export_lattice.
+        """
+        self.path = path
+        with open(os.path.join(path, METADATA_FILE)) as f:
+            self.metadata = json.load(f)
+        self.N = self.metadata['N']
+        self.deltaT = self.metadata['deltaT']
+        self.price = self.metadata['price']
+        self._arrays = {}
+
+
+
+    def column(self, name):
+        """
+        Retourne la colonne complète (projetée en mémoire, en lecture seule).
+        """
+        if name not in COLUMNS:
+            raise ValueError(f"Colonne inconnue : {name}")
+        if name not in self._arrays:
+            self._arrays[name] = np.load(os.path.join(self.path, f'{name}.npy'), mmap_mode='r')
+        return self._arrays[name]
+
+
+
+    def step(self, step, columns=None):
+        """
+        Retourne les tableaux d'une étape (vues sur les fichiers projetés).
+
+        Args:
+            step: L'étape de l'arbre, entre 0 et N.
+            columns: Colonnes à lire (par défaut toutes).
+
+        Returns:
+            dict: Nom de colonne -> tableau des 2 * step + 1 nœuds.
+        """
+        if not 0 <= step <= self.N:
+            raise ValueError(f"L'étape doit être comprise entre 0 et {self.N}")
+        positions = step_slice(step)
+        return {name: self.column(name)[positions] for name in (columns or COLUMNS)}
+
+
+
+    def iter_steps(self, step_start=0, step_end=None, columns=None):
+        """
+        Parcourt les étapes de step_start à step_end inclus, une à la fois.
+
+        Yields:
+            tuple: (step, dict des tableaux de l'étape)
+        """
+        step_end = self.N if step_end is None else min(step_end, self.N)
+        for step in range(max(step_start, 0), step_end + 1):
+            yield step, self.step(step, columns)
+
+
+
+    def get_node_count(self):
+        """
+        Retourne le nombre de nœuds existants (hors nœuds non atteints à cause du pruning).
+        """
+        return int(np.count_nonzero(self.column('exists')))
@@ -0,0 +1,152 @@
+import math
+import numpy as np
+from Core import Kernels
+from Core.Tree import Tree
+
+
+class LeisenReimerTree:
+    """
+    Arbre binomial de Leisen-Reimer en mode prix seul (mémoire en O(N)), avec le même
+    choix de backend de noyaux que RollingTree.
+
+    Les probabilités sont obtenues par l'inversion de Peizer-Pratt des quantiles d1 et d2
+    de Black-Scholes, ce qui centre le strike sur l'arbre : la convergence est monotone
+    et d'ordre 2 en 1/N pour les européennes (au lieu de l'erreur oscillante en O(1/N) du
+    trinomial) ; pour les américaines elle reste monotone, avec une erreur bien plus faible
+    à N égal. N doit être impair ; un N pair est arrondi à l'impair supérieur.
+
+    Le dividende discret suit le modèle « escrowed » : l'arbre porte le spot diminué de la
+    valeur actualisée du dividende, qui est rajoutée aux nœuds antérieurs au détachement
+    (même étape de détachement que Tree). La volatilité de ce spot réduit est relevée
+    jusqu'au détachement (pondération en temps de la variance) pour conserver celle du spot.
+    """
+
+    def __init__(self, market, option, N, backend=None):
+        """
+        Initialise l'arbre binomial.
+
+        Args:
+            market: Instance de la classe Market contenant les paramètres du marché.
+            option: Instance de la classe Option contenant les paramètres de l'option.
+            N: Nombre d'étapes demandé (arrondi à l'impair supérieur).
+            backend: Backend des noyaux ("numba" ou "numpy", par défaut celui détecté à l'import).
+        """
+
+        if N <= 0:
+            raise ValueError("Le nombre d'étapes N doit être positif")
+
+        self.market = market
+        self.option = option
+        self.backend = backend or Kernels.BACKEND
+        Kernels.get_kernels(self.backend)
+        self.N = N if N % 2 == 1 else N + 1
+        self.deltaT = float(option.T) / self.N
+        self.discount_factor = math.exp(-market.rate * self.deltaT)
+
+        self.dividend_step = Tree.compute_dividend_step(market, option, self.N)
+        if self.dividend_step is not None and not 0 <= self.dividend_step <= self.N:
+            self.dividend_step = None
+        dividend = float(market.dividend or 0.0) if self.dividend_step is not None else 0.0
+        self.dividend = dividend
+        self.dividend_time = self.dividend_step * self.deltaT if dividend else 0.0
+
+        # Spot « escrowed » : hors valeur actualisée du dividende
+        self.escrowed_S0 = market.S0 - dividend * math.exp(-market.rate * self.dividend_time)
+        if self.escrowed_S0 <= 0:
+            raise ValueError("Le dividende actualisé dépasse le spot")
+
+        # Volatilité du spot escrowed : sigma * S0 / S* jusqu'au détachement, sigma ensuite
+        T = float(option.T)
+        spot_ratio = market.S0 / self.escrowed_S0
+        self.sigma = market.sigma * math.sqrt((spot_ratio ** 2 * self.dividend_time + T - self.dividend_time) / T)
+
+        self.prob_up, self.up, self.down = self.compute_parameters()
+
+        # (u/d)^j pour j = 0..N, partagé par toutes les couches
+        self.ratio_powers = (self.up / self.down) ** np.arange(self.N + 1, dtype=float)
+
+
+
+    @staticmethod
+    def peizer_pratt(z, n):
+        """
+        Inversion de Peizer-Pratt (méthode 2) : probabilité binomiale approchant N(z) sur n pas.
+        """
+
+        factor = z / (n + 1 / 3 + 0.1 / (n + 1))
+        return 0.5 + math.copysign(0.5, z) * math.sqrt(1 - math.exp(-factor ** 2 * (n + 1 / 6)))
+
+
+
+    def compute_parameters(self):
+        """
+        Calcule la probabilité de hausse et les facteurs de hausse et de baisse.
+
+        Returns:
+            tuple: (p, u, d)
+        """
+
+        sigma, rate, T = self.sigma, self.market.rate, self.option.T
+        volatility = sigma * math.sqrt(T)
+        d1 = (math.log(self.escrowed_S0 / self.option.K) + (rate + sigma ** 2 / 2) * T) / volatility
+        d2 = d1 - volatility
+
+        p = self.peizer_pratt(d2, self.N)
+        p_star = self.peizer_pratt(d1, self.N)
+        growth = math.exp(rate * self.deltaT)
+        up = growth * p_star / p
+        down = (growth - p * up) / (1 - p)
+        return p, up, down
+
+
+
+    def layer_values(self, step):
+        """
+        Spots des step + 1 nœuds d'une étape, du plus bas au plus haut (dividende compris).
+        """
+
+        values = self.ratio_powers[:step + 1] * (self.escrowed_S0 * self.down ** step)
+        if self.dividend and step < self.dividend_step:
+            values += self.dividend * math.exp(-self.market.rate * (self.dividend_time - step * self.deltaT))
+        return values
+
+
+
+    def price_option(self, option):
+        """
+        Évalue une option de même maturité par rétropropagation sur un seul tableau :
+        noyau compilé pour les calls et puts avec le backend numba, couches vectorisées sinon.
+
+        Returns:
+            float: Le prix de l'option à la racine.
+        """
+
+        if abs(option.T - self.option.T) > 1e-12:
+            raise ValueError("L'option doit avoir la même maturité que l'arbre")
+
+        p, q = self.prob_up * self.discount_factor, (1 - self.prob_up) * self.discount_factor
+        american = option.style == "american"
+        values = option.payoff_array(self.layer_values(self.N))
+
+        if self.backend == 'numba' and option.type in ("call", "put"):
+            div_step = self.dividend_step if self.dividend else -1
+            return float(Kernels.binomial_backward_numba(
+                values, self.ratio_powers, self.escrowed_S0, self.down, p, q, div_step, self.dividend,
+                self.dividend_time, float(self.market.rate), self.deltaT, american, option.type == "call",
+                float(option.K)
+            ))
+
+        for step in range(self.N - 1, -1, -1):
+            values = p * values[1:] + q * values[:-1]
+            if american:
+                np.maximum(values, option.payoff_array(self.layer_values(step)), out=values)
+        return float(values[0])
+
+
+
+    def get_option_price(self):
+        """
+        Retourne le prix de l'option à la racine.
+        """
+
+        return self.price_option(self.option)
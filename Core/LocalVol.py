@@ -0,0 +1,182 @@
+import numpy as np
+from Core.RollingTree import RollingTree
+
+
+class LocalVolSurface:
+    """
+    Surface de volatilité locale sigma(S, t) définie sur une grille (spots x temps) fournie
+    par l'appelant, interpolée linéairement en temps puis en spot, et prolongée à plat
+    hors de la grille.
+    """
+
+    def __init__(self, spots, times, vols):
+        """
+        Args:
+            spots (array): Spots de la grille, strictement croissants.
+            times (array): Instants de la grille en années, strictement croissants.
+            vols (array): Volatilités locales de forme (len(times), len(spots)).
+        """
+        self.spots = np.asarray(spots, dtype=float)
+        self.times = np.asarray(times, dtype=float)
+        self.vols = np.asarray(vols, dtype=float)
+
+        if self.spots.ndim != 1 or self.times.ndim != 1 or len(self.spots) == 0 or len(self.times) == 0:
+            raise ValueError("spots et times doivent être des listes non vides")
+        if self.vols.shape != (len(self.times), len(self.spots)):
+            raise ValueError(f"vols doit être de forme (len(times), len(spots)) = ({len(self.times)}, {len(self.spots)})")
+        if np.any(np.diff(self.spots) <= 0) or np.any(np.diff(self.times) <= 0):
+            raise ValueError("spots et times doivent être strictement croissants")
+        if not np.all(np.isfinite(self.vols)) or np.any(self.vols <= 0):
+            raise ValueError("Les volatilités locales doivent être positives")
+
+
+
+    def max_vol(self):
+        """
+        Volatilité locale maximale de la surface (majorant sur tout le domaine, grâce à l'interpolation linéaire).
+        """
+        return float(self.vols.max())
+
+
+
+    def slice(self, t):
+        """
+        Courbe de volatilité en spot à l'instant t (interpolation linéaire entre deux dates de la grille).
+
+        Returns:
+            np.ndarray: Volatilités aux spots de la grille.
+        """
+        if t <= self.times[0]:
+            return self.vols[0]
+        if t >= self.times[-1]:
+            return self.vols[-1]
+        i = int(np.searchsorted(self.times, t)) - 1
+        weight = (t - self.times[i]) / (self.times[i + 1] - self.times[i])
+        return (1 - weight) * self.vols[i] + weight * self.vols[i + 1]
+
+
+
+    def __call__(self, S, t):
+        """
+        Évalue sigma(S, t) sur un tableau de spots à un même instant (une couche entière de l'arbre).
+
+        Args:
+            S: Tableau (ou scalaire) de spots.
+            t (float): Instant en années.
+
+        Returns:
+            np.ndarray: Volatilités locales, de même forme que S.
+        """
+        return np.interp(S, self.spots, self.slice(t))
+
+
+
+class LocalVolTree:
+    """
+    Arbre trinomial à volatilité locale en mode prix seul (mémoire en O(N)).
+
+    La géométrie reste celle de RollingTree, S0 * exp(r * i * deltaT) * alpha^j, avec un
+    alpha fixé par la volatilité maximale de la surface : l'arbre recombine toujours et
+    seules les probabilités varient d'un nœud à l'autre. Elles sont obtenues par
+    appariement des moments avec la variance locale exp(sigma(S, t)^2 * deltaT) - 1,
+    sigma étant évaluée sur toute une couche en un seul appel. Dividende discret traité
+    comme dans RollingTree ; pas de pruning.
+    """
+
+    def __init__(self, market, option, N, surface):
+        """
+        Args:
+            market: Instance de la classe Market (market.sigma n'est pas utilisée).
+            option: Instance de la classe Option.
+            N: Nombre d'étapes dans l'arbre.
+            surface (LocalVolSurface): Surface de volatilité locale.
+        """
+        self.market = market
+        self.option = option
+        self.N = N
+        self.surface = surface
+
+        # Géométrie de l'arbre à volatilité constante égale au maximum de la surface
+        reference_vol = max(surface.max_vol(), 1e-8)
+        self.geometry = RollingTree(self._with_sigma(market, reference_vol), option, N)
+        self.deltaT = self.geometry.deltaT
+        self.alpha = self.geometry.alpha
+        self.discount_factor = self.geometry.discount_factor
+        self.dividend_step = self.geometry.dividend_step
+
+
+
+    @staticmethod
+    def _with_sigma(market, sigma):
+        return type(market)(S0=market.S0, rate=market.rate, sigma=sigma,
+                            dividend=market.dividend, ex_div_date=market.ex_div_date)
+
+
+
+    def layer_probabilities(self, step, values):
+        """
+        Probabilités de transition de tous les nœuds d'une étape, à partir de la volatilité locale
+        en chaque nœud (cf. RollingTree.compute_probabilities avec une variance par nœud).
+
+        Args:
+            step: L'étape de l'arbre.
+            values: Spots des nœuds de l'étape.
+
+        Returns:
+            tuple: (p_up, p_mid, p_down), tableaux de taille 2 * step + 1.
+        """
+        alpha = self.alpha
+        sigma = self.surface(values, step * self.deltaT)
+        variance_ratio = np.expm1(sigma ** 2 * self.deltaT)
+        denominator = (1 - alpha) * (alpha ** (-2) - 1)
+
+        if self.dividend_step is None or step + 1 != self.dividend_step:
+            # Espérance égale au nœud central : p_down proportionnelle à la variance et p_up = p_down / alpha,
+            # positives tant que sigma ne dépasse pas la volatilité de référence
+            p_down = variance_ratio / denominator
+            p_up = p_down / alpha
+            return p_up, 1 - p_up - p_down, p_down
+
+        mid_values = (self.geometry.alpha_powers[self.N - step:self.N + step + 1]
+                      * self.market.S0 * self.geometry.growth ** (step + 1))
+        expectation_ratio = 1 - self.market.dividend / mid_values
+
+        second_moment_ratio = variance_ratio + expectation_ratio ** 2
+        p_down = (second_moment_ratio - 1 - (alpha + 1) * (expectation_ratio - 1)) / denominator
+        p_up = (expectation_ratio - 1 - (1 / alpha - 1) * p_down) / (alpha - 1)
+        return p_up, 1 - p_up - p_down, p_down
+
+
+
+    def price_option(self, option):
+        """
+        Évalue une option de même maturité par rétropropagation sur deux couches.
+
+        Returns:
+            float: Le prix de l'option à la racine.
+        """
+        if abs(option.T - self.option.T) > 1e-12:
+            raise ValueError("L'option doit avoir la même maturité que l'arbre")
+
+        american = option.style == "american"
+        option_values = option.payoff_array(self.geometry.layer_values(self.N))
+
+        for step in range(self.N - 1, -1, -1):
+            size = 2 * step + 1
+            values = self.geometry.layer_values(step)
+            p_up, p_mid, p_down = self.layer_probabilities(step, values)
+            option_values = (p_up * option_values[2:size + 2]
+                             + p_mid * option_values[1:size + 1]
+                             + p_down * option_values[:size]) * self.discount_factor
+            if american:
+                np.maximum(option_values, option.payoff_array(values), out=option_values)
+
+        return float(option_values[0])
+
+
+
+    def get_option_price(self):
+        """
+        Retourne le prix de l'option à la racine.
+        """
+        return self.price_option(self.option)
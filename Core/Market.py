@@ -17,4 +17,22 @@ class Market:
         self.rate = rate         
         self.sigma = sigma        
         self.dividend = dividend
-        self.ex_div_date = ex_div_date
\ No newline at end of file
+        self.ex_div_date = ex_div_date
+
+
+
+    def with_overrides(self, S0: float = None, rate: float = None, sigma: float = None):
+        """
+        Copie le marché en remplaçant éventuellement S0, le taux ou la volatilité
+        (dividende et date d'ex-dividende conservés).
+
+        Returns:
+            Market: Nouveau marché.
+        """
+        return Market(
+            S0=self.S0 if S0 is None else S0,
+            rate=self.rate if rate is None else rate,
+            sigma=self.sigma if sigma is None else sigma,
+            dividend=self.dividend,
+            ex_div_date=self.ex_div_date
+        )
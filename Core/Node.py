@@ -18,6 +18,7 @@ class Node:
 
         self.option_price = 0
         self.cum_prob = 0
+        self.exercised = False
         
         self.up_neighbor = None
         self.down_neighbor = None
@@ -100,9 +101,14 @@ class Node:
 
 
 
-    def calculate_option_price(self, r: float, deltaT: float):
+    def calculate_option_price(self, r: float, deltaT: float, exercise_value: float = None):
         """
         Calcule le prix de l'option à ce nœud en fonction des prix des nœuds voisins en avant.
+
+        Args:
+            r: Taux sans risque.
+            deltaT: Pas de temps.
+            exercise_value: Valeur d'exercice immédiat déjà calculée pour la couche (option américaine).
         """
         # Si c'est un nœud terminal (pas de voisins en avant), le prix est déjà défini (payoff)
         if (
@@ -129,13 +135,18 @@ class Node:
 
         # Si option américaine, comparer avec la valeur d’exercice immédiat
         if self.tree.option.style == "american":
-            immediate_exercise_value = self.tree.option.payoff(self.value)
+            if exercise_value is None:
+                exercise_value = self.tree.option.payoff(self.value)
+            immediate_exercise_value = exercise_value
             american_option_price = max(price, immediate_exercise_value)
             self.option_price = american_option_price
+            # Exercice anticipé optimal : utilisé pour la frontière d'exercice
+            self.exercised = immediate_exercise_value > 0 and immediate_exercise_value >= price
 
         else :
             # Enregistrement du prix de l’option dans ce nœud
             self.option_price = price
+            self.exercised = False
 
 
     
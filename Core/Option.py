@@ -1,54 +1,159 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+import numpy as np
 
 class Option:
 
-    def __init__(self, K: float, opt_type: str = "call", style: str = "european", 
-                 T: float = None, start_date: str = None, maturity_date: str = None):
+    # Registre des payoffs vectorisés : nom -> fonction (S: np.ndarray, option) -> np.ndarray
+    PAYOFFS = {}
+
+    def __init__(self, K: float, opt_type: str = "call", style: str = "european",
+                 T: float = None, start_date: str = None, maturity_date: str = None,
+                 payoff_params: dict = None):
         """
         Initialise une option avec soit T directement, soit des dates pour calculer T
-        
+
         Args:
             K: Strike price
-            opt_type: "call" ou "put"
+            opt_type: Nom d'un payoff enregistré ("call", "put", "digital_call", ...)
             style: "european" ou "american"
             T: Maturité en années (optionnel si dates fournies)
             start_date: Date de début au format YYYY-MM-DD
             maturity_date: Date de maturité au format YYYY-MM-DD
+            payoff_params: Paramètres propres au payoff (ex: {"cap": 20} pour un capped call)
         """
 
         self.K = K
         self.type = opt_type
         self.style = style
-        
+        self.payoff_params = payoff_params or {}
+
         if T is not None:
             self.T = T
             self.start_date = None
             self.end_date = None
-        
+
         elif start_date is not None and maturity_date is not None:
             self.start_date = datetime.strptime(start_date, '%Y-%m-%d')
             self.end_date = datetime.strptime(maturity_date, '%Y-%m-%d')
             self.T = (self.end_date - self.start_date).days / 365.0
-        
+
         else:
             raise ValueError("Soit T, soit start_date et maturity_date doivent être fournis")
 
 
-    
+
+    def with_maturity(self, T: float):
+        """
+        Copie l'option avec une maturité T donnée directement. Si l'option a des dates, la date
+        de départ est conservée et l'échéance décalée en jours, pour que l'étape de dividende
+        reste calculée à partir de la date de départ et non de la date du jour.
+
+        Args:
+            T: Nouvelle maturité en années
+
+        Returns:
+            Option: Nouvelle option
+        """
+        option = Option(K=self.K, opt_type=self.type, style=self.style, T=T, payoff_params=self.payoff_params)
+        if self.start_date is not None and self.end_date is not None:
+            option.start_date = self.start_date
+            option.end_date = self.start_date + timedelta(days=T * 365.0)
+        return option
+
+
+
+    @classmethod
+    def register_payoff(cls, name: str):
+        """
+        Décorateur enregistrant un payoff vectorisé sous un nom de type d'option.
+        La fonction reçoit un tableau de spots (de forme quelconque : couche de l'arbre,
+        matrice de trajectoires...) et l'option, et retourne un tableau de même forme.
+
+        Args:
+            name: Nom du type d'option (valeur de opt_type)
+        """
+        def decorator(func):
+            cls.PAYOFFS[name] = func
+            return func
+        return decorator
+
+
+
+    def payoff_array(self, S) -> np.ndarray:
+        """
+        Calcule le payoff sur un tableau de spots en une seule opération vectorisée
+
+        Args:
+            S: Tableau (ou scalaire) de prix du sous-jacent
+
+        Returns:
+            np.ndarray: Payoffs de l'option, de même forme que S
+        """
+        payoff_function = self.PAYOFFS.get(self.type)
+        if payoff_function is None:
+            raise ValueError(f"Type d'option invalide : doit être parmi {', '.join(sorted(self.PAYOFFS))}")
+        return payoff_function(np.asarray(S, dtype=float), self)
+
+
+
     def payoff(self, S: float) -> float:
         """
         Calcule le payoff au noeud final
-        
+
         Args:
             S: Prix du sous-jacent au noeud final
-        
+
         Returns:
             float: Payoff de l'option
         """
-        
-        if self.type == "call":
-            return max(S - self.K, 0)
-        elif self.type == "put":
-            return max(self.K - S, 0)
-        else:
-            raise ValueError("Type d'option invalide : doit être 'call' ou 'put'")
\ No newline at end of file
+
+        return float(self.payoff_array(S))
+
+
+
+@Option.register_payoff("call")
+def call_payoff(S, option):
+    return np.maximum(S - option.K, 0.0)
+
+
+@Option.register_payoff("put")
+def put_payoff(S, option):
+    return np.maximum(option.K - S, 0.0)
+
+
+@Option.register_payoff("digital_call")
+def digital_call_payoff(S, option):
+    return np.where(S > option.K, option.payoff_params.get('cash', 1.0), 0.0)
+
+
+@Option.register_payoff("digital_put")
+def digital_put_payoff(S, option):
+    return np.where(S < option.K, option.payoff_params.get('cash', 1.0), 0.0)
+
+
+@Option.register_payoff("gap_call")
+def gap_call_payoff(S, option):
+    # Payé S - K dès que S dépasse le seuil de déclenchement (par défaut K)
+    trigger = option.payoff_params.get('trigger', option.K)
+    return np.where(S > trigger, S - option.K, 0.0)
+
+
+@Option.register_payoff("gap_put")
+def gap_put_payoff(S, option):
+    trigger = option.payoff_params.get('trigger', option.K)
+    return np.where(S < trigger, option.K - S, 0.0)
+
+
+@Option.register_payoff("power_call")
+def power_call_payoff(S, option):
+    return np.maximum(S ** option.payoff_params.get('power', 2.0) - option.K, 0.0)
+
+
+@Option.register_payoff("power_put")
+def power_put_payoff(S, option):
+    return np.maximum(option.K - S ** option.payoff_params.get('power', 2.0), 0.0)
+
+
+@Option.register_payoff("capped_call")
+def capped_call_payoff(S, option):
+    return np.minimum(np.maximum(S - option.K, 0.0), option.payoff_params.get('cap', np.inf))
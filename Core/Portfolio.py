@@ -0,0 +1,198 @@
+from concurrent.futures import ProcessPoolExecutor
+from Core.BlackScholes import BlackScholes
+from Core.Market import Market
+from Core.Option import Option
+from Core.RollingTree import RollingTree
+
+
+class Position:
+
+    def __init__(self, quantity: float, market: Market, option: Option, N: int, position_id=None):
+        """
+        Initialise une position du portefeuille.
+
+        Args:
+            quantity (float): Quantité détenue (négative pour une position vendeuse).
+            market (Market): Le marché du sous-jacent.
+            option (Option): L'option détenue.
+            N (int): Le nombre de pas de l'arbre trinomial.
+            position_id: Identifiant libre de la position (par défaut son indice).
+        """
+        self.quantity = quantity
+        self.market = market
+        self.option = option
+        self.N = N
+        self.position_id = position_id
+
+
+
+    def group_key(self):
+        """
+        Clé de regroupement : positions partageant sous-jacent, maturité et N,
+        donc le même arbre trinomial.
+
+        Returns:
+            tuple: Clé hashable du groupe.
+        """
+        return (
+            self.market.S0, self.market.rate, self.market.sigma, self.market.dividend, self.market.ex_div_date,
+            self.option.T, self.option.start_date, self.option.end_date, self.N
+        )
+
+
+
+def _lattice_prices(market, options, N):
+    """
+    Prépare une seule géométrie d'arbre (mode prix seul) pour le marché donné
+    et y évalue toutes les options.
+    """
+    tree = RollingTree(market, options[0], N)
+    return [tree.price_option(option) for option in options]
+
+
+
+def compute_group_risk(market, options, N):
+    """
+    Calcule prix et Greeks de toutes les options d'un groupe : chaque arbre choqué
+    est construit une seule fois et partagé par toutes les options du groupe.
+    Les chocs reprennent ceux de la classe Greeks. Les options doivent partager la
+    maturité et les dates (même groupe au sens de Position.group_key).
+
+    Args:
+        market (Market): Le marché commun aux options.
+        options (list): Options du groupe.
+        N (int): Le nombre de pas des arbres.
+
+    Returns:
+        list: Un dictionnaire {price, delta, gamma, theta, vega, rho, bs_price} par option.
+    """
+    S0, sigma, rate, T = market.S0, market.sigma, market.rate, options[0].T
+
+    base = _lattice_prices(market, options, N)
+    delta_up = _lattice_prices(market.with_overrides(S0=S0 + Portfolio.delta_bump), options, N)
+    delta_down = _lattice_prices(market.with_overrides(S0=S0 - Portfolio.delta_bump), options, N)
+    gamma_up = _lattice_prices(market.with_overrides(S0=S0 + Portfolio.gamma_bump), options, N)
+    gamma_down = _lattice_prices(market.with_overrides(S0=S0 - Portfolio.gamma_bump), options, N)
+    vega_up = _lattice_prices(market.with_overrides(sigma=sigma + Portfolio.vega_bump), options, N)
+    # Différence avant quand la volatilité choquée à la baisse ne serait plus positive
+    vega_one_sided = sigma <= Portfolio.vega_bump
+    vega_down = base if vega_one_sided else _lattice_prices(market.with_overrides(sigma=sigma - Portfolio.vega_bump), options, N)
+    vega_width = Portfolio.vega_bump if vega_one_sided else 2 * Portfolio.vega_bump
+    rho_up = _lattice_prices(market.with_overrides(rate=rate + Portfolio.rho_bump), options, N)
+    rho_down = _lattice_prices(market.with_overrides(rate=rate - Portfolio.rho_bump), options, N)
+    theta_up = _lattice_prices(market, [o.with_maturity(T + Portfolio.theta_bump) for o in options], N)
+    # Différence avant quand la maturité choquée à la baisse ne serait plus positive
+    theta_one_sided = T <= Portfolio.theta_bump
+    theta_down = base if theta_one_sided else _lattice_prices(market, [o.with_maturity(T - Portfolio.theta_bump) for o in options], N)
+    theta_width = Portfolio.theta_bump if theta_one_sided else 2 * Portfolio.theta_bump
+
+    bs_prices = BlackScholes.batch_price(
+        S0, [o.K for o in options], T, rate, sigma, [o.type == "call" for o in options]
+    )
+
+    results = []
+    for i in range(len(options)):
+        results.append({
+            'price': base[i],
+            'delta': (delta_up[i] - delta_down[i]) / (2 * Portfolio.delta_bump),
+            'gamma': (gamma_up[i] - 2 * base[i] + gamma_down[i]) / Portfolio.gamma_bump ** 2,
+            'theta': -(theta_up[i] - theta_down[i]) / theta_width / 365,
+            'vega': (vega_up[i] - vega_down[i]) / vega_width / 100,
+            'rho': (rho_up[i] - rho_down[i]) / (2 * Portfolio.rho_bump) / 100,
+            # Black-Scholes n'est défini ici que pour les calls et puts vanilles
+            'bs_price': float(bs_prices[i]) if options[i].type in ("call", "put") else None
+        })
+    return results
+
+
+
+class Portfolio:
+    """
+    Portefeuille d'options : agrège prix et Greeks des positions en regroupant
+    celles qui partagent un même arbre, les groupes étant traités en parallèle.
+    """
+
+    # Chocs identiques à ceux de la classe Greeks
+    delta_bump = 0.001
+    gamma_bump = 3.1
+    theta_bump = 1 / 365
+    vega_bump = 0.01
+    rho_bump = 0.01
+
+    GREEK_NAMES = ['price', 'delta', 'gamma', 'theta', 'vega', 'rho']
+
+    def __init__(self, positions=None, max_workers=None):
+        """
+        Initialise le portefeuille.
+
+        Args:
+            positions (list): Liste d'instances de Position.
+            max_workers (int): Nombre maximal de processus (None = nombre de CPU, 1 = séquentiel).
+        """
+        self.positions = list(positions) if positions else []
+        self.max_workers = max_workers
+
+
+
+    def add_position(self, position: Position):
+        """
+        Ajoute une position au portefeuille.
+        """
+        self.positions.append(position)
+
+
+
+    def group_positions(self):
+        """
+        Regroupe les indices des positions par arbre partagé.
+
+        Returns:
+            dict: Clé de groupe -> liste d'indices de positions.
+        """
+        groups = {}
+        for index, position in enumerate(self.positions):
+            groups.setdefault(position.group_key(), []).append(index)
+        return groups
+
+
+
+    def compute_risk(self):
+        """
+        Calcule prix et Greeks par position puis les agrège sur le portefeuille.
+
+        Returns:
+            dict: {'positions': [...], 'total': {...}, 'group_count': int}
+        """
+        groups = list(self.group_positions().values())
+        tasks = [
+            (self.positions[indices[0]].market, [self.positions[i].option for i in indices], self.positions[indices[0]].N)
+            for indices in groups
+        ]
+
+        if len(tasks) > 1 and self.max_workers != 1:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                group_results = list(executor.map(compute_group_risk, *zip(*tasks)))
+        else:
+            group_results = [compute_group_risk(*task) for task in tasks]
+
+        per_position = [None] * len(self.positions)
+        for indices, results in zip(groups, group_results):
+            for index, result in zip(indices, results):
+                position = self.positions[index]
+                per_position[index] = {
+                    'id': position.position_id if position.position_id is not None else index,
+                    'quantity': position.quantity,
+                    **result,
+                    'market_value': position.quantity * result['price']
+                }
+
+        total = {
+            name: sum(p['quantity'] * p[name] for p in per_position)
+            for name in self.GREEK_NAMES
+        }
+
+        return {
+            'positions': per_position,
+            'total': total,
+            'group_count': len(groups)
+        }
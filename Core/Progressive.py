@@ -0,0 +1,107 @@
+import time
+from Core.RollingTree import RollingTree
+
+
+class ProgressivePricer:
+    """
+    Pricing sous contrainte de temps : l'arbre (mode prix seul) est évalué pour des N
+    doublés à chaque niveau, tant que le niveau suivant tient dans le budget. Le coût
+    d'un niveau est prédit à partir du précédent (coût en O(N^2), donc x4 en doublant N).
+
+    L'erreur de l'arbre est en O(1/N) mais oscille avec la position du strike entre
+    deux nœuds : l'extrapolation de Richardson P* = 2 * P(2N) - P(N) n'améliore pas
+    systématiquement le prix et n'est donc appliquée que sur demande (extrapolate=True).
+    """
+
+    def __init__(self, market, option, max_N, deadline_ms, initial_N=16, threshold=0.0, extrapolate=False):
+        """
+        Args:
+            market: Instance de la classe Market.
+            option: Instance de la classe Option.
+            max_N (int): N maximal (celui demandé par l'appelant).
+            deadline_ms (float): Budget de calcul en millisecondes.
+            initial_N (int): N du premier niveau, toujours calculé.
+            threshold (float): Seuil de pruning des arbres.
+            extrapolate (bool): True pour retourner le prix extrapolé de Richardson.
+        """
+        if deadline_ms <= 0:
+            raise ValueError("deadline_ms doit être positif")
+        if max_N <= 0:
+            raise ValueError("Le nombre d'étapes N doit être positif")
+
+        self.market = market
+        self.option = option
+        self.max_N = max_N
+        self.deadline_ms = deadline_ms
+        self.initial_N = min(initial_N, max_N)
+        self.threshold = threshold
+        self.extrapolate = extrapolate
+
+
+
+    def _levels(self):
+        N = self.initial_N
+        while N < self.max_N:
+            yield N
+            N *= 2
+        yield self.max_N
+
+
+
+    def price(self):
+        """
+        Calcule le meilleur prix possible dans le budget.
+
+        Returns:
+            dict: {'price', 'N_used', 'raw_price', 'extrapolated', 'error_estimate',
+                   'elapsed_ms', 'deadline_ms', 'completed', 'levels'}
+        """
+        start = time.perf_counter()
+        deadline = start + self.deadline_ms / 1000
+        levels = []
+        last_cost = None
+        previous_N = None
+
+        for N in self._levels():
+            if last_cost is not None:
+                # Coût prédit du niveau suivant, proportionnel à N^2
+                predicted = last_cost * (N / previous_N) ** 2
+                if time.perf_counter() + predicted > deadline:
+                    break
+
+            level_start = time.perf_counter()
+            price = RollingTree(self.market, self.option, N, threshold=self.threshold).get_option_price()
+            last_cost = time.perf_counter() - level_start
+            level = {'N': N, 'price': price, 'time_ms': last_cost * 1000}
+
+            # Richardson entre N et N / 2 (seulement pour un vrai doublement)
+            if levels and N == 2 * levels[-1]['N']:
+                level['extrapolated'] = 2 * price - levels[-1]['price']
+            levels.append(level)
+            previous_N = N
+
+        best = levels[-1]
+        extrapolated = self.extrapolate and 'extrapolated' in best
+        result_price = best['extrapolated'] if extrapolated else best['price']
+
+        # Erreur estimée : écart entre les deux dernières estimations de même nature
+        error_estimate = None
+        if len(levels) >= 2:
+            previous = levels[-2]
+            if extrapolated and 'extrapolated' in previous:
+                error_estimate = abs(best['extrapolated'] - previous['extrapolated'])
+            else:
+                error_estimate = abs(best['price'] - previous['price'])
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        return {
+            'price': result_price,
+            'N_used': best['N'],
+            'raw_price': best['price'],
+            'extrapolated': extrapolated,
+            'error_estimate': error_estimate,
+            'elapsed_ms': elapsed_ms,
+            'deadline_ms': self.deadline_ms,
+            'completed': best['N'] == self.max_N,
+            'levels': levels
+        }
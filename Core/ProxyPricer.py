@@ -0,0 +1,238 @@
+import time
+import warnings
+import numpy as np
+from numpy.polynomial import chebyshev
+from Core.LeisenReimer import LeisenReimerTree
+from Core.Market import Market
+from Core.Option import Option
+from Core.RollingTree import RollingTree
+
+
+ENGINES = {'trinomial': RollingTree, 'leisen_reimer': LeisenReimerTree}
+
+
+class ChebyshevProxy:
+    """
+    Pricer proxy d'une option : les prix de l'arbre sont précalculés sur une grille de
+    Chebyshev en spot (et, en option, en volatilité et en maturité), puis les cotations
+    sont obtenues par évaluation du polynôme interpolant, en quelques microsecondes.
+    Delta et gamma sont les dérivées du polynôme en spot.
+
+    La précision est contrôlée contre l'arbre complet en des points hors grille : si l'écart
+    dépasse la tolérance, la grille est raffinée (N doublé, degré en spot augmenté de moitié)
+    au plus max_refinements fois, puis un avertissement est émis et chaque cotation porte
+    within_tolerance=False. La grille est reconstruite automatiquement quand une cotation
+    sort de son domaine. Le prix de l'arbre oscille légèrement avec le spot (position du
+    strike entre deux nœuds) : l'écart au proxy ne descend pas sous cette oscillation,
+    plus faible avec le moteur "leisen_reimer".
+    """
+
+    def __init__(self, market: Market, option: Option, N=400, spot_width=0.4, spot_degree=48,
+                 vol_range=None, vol_degree=6, time_range=None, time_degree=6,
+                 engine='trinomial', tolerance=1e-2, check_points=8, max_refinements=2):
+        """
+        Args:
+            market (Market): Marché de référence (le spot centre la grille).
+            option (Option): Option à coter.
+            N (int): Nombre de pas des arbres de la grille.
+            spot_width (float): Demi-largeur relative du domaine en spot ([S0 (1 - w), S0 (1 + w)]).
+            spot_degree (int): Nombre de nœuds de Chebyshev en spot.
+            vol_range (tuple): Domaine (sigma_min, sigma_max), ou None pour figer la volatilité.
+            vol_degree (int): Nombre de nœuds en volatilité.
+            time_range (tuple): Domaine (T_min, T_max) en années, ou None pour figer la maturité.
+            time_degree (int): Nombre de nœuds en maturité.
+            engine (str): "trinomial" ou "leisen_reimer".
+            tolerance (float): Écart absolu toléré face à l'arbre complet.
+            check_points (int): Nombre de points de contrôle après chaque construction.
+            max_refinements (int): Nombre maximal de raffinements quand le contrôle échoue.
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Moteur inconnu : {engine} (parmi {', '.join(ENGINES)})")
+        if not 0 < spot_width < 1:
+            raise ValueError("spot_width doit être compris entre 0 et 1")
+
+        self.market = market
+        self.option = option
+        self.N = N
+        self.spot_width = spot_width
+        self.engine = engine
+        self.tolerance = tolerance
+        self.check_points = check_points
+        self.max_refinements = max_refinements
+        self.degrees = (spot_degree, vol_degree if vol_range else 1, time_degree if time_range else 1)
+        self.vol_range = tuple(vol_range) if vol_range else None
+        self.time_range = tuple(time_range) if time_range else None
+        self.rebuilds = 0
+        self.refinements = 0
+        self.build_within_tolerance(market.S0)
+
+
+
+    def _engine_price(self, S, sigma, T):
+        market = self.market.with_overrides(S0=S, sigma=sigma)
+        # Maturité changée en conservant les dates : le dividende reste placé depuis la date de départ
+        option = self.option if T == self.option.T else self.option.with_maturity(T)
+        return ENGINES[self.engine](market, option, self.N).get_option_price()
+
+
+
+    @staticmethod
+    def _nodes(lo, hi, n):
+        """
+        Nœuds de Chebyshev de première espèce sur [lo, hi] (points dans [-1, 1] et points du domaine).
+        """
+        if n == 1:
+            return np.zeros(1), np.array([0.5 * (lo + hi)])
+        x = np.cos(np.pi * (np.arange(n) + 0.5) / n)
+        return x, lo + (x + 1) * (hi - lo) / 2
+
+
+
+    def build(self, center_spot):
+        """
+        Précalcule la grille centrée sur center_spot et les coefficients de Chebyshev.
+        """
+        start = time.perf_counter()
+        self.domains = [
+            (center_spot * (1 - self.spot_width), center_spot * (1 + self.spot_width)),
+            self.vol_range or (self.market.sigma, self.market.sigma),
+            self.time_range or (self.option.T, self.option.T)
+        ]
+        nodes = [self._nodes(lo, hi, n) for (lo, hi), n in zip(self.domains, self.degrees)]
+
+        values = np.empty(self.degrees)
+        for i, S in enumerate(nodes[0][1]):
+            for j, sigma in enumerate(nodes[1][1]):
+                for k, T in enumerate(nodes[2][1]):
+                    values[i, j, k] = self._engine_price(S, sigma, T)
+
+        # Interpolation exacte aux nœuds, axe par axe : c = V^-1 f
+        coefficients = values
+        for axis, ((x, _), n) in enumerate(zip(nodes, self.degrees)):
+            inverse = np.linalg.inv(chebyshev.chebvander(x, n - 1))
+            coefficients = np.moveaxis(np.tensordot(inverse, coefficients, axes=([1], [axis])), 0, axis)
+        self.coefficients = coefficients
+        self.spot_derivatives = [chebyshev.chebder(coefficients, m=order) for order in (1, 2)]
+        self._reduced_key = None
+        self.build_time = time.perf_counter() - start
+        self.max_error = self.check_error(self.check_points)
+
+
+
+    def build_within_tolerance(self, center_spot):
+        """
+        Construit la grille puis la raffine tant que le contrôle d'erreur échoue (au plus
+        max_refinements fois) ; avertit si la tolérance n'est toujours pas atteinte.
+        """
+        self.build(center_spot)
+        while not self.within_tolerance and self.refinements < self.max_refinements:
+            self.refinements += 1
+            self.N *= 2
+            self.degrees = (int(round(self.degrees[0] * 1.5)),) + self.degrees[1:]
+            self.build(center_spot)
+        if not self.within_tolerance:
+            warnings.warn(f"Proxy hors tolérance : écart {self.max_error:.4g} > {self.tolerance:g} "
+                          f"(N={self.N}, degré en spot {self.degrees[0]})", RuntimeWarning)
+
+
+
+    def _contains(self, value, axis):
+        lo, hi = self.domains[axis]
+        return np.all((value >= lo - 1e-12) & (value <= hi + 1e-12))
+
+
+
+    def _ensure_domain(self, S, sigma, T):
+        """
+        Reconstruit la grille si la cotation sort du domaine : recentrage en spot, extension en volatilité et maturité.
+        """
+        rebuild = not self._contains(S, 0)
+        if sigma != self.market.sigma and (self.vol_range is None or not self._contains(sigma, 1)):
+            if self.vol_range is None:
+                raise ValueError("Volatilité figée : construire le proxy avec vol_range pour coter d'autres volatilités")
+            self.vol_range = (min(self.vol_range[0], sigma), max(self.vol_range[1], sigma))
+            rebuild = True
+        if T != self.option.T and (self.time_range is None or not self._contains(T, 2)):
+            if self.time_range is None:
+                raise ValueError("Maturité figée : construire le proxy avec time_range pour coter d'autres maturités")
+            self.time_range = (min(self.time_range[0], T), max(self.time_range[1], T))
+            rebuild = True
+
+        if rebuild:
+            spots = np.atleast_1d(S)
+            center = 0.5 * (spots.min() + spots.max())
+            if spots.max() > center * (1 + self.spot_width) or spots.min() < center * (1 - self.spot_width):
+                raise ValueError("Spots demandés trop dispersés pour la largeur du domaine (augmenter spot_width)")
+            self.build_within_tolerance(center if not self._contains(S, 0) else 0.5 * sum(self.domains[0]))
+            self.rebuilds += 1
+        return rebuild
+
+
+
+    def _to_unit(self, value, axis):
+        lo, hi = self.domains[axis]
+        if hi == lo:
+            return np.zeros_like(np.asarray(value, dtype=float))
+        return (np.asarray(value, dtype=float) - lo) * 2 / (hi - lo) - 1
+
+
+
+    def _spot_coefficients(self, sigma, T):
+        """
+        Coefficients en spot seul pour une volatilité et une maturité données (prix, dérivées
+        première et seconde), mémorisés pour le dernier couple (sigma, T) coté.
+        """
+        key = (sigma, T)
+        if self._reduced_key != key:
+            unit_sigma, unit_T = self._to_unit(sigma, 1), self._to_unit(T, 2)
+            self._reduced = [
+                chebyshev.chebval(unit_sigma, np.moveaxis(chebyshev.chebval(unit_T, np.moveaxis(c, 2, 0)), 1, 0))
+                for c in [self.coefficients] + self.spot_derivatives
+            ]
+            self._reduced_key = key
+        return self._reduced
+
+
+
+    def quote(self, S, sigma=None, T=None):
+        """
+        Cote l'option par le proxy.
+
+        Args:
+            S: Spot (scalaire ou tableau).
+            sigma (float): Volatilité (par défaut celle du marché).
+            T (float): Maturité (par défaut celle de l'option).
+
+        Returns:
+            dict: {'price', 'delta', 'gamma', 'rebuilt', 'within_tolerance'}, scalaires ou tableaux comme S.
+        """
+        sigma = self.market.sigma if sigma is None else sigma
+        T = self.option.T if T is None else T
+        rebuilt = self._ensure_domain(S, sigma, T)
+
+        scale = 2 / (self.domains[0][1] - self.domains[0][0])
+        x = self._to_unit(S, 0)
+        price, delta, gamma = (chebyshev.chebval(x, c) for c in self._spot_coefficients(sigma, T))
+        delta, gamma = delta * scale, gamma * scale ** 2
+        if np.ndim(S) == 0:
+            price, delta, gamma = float(price), float(delta), float(gamma)
+        return {'price': price, 'delta': delta, 'gamma': gamma, 'rebuilt': rebuilt,
+                'within_tolerance': self.within_tolerance}
+
+
+
+    def check_error(self, n_points=8, seed=0):
+        """
+        Compare le proxy à l'arbre complet en des points tirés au hasard dans le domaine.
+
+        Returns:
+            float: Écart absolu maximal (self.within_tolerance indique s'il respecte la tolérance).
+        """
+        rng = np.random.default_rng(seed)
+        max_error = 0.0
+        for _ in range(n_points):
+            S, sigma, T = (rng.uniform(lo, hi) if hi > lo else lo for lo, hi in self.domains)
+            proxy = float(chebyshev.chebval(self._to_unit(S, 0), self._spot_coefficients(sigma, T)[0]))
+            max_error = max(max_error, abs(proxy - self._engine_price(S, sigma, T)))
+        self.within_tolerance = max_error <= self.tolerance
+        return max_error
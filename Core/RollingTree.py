@@ -0,0 +1,374 @@
+import math
+import numpy as np
+from Core import Kernels
+from Core.Tree import Tree
+
+
+class RollingTree:
+    """
+    Arbre trinomial en mode « prix seul » : même réseau que Tree (pruning compris),
+    mais aucun nœud n'est matérialisé. La couche finale est calculée à partir de la
+    position fermée des nœuds, S0 * exp(r * i * deltaT) * alpha^j, et la rétropropagation
+    alterne entre deux tableaux réutilisés : la mémoire est en O(N) au lieu de O(N^2).
+
+    À utiliser pour les calculs qui n'ont besoin que du prix à la racine (Greeks par chocs,
+    convergence, évaluation en lot). Tree reste nécessaire pour le visualiseur.
+    """
+
+    def __init__(self, market, option, N, threshold=0.0, backend=None):
+        """
+        Initialise l'arbre en mode prix seul.
+
+        Args:
+            market: Instance de la classe Market contenant les paramètres du marché.
+            option: Instance de la classe Option contenant les paramètres de l'option.
+            N: Nombre d'étapes dans l'arbre.
+            threshold: Seuil de probabilité cumulée pour le pruning des nœuds.
+            backend: Backend des noyaux ("numba" ou "numpy", par défaut celui détecté à l'import).
+        """
+
+        self.N = N
+        self.market = market
+        self.option = option
+        self.threshold = threshold
+        self.backend = backend or Kernels.BACKEND
+        self.propagate_cum_prob, self.backward_induction = Kernels.get_kernels(self.backend)
+
+        self.deltaT = float(option.T) / float(N)
+        self.alpha = math.exp(market.sigma * math.sqrt(3 * self.deltaT))
+        self.discount_factor = math.exp(-market.rate * self.deltaT)
+        self.growth = math.exp(market.rate * self.deltaT)
+
+        # Le dividende n'est appliqué que s'il tombe dans l'arbre (même règle que Tree)
+        self.dividend_step = Tree.compute_dividend_step(market, option, N)
+        if self.dividend_step is not None and not 0 <= self.dividend_step <= N:
+            self.dividend_step = None
+
+        # alpha^j pour j = -N..N, partagé par toutes les couches
+        self.alpha_powers = self.alpha ** np.arange(-N, N + 1, dtype=float)
+
+        # Probabilités constantes hors étape précédant le dividende
+        self.prob_up, self.prob_mid, self.prob_down = self.compute_probabilities(1.0)
+        if self.dividend_step is not None and self.dividend_step >= 1:
+            self.div_probs = tuple(np.ascontiguousarray(p) for p in self.layer_probabilities(self.dividend_step - 1))
+        else:
+            self.div_probs = (np.empty(0), np.empty(0), np.empty(0))
+
+        # Étendue des nœuds développés par étape : tout l'arbre sans pruning
+        if threshold > 0:
+            self.lo, self.hi = self.propagate_cum_prob(
+                N, self.prob_up, self.prob_mid, self.prob_down, self._div_step_code(), *self.div_probs, threshold
+            )
+            if self.hi[0] < self.lo[0] or (N > 0 and self.hi[N - 1] < self.lo[N - 1]):
+                raise ValueError(f"Pruning trop agressif avec threshold={threshold} : aucun nœud développé")
+        else:
+            self.lo = np.zeros(N + 1, dtype=np.int64)
+            self.hi = 2 * np.arange(N + 1, dtype=np.int64)
+
+
+
+    def _div_step_code(self):
+        return -1 if self.dividend_step is None else self.dividend_step
+
+
+
+    def compute_probabilities(self, expectation_ratio):
+        """
+        Calcule les probabilités de transition par appariement des moments (cf. Node.compute_probabilities).
+
+        Args:
+            expectation_ratio: Espérance du spot suivant divisée par la valeur du nœud central
+                (1 sans dividende, scalaire ou tableau).
+
+        Returns:
+            tuple: (p_up, p_mid, p_down)
+        """
+
+        alpha = self.alpha
+        variance_ratio = math.exp(self.market.sigma ** 2 * self.deltaT) - 1
+        second_moment_ratio = variance_ratio + expectation_ratio ** 2
+
+        p_down = ((second_moment_ratio - 1 - (alpha + 1) * (expectation_ratio - 1))
+                  / ((1 - alpha) * (alpha ** (-2) - 1)))
+        p_up = (expectation_ratio - 1 - (1 / alpha - 1) * p_down) / (alpha - 1)
+        p_mid = 1 - p_up - p_down
+        return p_up, p_mid, p_down
+
+
+
+    def layer_values(self, step, out=None):
+        """
+        Calcule les valeurs du sous-jacent d'une étape, de la plus basse à la plus haute.
+
+        Args:
+            step: L'étape de l'arbre.
+            out: Tableau de sortie optionnel de taille 2 * step + 1.
+
+        Returns:
+            np.ndarray: Valeurs des 2 * step + 1 nœuds de l'étape.
+        """
+
+        powers = self.alpha_powers[self.N - step:self.N + step + 1]
+        values = np.multiply(powers, self.market.S0 * self.growth ** step, out=out)
+        if step == self.dividend_step:
+            values -= self.market.dividend
+        return values
+
+
+
+    def layer_probabilities(self, step):
+        """
+        Retourne les probabilités de transition des nœuds d'une étape.
+
+        Returns:
+            tuple: (p_up, p_mid, p_down), scalaires ou tableaux pour l'étape précédant le dividende.
+        """
+
+        if self.dividend_step is not None and step + 1 == self.dividend_step:
+            # Valeurs avant détachement : le dividende ne réduit que l'espérance
+            mid_values = self.alpha_powers[self.N - step:self.N + step + 1] * self.market.S0 * self.growth ** (step + 1)
+            return self.compute_probabilities(1 - self.market.dividend / mid_values)
+        return self.prob_up, self.prob_mid, self.prob_down
+
+
+
+    def payoff(self, S, option=None):
+        """
+        Payoff vectorisé sur une couche de nœuds (registre Option.PAYOFFS).
+        """
+
+        return (option or self.option).payoff_array(S)
+
+
+
+    def price_option(self, option):
+        """
+        Évalue une option de même maturité sur la géométrie de l'arbre, par rétropropagation
+        sur deux tableaux réutilisés. Les calls et puts passent par le noyau du backend actif,
+        les autres payoffs par le noyau NumPy avec leur fonction vectorisée.
+
+        Args:
+            option: Instance de la classe Option.
+
+        Returns:
+            Le prix de l'option à la racine.
+        """
+
+        if abs(option.T - self.option.T) > 1e-12:
+            raise ValueError("L'option doit avoir la même maturité que l'arbre")
+
+        terminal_values = self.payoff(self.layer_values(self.N), option)
+        arguments = (
+            terminal_values, self.alpha_powers, float(self.market.S0), self.growth, self.discount_factor,
+            self.prob_up, self.prob_mid, self.prob_down,
+            self._div_step_code(), float(self.market.dividend or 0.0), *self.div_probs,
+            self.lo, self.hi, option.style == "american", option.type == "call", float(option.K)
+        )
+
+        if option.type in ("call", "put"):
+            return float(self.backward_induction(*arguments))
+
+        _, numpy_backward_induction = Kernels.get_kernels('numpy')
+        return float(numpy_backward_induction(*arguments, exercise=option.payoff_array))
+
+
+
+    def get_option_price(self):
+        """
+        Retourne le prix de l'option à la racine sans construire le réseau de nœuds.
+
+        Returns:
+            Le prix de l'option au nœud racine.
+        """
+
+        return self.price_option(self.option)
+
+
+
+    def probability_tangents(self, expectation_ratio, expectation_tangents):
+        """
+        Dérive les probabilités de transition par rapport à (S0, sigma, r).
+
+        Args:
+            expectation_ratio: Ratio espérance / nœud central (scalaire ou tableau).
+            expectation_tangents: Dérivées de ce ratio par rapport à (S0, sigma, r), de forme (3, 1) ou (3, n).
+
+        Returns:
+            tuple: (p_up, p_mid, p_down, dp_up, dp_mid, dp_down), les dérivées de forme (3, ...).
+        """
+
+        alpha = self.alpha
+        x = expectation_ratio
+        dx = np.asarray(expectation_tangents, dtype=float)
+
+        # Seule sigma fait varier alpha et la variance relative v
+        variance_factor = math.exp(self.market.sigma ** 2 * self.deltaT)
+        v = variance_factor - 1
+        dalpha = np.array([0.0, alpha * math.sqrt(3 * self.deltaT), 0.0]).reshape((3,) + (1,) * max(np.ndim(x), 1))
+        dv = np.array([0.0, 2 * self.market.sigma * self.deltaT * variance_factor, 0.0]).reshape(dalpha.shape)
+
+        denominator = (1 - alpha) * (alpha ** (-2) - 1)
+        ddenominator = (-(alpha ** (-2) - 1) - 2 * (1 - alpha) * alpha ** (-3)) * dalpha
+        numerator = v + x ** 2 - 1 - (alpha + 1) * (x - 1)
+        dnumerator = dv + (2 * x - (alpha + 1)) * dx - (x - 1) * dalpha
+
+        p_down = numerator / denominator
+        dp_down = (dnumerator * denominator - numerator * ddenominator) / denominator ** 2
+
+        up_numerator = x - 1 - (1 / alpha - 1) * p_down
+        dup_numerator = dx + p_down * dalpha / alpha ** 2 - (1 / alpha - 1) * dp_down
+        p_up = up_numerator / (alpha - 1)
+        dp_up = (dup_numerator * (alpha - 1) - up_numerator * dalpha) / (alpha - 1) ** 2
+
+        return p_up, 1 - p_up - p_down, p_down, dp_up, -dp_up - dp_down, dp_down
+
+
+
+    def layer_spot_tangents(self, step, values):
+        """
+        Dérivées des spots d'une étape par rapport à (S0, sigma, r), à partir de la
+        position fermée S0 * exp(r * i * deltaT) * alpha^j (le dividende est un montant fixe).
+
+        Returns:
+            np.ndarray: Tableau de forme (3, 2 * step + 1).
+        """
+
+        undivided = values + self.market.dividend if step == self.dividend_step else values
+        j = np.arange(-step, step + 1)
+        return np.stack([
+            undivided / self.market.S0,
+            undivided * j * math.sqrt(3 * self.deltaT),
+            undivided * step * self.deltaT
+        ])
+
+
+
+    def payoff_slope(self, S, option):
+        """
+        Pente du payoff par différence centrale (égale à +/-1 pour un call ou un put dans la monnaie).
+        """
+
+        h = 1e-6 * np.maximum(np.abs(S), 1.0)
+        return (option.payoff_array(S + h) - option.payoff_array(S - h)) / (2 * h)
+
+
+
+    def dividend_probability_tangents(self):
+        """
+        Probabilités de l'étape précédant le dividende et leurs dérivées par rapport à (S0, sigma, r) :
+        l'espérance y est réduite du dividende, x = 1 - D / M avec M le nœud central avant détachement.
+
+        Returns:
+            tuple: (p_up, p_mid, p_down, dp_up, dp_mid, dp_down), ou None sans dividende dans l'arbre.
+        """
+
+        if self.dividend_step is None or self.dividend_step < 1:
+            return None
+
+        step = self.dividend_step - 1
+        # M = S0 * exp(r * (i + 1) * deltaT) * alpha^j
+        mid_values = self.alpha_powers[self.N - step:self.N + step + 1] * self.market.S0 * self.growth ** (step + 1)
+        mid_tangents = np.stack([
+            mid_values / self.market.S0,
+            mid_values * np.arange(-step, step + 1) * math.sqrt(3 * self.deltaT),
+            mid_values * (step + 1) * self.deltaT
+        ])
+        ratio = 1 - self.market.dividend / mid_values
+        return self.probability_tangents(ratio, self.market.dividend / mid_values ** 2 * mid_tangents)
+
+
+
+    def price_with_sensitivities(self, option=None, capture_layer_two=False):
+        """
+        Calcule le prix et ses dérivées premières par rapport à S0, sigma et r en une seule
+        rétropropagation : les dérivées des valeurs des nœuds sont propagées avec les valeurs
+        (différentiation du schéma de l'arbre lui-même, exercice anticipé et pruning compris).
+        Les payoffs discontinus (digitales) ont une dérivée nulle presque partout : leur delta
+        adjoint est nul, il faut garder les chocs pour ces payoffs.
+
+        Args:
+            option: Option à évaluer (par défaut celle de l'arbre).
+            capture_layer_two: Conserve au passage spots et valeurs des nœuds de l'étape 2 (N >= 2),
+                pour en extraire gamma et theta sans nouvelle rétropropagation.
+
+        Returns:
+            dict: {'price', 'delta', 'vega', 'rho'} avec vega et rho pour 1% (conventions de Greeks),
+                et 'layer_two': (spots, valeurs) si demandé.
+        """
+
+        option = option or self.option
+        if abs(option.T - self.option.T) > 1e-12:
+            raise ValueError("L'option doit avoir la même maturité que l'arbre")
+
+        N = self.N
+        american = option.style == "american"
+        step_dt = self.deltaT
+        ddiscount = -step_dt * self.discount_factor
+
+        # Probabilités constantes (hors dividende) et leurs dérivées, de forme (3, 1)
+        p_up, p_mid, p_down, dp_up, dp_mid, dp_down = self.probability_tangents(1.0, np.zeros((3, 1)))
+        dividend_probs = self.dividend_probability_tangents()
+
+        values = self.layer_values(N)
+        current = self.payoff(values, option)
+        current_tangents = self.payoff_slope(values, option) * self.layer_spot_tangents(N, values)
+        layer_two = np.zeros(5)
+
+        if option.type in ("call", "put") and self.backend == 'numba':
+            if dividend_probs is None:
+                div_probs, div_dprobs = np.zeros((3, 0)), np.zeros((3, 3, 0))
+            else:
+                div_probs = np.stack(dividend_probs[:3])
+                div_dprobs = np.stack(dividend_probs[3:], axis=1)
+            result = Kernels.backward_tangents_numba(
+                current, np.ascontiguousarray(current_tangents), self.alpha_powers, float(self.market.S0),
+                self.growth, self.discount_factor, ddiscount, step_dt, math.sqrt(3 * step_dt),
+                np.array([p_up, p_mid, p_down]), np.hstack([dp_up, dp_mid, dp_down]),
+                self._div_step_code(), float(self.market.dividend or 0.0), div_probs, div_dprobs,
+                self.lo, self.hi, american, option.type == "call", float(option.K), layer_two
+            )
+            price, delta, dsigma, drate = result
+        else:
+            for step in range(N - 1, -1, -1):
+                size = 2 * step + 1
+                if dividend_probs is not None and step + 1 == self.dividend_step:
+                    pu, pm, pd, dpu, dpm, dpd = dividend_probs
+                else:
+                    pu, pm, pd, dpu, dpm, dpd = p_up, p_mid, p_down, dp_up, dp_mid, dp_down
+
+                up, mid, down = current[2:size + 2], current[1:size + 1], current[:size]
+                dup, dmid, ddown = current_tangents[:, 2:size + 2], current_tangents[:, 1:size + 1], current_tangents[:, :size]
+
+                expectation = pu * up + pm * mid + pd * down
+                layer = self.discount_factor * expectation
+                layer_tangents = self.discount_factor * (dpu * up + pu * dup + dpm * mid + pm * dmid + dpd * down + pd * ddown)
+                layer_tangents[2] += ddiscount * expectation
+
+                if american:
+                    spots = self.layer_values(step)
+                    exercise = self.payoff(spots, option)
+                    exercised = exercise > layer
+                    exercise_tangents = self.payoff_slope(spots, option) * self.layer_spot_tangents(step, spots)
+                    layer = np.where(exercised, exercise, layer)
+                    layer_tangents = np.where(exercised, exercise_tangents, layer_tangents)
+
+                # Nœuds non développés (pruning) : valeur et dérivées nulles
+                developed = np.zeros(size, dtype=bool)
+                developed[self.lo[step]:self.hi[step] + 1] = True
+                current = np.where(developed, layer, 0.0)
+                current_tangents = np.where(developed, layer_tangents, 0.0)
+                if step == 2:
+                    layer_two[:] = current
+
+            price = current[0]
+            delta, dsigma, drate = current_tangents[:, 0]
+
+        result = {
+            'price': float(price),
+            'delta': float(delta),
+            'vega': float(dsigma) / 100,
+            'rho': float(drate) / 100
+        }
+        if capture_layer_two and N >= 2:
+            result['layer_two'] = (self.layer_values(2), layer_two)
+        return result
@@ -0,0 +1,187 @@
+import copy
+import numpy as np
+from Core.BlackScholes import BlackScholes
+from Core.RollingTree import RollingTree
+
+
+class ScenarioGrid:
+    """
+    Grille de stress spot x volatilité : P&L d'une option ou d'un portefeuille
+    pour chaque couple de chocs, avec chocs de taux et de temps optionnels.
+    """
+
+    def __init__(self, positions, spot_shifts, vol_shifts, rate_shift=0.0, time_shift=0.0, model='auto'):
+        """
+        Initialise la grille de scénarios.
+
+        Args:
+            positions (list): Liste d'instances de Position (Core.Portfolio).
+            spot_shifts (list): Chocs relatifs de spot (ex: -0.1 pour -10%).
+            vol_shifts (list): Chocs absolus de volatilité (ex: 0.05 pour +5 points).
+            rate_shift (float): Choc absolu de taux appliqué à tous les scénarios.
+            time_shift (float): Écoulement du temps en jours appliqué à tous les scénarios.
+            model (str): "auto" (Black-Scholes vectorisé pour les européennes sans dividende,
+                arbre sinon) ou "tree" (arbre pour toutes les positions).
+        """
+        if model not in ('auto', 'tree'):
+            raise ValueError("model doit être 'auto' ou 'tree'")
+
+        self.positions = positions
+        self.spot_shifts = np.asarray(spot_shifts, dtype=float)
+        self.vol_shifts = np.asarray(vol_shifts, dtype=float)
+        self.rate_shift = rate_shift
+        self.time_shift = time_shift
+        self.model = model
+        self.validate()
+
+
+
+    def validate(self):
+        """
+        Vérifie que chaque scénario reste évaluable par les deux moteurs (Black-Scholes et arbre) :
+        spot et volatilité choqués positifs, choc de temps inférieur à toutes les maturités.
+
+        Raises:
+            ValueError: Si un choc sort du domaine d'une position.
+        """
+        if self.spot_shifts.size and self.spot_shifts.min() <= -1:
+            raise ValueError("Les chocs de spot doivent être supérieurs à -1 (spot choqué positif)")
+        if self.positions and self.vol_shifts.size:
+            lowest_sigma = min(p.market.sigma for p in self.positions)
+            if lowest_sigma + self.vol_shifts.min() <= 0:
+                raise ValueError(f"Choc de volatilité {self.vol_shifts.min():g} trop négatif : "
+                                 f"la volatilité choquée doit rester positive (sigma minimale {lowest_sigma:g})")
+        if self.positions and self.time_shift:
+            shortest = min(p.option.T for p in self.positions)
+            if self.time_shift / 365 >= shortest:
+                raise ValueError("Le choc de temps dépasse la maturité de l'option")
+
+
+
+    def _uses_black_scholes(self, position):
+        """
+        Black-Scholes est exact pour un call ou put européen sans dividende discret.
+        """
+        has_dividend = position.market.dividend and position.market.ex_div_date is not None
+        vanilla = position.option.type in ('call', 'put')
+        return self.model == 'auto' and vanilla and position.option.style == 'european' and not has_dividend
+
+
+
+    def _shifted_option(self, option):
+        """
+        Applique l'écoulement du temps à l'option (dates conservées, voir Option.with_maturity).
+        """
+        if not self.time_shift:
+            return option
+        return option.with_maturity(option.T - self.time_shift / 365)
+
+
+
+    def _black_scholes_values(self, positions):
+        """
+        Valeurs de base et de scénario de toutes les positions Black-Scholes en un seul appel vectorisé.
+
+        Returns:
+            tuple: (valeurs de base (P,), valeurs de scénario (V, S, P))
+        """
+        S0 = np.array([p.market.S0 for p in positions])
+        sigma = np.array([p.market.sigma for p in positions])
+        rate = np.array([p.market.rate for p in positions])
+        K = np.array([p.option.K for p in positions])
+        T = np.array([p.option.T for p in positions])
+        is_call = np.array([p.option.type == 'call' for p in positions])
+
+        base = BlackScholes.batch_price(S0, K, T, rate, sigma, is_call)
+        scenarios = BlackScholes.batch_price(
+            S0[None, None, :] * (1 + self.spot_shifts[None, :, None]),
+            K,
+            T - self.time_shift / 365,
+            rate + self.rate_shift,
+            sigma[None, None, :] + self.vol_shifts[:, None, None],
+            is_call
+        )
+        return base, scenarios
+
+
+
+    def _tree_values(self, positions):
+        """
+        Valeurs de scénario par arbre trinomial pour un groupe de positions partageant un arbre.
+
+        Sans dividende discret, le prix d'un call ou put vanille est homogène de degré 1 en
+        (S, K) : V(lambda * S, K) = lambda * V(S, K / lambda). Un seul arbre par choc de
+        volatilité sert donc à tous les chocs de spot ; seule la rétropropagation est refaite.
+        Les autres payoffs (digital, gap, power, capped) dépendent de paramètres non homogènes
+        et sont réévalués sur un arbre construit au spot choqué.
+
+        Returns:
+            np.ndarray: Valeurs de scénario de forme (V, S, P)
+        """
+        market = positions[0].market
+        N = positions[0].N
+        options = [self._shifted_option(p.option) for p in positions]
+        has_dividend = market.dividend and market.ex_div_date is not None
+        homogeneous = [] if has_dividend else [p for p, option in enumerate(options) if option.type in ('call', 'put')]
+        repriced = [p for p in range(len(options)) if p not in homogeneous]
+        values = np.empty((len(self.vol_shifts), len(self.spot_shifts), len(positions)))
+
+        for v, vol_shift in enumerate(self.vol_shifts):
+            if homogeneous:
+                tree = RollingTree(market.with_overrides(rate=market.rate + self.rate_shift,
+                                                         sigma=market.sigma + vol_shift), options[0], N)
+
+            for s, spot_shift in enumerate(self.spot_shifts):
+                scale = 1 + spot_shift
+                for p in homogeneous:
+                    scaled = copy.copy(options[p])
+                    scaled.K = options[p].K / scale
+                    values[v, s, p] = scale * tree.price_option(scaled)
+                if repriced:
+                    shocked = market.with_overrides(S0=market.S0 * scale, rate=market.rate + self.rate_shift,
+                                                    sigma=market.sigma + vol_shift)
+                    shocked_tree = RollingTree(shocked, options[repriced[0]], N)
+                    values[v, s, repriced] = [shocked_tree.price_option(options[p]) for p in repriced]
+
+        return values
+
+
+
+    def compute(self):
+        """
+        Calcule la matrice de P&L du portefeuille.
+
+        Returns:
+            dict: {'pnl': matrice (vol x spot), 'base_value', 'spot_shifts', 'vol_shifts'}
+        """
+        quantities = np.array([p.quantity for p in self.positions])
+        base_values = np.empty(len(self.positions))
+        scenario_values = np.empty((len(self.vol_shifts), len(self.spot_shifts), len(self.positions)))
+
+        bs_indices = [i for i, p in enumerate(self.positions) if self._uses_black_scholes(p)]
+        if bs_indices:
+            base, scenarios = self._black_scholes_values([self.positions[i] for i in bs_indices])
+            base_values[bs_indices] = base
+            scenario_values[:, :, bs_indices] = scenarios
+
+        groups = {}
+        for i, position in enumerate(self.positions):
+            if i not in bs_indices:
+                groups.setdefault(position.group_key(), []).append(i)
+
+        for indices in groups.values():
+            group = [self.positions[i] for i in indices]
+            tree = RollingTree(group[0].market, group[0].option, group[0].N)
+            base_values[indices] = [tree.price_option(p.option) for p in group]
+            scenario_values[:, :, indices] = self._tree_values(group)
+
+        pnl = (scenario_values - base_values) @ quantities
+
+        return {
+            'pnl': pnl.tolist(),
+            'base_value': float(base_values @ quantities),
+            'spot_shifts': self.spot_shifts.tolist(),
+            'vol_shifts': self.vol_shifts.tolist(),
+            'rate_shift': self.rate_shift,
+            'time_shift': self.time_shift
+        }
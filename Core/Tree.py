@@ -1,4 +1,7 @@
 import math
+import threading
+import time
+from Core.GeometryCache import GeometryCache
 from Core.Node import Node
 from Core.Option import Option
 import numpy as np
@@ -6,7 +9,10 @@ from datetime import datetime
 
 class Tree:
 
-    def __init__(self, market, option, N, threshold=0.0):
+    # Géométries partagées entre options d'un même sous-jacent (cf. GeometryCache)
+    geometry_cache = GeometryCache()
+
+    def __init__(self, market, option, N, threshold=0.0, progress_callback=None, use_geometry_cache=True):
         """
         Initialise l'arbre trinomial avec recombinaison et pruning.
 
@@ -15,13 +21,24 @@ class Tree:
             option: Instance de la classe Option contenant les paramètres de l'option.
             N: Nombre d'étapes dans l'arbre.
             threshold: Seuil de probabilité cumulée pour le pruning des nœuds.
+            progress_callback: Fonction optionnelle appelée après chaque étape de la construction
+                et de la rétropropagation avec un dictionnaire {phase, step, total_steps, nodes, elapsed}.
+            use_geometry_cache: Réutilise une géométrie déjà construite pour le même marché, T, N et seuil.
+                À désactiver pour lire les prix des nœuds après l'évaluation (les nœuds sont partagés).
         """
         
         self.N = N                                  
         self.market = market
         self.option = option
         self.threshold = threshold
+        self.progress_callback = progress_callback
+        self.use_geometry_cache = use_geometry_cache
         self.nodes_by_step = []
+
+        # Arbre dont les nœuds portent la géométrie, et verrou de sa rétropropagation
+        self.owner_lock = threading.Lock()
+        self.geometry_owner = self
+        self.geometry_lock = self.owner_lock
     
 
 
@@ -33,45 +50,105 @@ class Tree:
             threshold: Seuil de probabilité cumulée pour le pruning des nœuds.
         """
         
-        self.root = Node(self.market.S0, 0, self)
-
         self.deltaT = float(self.option.T) / float(self.N)
+        self.threshold = threshold
+        self.dividend_step = self.compute_dividend_step(self.market, self.option, self.N)
+
+        # Géométrie déjà construite pour ce sous-jacent : seuls payoff et rétropropagation restent à faire
+        key = None
+        if self.use_geometry_cache:
+            key = self.geometry_cache.cache_key(self.market, self.option, self.N, threshold, self.dividend_step)
+            owner = self.geometry_cache.get(key)
+            if owner is not None:
+                self.adopt_geometry(owner)
+                return
+
+        self.root = Node(self.market.S0, 0, self)
+        self.geometry_owner, self.geometry_lock = self, self.owner_lock
         
         # Initialiser le registre des nœuds par étape
         self.nodes_by_step = [[] for _ in range(self.N + 1)]
         self.nodes_by_step[0] = [self.root]  # Étape 0 = racine
         
         self.root.cum_prob = 1.0
-        self.threshold = threshold
-        
-        if self.market.ex_div_date is not None and self.market.dividend is not None:
-            # Calculer la position relative de la date ex-dividende
-            if self.option.start_date is not None and self.option.end_date is not None:
-                days_to_ex_div = (self.market.ex_div_date - self.option.start_date).days
-                days_to_maturity = (self.option.end_date - self.option.start_date).days
-                relative_time = days_to_ex_div / days_to_maturity
-            else:
-                # Mode avec T directement (on assume que start_date = aujourd'hui)
-                today = datetime.today()
-                days_to_ex_div = (self.market.ex_div_date - today).days
-                days_to_maturity = self.option.T * 365
-                relative_time = days_to_ex_div / days_to_maturity
-            
-            self.dividend_step = math.ceil(relative_time * self.N)
-        
-        else:
-            self.dividend_step = None   # No dividend step if ex_div_date is not set
         
         # Construction étape par étape avec vraie recombinaison
+        progress = self.progress_callback
+        if progress is not None:
+            start_time = time.perf_counter()
+            nodes = 1
         for step in range(self.N):
             self.build_next_step(step)
+            # Un seul test par étape quand aucun suivi n'est demandé
+            if progress is not None:
+                nodes += len(self.nodes_by_step[step + 1])
+                progress({'phase': 'build', 'step': step + 1, 'total_steps': self.N,
+                          'nodes': nodes, 'elapsed': time.perf_counter() - start_time})
         
         # Appliquer le dividende après construction complète
         if self.dividend_step is not None and self.market.dividend is not None:
             self.apply_dividend_to_step(self.dividend_step)
             
         self.last_trunc = self.nodes_by_step[-1][0] if self.nodes_by_step[-1] else None
+
+        if key is not None:
+            self.geometry_cache.put(key, self)
+
+
+
+    def adopt_geometry(self, owner):
+        """
+        Reprend la géométrie construite par un autre arbre (nœuds, probabilités, dividende).
+        Les nœuds restent rattachés à l'arbre propriétaire : la rétropropagation se fait
+        sous son verrou, avec l'option de cet arbre.
+
+        Args:
+            owner: Arbre propriétaire de la géométrie.
+        """
+
+        self.root = owner.root
+        self.nodes_by_step = owner.nodes_by_step
+        self.last_trunc = owner.last_trunc
+        self.geometry_owner = owner.geometry_owner
+        self.geometry_lock = owner.geometry_lock
+
+        if self.progress_callback is not None:
+            self.progress_callback({'phase': 'build', 'step': self.N, 'total_steps': self.N,
+                                    'nodes': sum(len(layer) for layer in self.nodes_by_step), 'elapsed': 0.0})
+    
+    
     
+    @staticmethod
+    def compute_dividend_step(market, option, N):
+        """
+        Calcule l'étape de l'arbre à laquelle le dividende est détaché.
+
+        Args:
+            market: Instance de la classe Market.
+            option: Instance de la classe Option.
+            N: Nombre d'étapes dans l'arbre.
+
+        Returns:
+            L'étape ex-dividende, ou None en l'absence de date ex-dividende.
+        """
+
+        if market.ex_div_date is not None and market.dividend is not None:
+            # Calculer la position relative de la date ex-dividende
+            if option.start_date is not None and option.end_date is not None:
+                days_to_ex_div = (market.ex_div_date - option.start_date).days
+                days_to_maturity = (option.end_date - option.start_date).days
+                relative_time = days_to_ex_div / days_to_maturity
+            else:
+                # Mode avec T directement (on assume que start_date = aujourd'hui)
+                today = datetime.today()
+                days_to_ex_div = (market.ex_div_date - today).days
+                days_to_maturity = option.T * 365
+                relative_time = days_to_ex_div / days_to_maturity
+            
+            return math.ceil(relative_time * N)
+        
+        return None   # No dividend step if ex_div_date is not set
+
     
     
     def find_node_by_value(self, target_value: float, step: int, tolerance: float = 1e-8):
@@ -197,19 +274,15 @@ class Tree:
             Le nœud de troncature final.
         """
         
-        last_node = trunc = self.last_trunc
-        trunc.option_price = trunc.tree.option.payoff(last_node.value)
+        trunc = self.last_trunc
 
-        while last_node.down_neighbor is not None:
-            last_node = last_node.down_neighbor
-            last_node.option_price = last_node.tree.option.payoff(last_node.value)
+        # Payoff évalué en une seule fois sur toute la couche finale
+        final_nodes = self.nodes_by_step[self.N]
+        payoffs = self.option.payoff_array([node.value for node in final_nodes])
+        for node, payoff in zip(final_nodes, payoffs.tolist()):
+            node.option_price = payoff
+            node.exercised = payoff > 0
 
-        last_node = trunc
-
-        while last_node.up_neighbor is not None:
-            last_node = last_node.up_neighbor
-            last_node.option_price = last_node.tree.option.payoff(last_node.value)
-        
         return trunc
 
 
@@ -217,11 +290,62 @@ class Tree:
     def backpropagation(self):
         """
         Effectue la rétropropagation des prix des options à travers l'arbre.
+        Pour une option américaine, enregistre au passage le spot critique
+        d'exercice anticipé de chaque étape dans self.exercise_boundary.
         """
 
+        american = self.option.style == "american"
+        self.exercise_boundary = [None] * (self.N + 1) if american else None
+        if american:
+            self.exercise_boundary[self.N] = self.find_critical_spot(self.N)
+
+        progress = self.progress_callback
+        if progress is not None:
+            start_time = time.perf_counter()
+            nodes = len(self.nodes_by_step[self.N])
+
         for step in range(self.N - 1, -1, -1):
-            for node in self.nodes_by_step[step]:
-                node.calculate_option_price(self.market.rate, self.deltaT)
+            step_nodes = self.nodes_by_step[step]
+            if american:
+                # Valeurs d'exercice immédiat de toute la couche en une seule évaluation
+                exercise_values = self.option.payoff_array([node.value for node in step_nodes]).tolist()
+                for node, exercise_value in zip(step_nodes, exercise_values):
+                    node.calculate_option_price(self.market.rate, self.deltaT, exercise_value)
+                self.exercise_boundary[step] = self.find_critical_spot(step)
+            else:
+                for node in step_nodes:
+                    node.calculate_option_price(self.market.rate, self.deltaT)
+
+            if progress is not None:
+                nodes += len(step_nodes)
+                progress({'phase': 'backpropagation', 'step': self.N - step, 'total_steps': self.N,
+                          'nodes': nodes, 'elapsed': time.perf_counter() - start_time})
+
+
+
+    def find_critical_spot(self, step):
+        """
+        Retourne le spot critique d'exercice anticipé à une étape donnée.
+
+        Les nœuds étant triés par valeur décroissante, on s'arrête au premier
+        nœud exercé rencontré : le plus haut pour un put, le plus bas pour un call
+        (selon le suffixe du type de payoff).
+
+        Args:
+            step: L'étape de l'arbre.
+
+        Returns:
+            Le spot critique, ou None si aucun nœud n'est exercé à cette étape.
+        """
+
+        nodes = self.nodes_by_step[step]
+        if not self.option.type.endswith("put"):
+            nodes = reversed(nodes)
+
+        for node in nodes:
+            if node.exercised:
+                return node.value
+        return None
 
 
     
@@ -233,9 +357,16 @@ class Tree:
             Le prix de l'option au nœud racine.
         """
 
-        self.compute_payoff()
-        self.backpropagation()
-        return self.root.option_price
+        # Les nœuds consultent l'option de leur arbre propriétaire (style, payoff)
+        owner = self.geometry_owner
+        with self.geometry_lock:
+            owner_option, owner.option = owner.option, self.option
+            try:
+                self.compute_payoff()
+                self.backpropagation()
+                return self.root.option_price
+            finally:
+                owner.option = owner_option
     
 
 
@@ -267,7 +398,49 @@ class Tree:
             threshold = self.threshold
         self.build_tree(threshold=threshold)
         return self.calculate_option_price()
-    
+
+
+
+    def price_option(self, option):
+        """
+        Évalue une autre option sur l'arbre déjà construit, sans reconstruire le réseau.
+        Les nœuds, probabilités et le dividende ne dépendent que du marché, de T et de N :
+        seuls le payoff et la rétropropagation sont recalculés.
+
+        Args:
+            option: Instance de la classe Option de même maturité que l'arbre.
+
+        Returns:
+            Le prix de l'option au nœud racine.
+        """
+
+        if not self.nodes_by_step or not self.nodes_by_step[-1]:
+            raise ValueError("L'arbre doit être construit avant d'évaluer une autre option")
+        if abs(option.T - self.option.T) > 1e-12:
+            raise ValueError("L'option doit avoir la même maturité que l'arbre")
+
+        self.option = option
+        return self.calculate_option_price()
+
+
+
+    def get_exercise_boundary(self):
+        """
+        Retourne la frontière d'exercice anticipé enregistrée lors de la rétropropagation.
+
+        Returns:
+            Liste de dictionnaires {step, time, spot} (spot à None si aucun nœud
+            n'est exercé à cette étape), ou None pour une option européenne.
+        """
+
+        if getattr(self, "exercise_boundary", None) is None:
+            return None
+
+        return [
+            {'step': step, 'time': step * self.deltaT, 'spot': spot}
+            for step, spot in enumerate(self.exercise_boundary)
+        ]
+
 
 
     def get_node_count(self):
@@ -0,0 +1,86 @@
+import argparse
+import time
+from Core.Greeks import Greeks
+from Core.Market import Market
+from Core.Option import Option
+from Core.RollingTree import RollingTree
+
+
+
+# Écart relatif toléré face aux chocs de Greeks. Le rho par chocs de 1% lisse les
+# oscillations du prix de l'arbre en r (position du strike entre deux nœuds), d'où une tolérance plus large.
+BUMP_TOLERANCES = {'delta': 1e-3, 'vega': 5e-3, 'rho': 5e-2}
+
+
+def fine_differences(market, option, N, h=1e-6):
+    """
+    Différences centrales à pas très fin : dérivées locales du prix de l'arbre,
+    que les dérivées adjointes doivent reproduire à la précision machine près.
+    """
+    def price(S0, sigma, rate):
+        return RollingTree(Market(S0=S0, sigma=sigma, rate=rate), option, N).get_option_price()
+
+    S0, sigma, rate = market.S0, market.sigma, market.rate
+    return {
+        'delta': (price(S0 + h, sigma, rate) - price(S0 - h, sigma, rate)) / (2 * h),
+        'vega': (price(S0, sigma + h, rate) - price(S0, sigma - h, rate)) / (2 * h) / 100,
+        'rho': (price(S0, sigma, rate + h) - price(S0, sigma, rate - h)) / (2 * h) / 100
+    }
+
+
+
+def compare_adjoint_to_bumps(N, tolerance):
+    """
+    Compare Delta, Vega et Rho adjoints aux différences centrales de Greeks (chocs)
+    et à des différences à pas fin, et mesure le gain de temps.
+    Retourne le nombre d'écarts hors tolérance.
+    """
+    market = Market(S0=100.0, rate=0.05, sigma=0.30)
+    failures = 0
+
+    print("=" * 100)
+    print(f"🔁 DÉRIVÉES ADJOINTES vs CHOCS (N={N}, tolérance pas fin {tolerance:.0e})")
+    print("=" * 100)
+    print(f"{'option':>22} | {'greek':>6} | {'adjoint':>12} | {'chocs':>12} | {'écart rel.':>10} | {'pas fin':>12} | {'écart rel.':>10}")
+    print("-" * 100)
+
+    for style in ['european', 'american']:
+        for opt_type, K in [('call', 90.0), ('call', 100.0), ('put', 100.0), ('put', 110.0)]:
+            option = Option(K=K, opt_type=opt_type, style=style, T=1.0)
+            greeks = Greeks(market, option, N)
+
+            start = time.perf_counter()
+            adjoint = greeks.compute_adjoint_greeks()
+            adjoint_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            bumped = {'delta': greeks.compute_delta(), 'vega': greeks.compute_vega(), 'rho': greeks.compute_rho()}
+            bump_time = time.perf_counter() - start
+
+            fine = fine_differences(market, option, N)
+
+            label = f"{style} {opt_type} K={K:g}"
+            for name in ['delta', 'vega', 'rho']:
+                bump_error = abs(adjoint[name] - bumped[name]) / max(abs(bumped[name]), 1e-8)
+                fine_error = abs(adjoint[name] - fine[name]) / max(abs(fine[name]), 1e-8)
+                failed = bump_error > BUMP_TOLERANCES[name] or fine_error > tolerance
+                failures += failed
+                print(f"{label:>22} | {name:>6} | {adjoint[name]:>12.6f} | {bumped[name]:>12.6f} | {bump_error:>10.2e} | "
+                      f"{fine[name]:>12.6f} | {fine_error:>10.2e}{'  ❌' if failed else ''}")
+            print(f"{'':>22}   temps : adjoint {adjoint_time * 1000:.2f} ms, chocs {bump_time * 1000:.2f} ms "
+                  f"({bump_time / adjoint_time:.1f}x)")
+
+    print("-" * 100)
+    print("✅ Tous les Greeks sont dans la tolérance" if failures == 0 else f"❌ {failures} écart(s) hors tolérance")
+    return failures
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validation des dérivées adjointes contre les chocs")
+    parser.add_argument('--steps', type=int, default=500)
+    parser.add_argument('--tolerance', type=float, default=1e-5,
+                        help="Écart relatif maximal face aux différences à pas fin")
+    args = parser.parse_args()
+
+    raise SystemExit(1 if compare_adjoint_to_bumps(args.steps, args.tolerance) else 0)
@@ -0,0 +1,149 @@
+import argparse
+import time
+import numpy as np
+from Core import Kernels
+from Core.BatchTree import BatchTree
+from Core.BlackScholes import BlackScholes
+from Core.LeisenReimer import LeisenReimerTree
+from Core.Market import Market
+from Core.Option import Option
+from Core.RollingTree import RollingTree
+from Core.Tree import Tree
+
+
+
+def time_call(func, repeats):
+    """
+    Retourne le meilleur temps d'exécution (en secondes) sur plusieurs répétitions.
+    """
+    best = float('inf')
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+
+def benchmark_backends(steps, repeats, node_tree_max_N):
+    """
+    Compare le temps de pricing par backend de noyaux (et l'arbre à nœuds pour les petits N).
+    """
+    market = Market(S0=100.0, rate=0.05, sigma=0.30)
+    backends = list(Kernels.BACKENDS)
+
+    print("=" * 78)
+    print(f"⚙️  BENCHMARK DES BACKENDS - disponibles: {', '.join(backends)} (défaut: {Kernels.BACKEND})")
+    print("=" * 78)
+
+    for backend in backends:
+        # Compilation / chargement du cache hors mesure
+        Kernels.warm_up(backend)
+
+    for style in ['european', 'american']:
+        option = Option(K=100.0, opt_type='put', style=style, T=1.0)
+        print(f"\n📊 Put {style}")
+        print(f"{'N':>7} | {'backend':>10} | {'temps (ms)':>11} | {'speedup vs numpy':>16} | {'prix':>12}")
+        print("-" * 70)
+
+        for N in steps:
+            timings = {}
+            for backend in backends:
+                elapsed, price = time_call(lambda: RollingTree(market, option, N, backend=backend).get_option_price(), repeats)
+                timings[backend] = (elapsed, price)
+
+            if N <= node_tree_max_N:
+                elapsed, price = time_call(lambda: Tree(market, option, N, use_geometry_cache=False).get_option_price(), 1)
+                timings['nodes'] = (elapsed, price)
+
+            reference = timings['numpy'][0]
+            for backend, (elapsed, price) in timings.items():
+                print(f"{N:>7} | {backend:>10} | {elapsed * 1000:>11.3f} | {reference / elapsed:>15.2f}x | {price:>12.6f}")
+
+
+
+def benchmark_engines(steps, repeats, reference_N):
+    """
+    Compare erreur et temps de l'arbre trinomial et du binomial de Leisen-Reimer à N égal.
+    Référence : Black-Scholes pour l'européenne, Leisen-Reimer à reference_N pas pour l'américaine.
+    """
+    market = Market(S0=100.0, rate=0.05, sigma=0.30)
+
+    print("\n" + "=" * 78)
+    print("⚖️  TRINOMIAL vs LEISEN-REIMER")
+    print("=" * 78)
+
+    for style in ['european', 'american']:
+        option = Option(K=105.0, opt_type='put', style=style, T=1.0)
+        if style == 'european':
+            reference = BlackScholes(market.S0, option.K, option.T, market.rate, market.sigma).price('put')
+        else:
+            reference = LeisenReimerTree(market, option, reference_N).get_option_price()
+        print(f"\n📊 Put {style} (référence {reference:.6f})")
+        print(f"{'N':>7} | {'moteur':>14} | {'temps (ms)':>11} | {'erreur':>12}")
+        print("-" * 54)
+
+        for N in steps:
+            engines = {
+                'trinomial': lambda: RollingTree(market, option, N).get_option_price(),
+                'leisen_reimer': lambda: LeisenReimerTree(market, option, N).get_option_price()
+            }
+            for name, price_function in engines.items():
+                elapsed, price = time_call(price_function, repeats)
+                print(f"{N:>7} | {name:>14} | {elapsed * 1000:>11.3f} | {price - reference:>12.2e}")
+
+
+
+def benchmark_batch(batch_sizes, N, repeats):
+    """
+    Compare l'évaluation d'un lot de contrats par BatchTree (une passe pour tout le lot)
+    à une boucle de RollingTree, contrat par contrat, pour chaque backend.
+    """
+    rng = np.random.default_rng(0)
+
+    print("\n" + "=" * 78)
+    print(f"📦 LOT DE CONTRATS (BatchTree) vs BOUCLE DE RollingTree - N = {N}")
+    print("=" * 78)
+    print(f"{'M':>7} | {'backend':>8} | {'lot (ms)':>10} | {'boucle (ms)':>12} | {'gain':>7} | {'écart max':>10}")
+    print("-" * 70)
+
+    for M in batch_sizes:
+        S0, K = rng.uniform(80, 120, M), rng.uniform(80, 120, M)
+        T, r, sigma = rng.uniform(0.1, 2.0, M), rng.uniform(0.0, 0.08, M), rng.uniform(0.1, 0.5, M)
+        is_call, american = rng.random(M) < 0.5, rng.random(M) < 0.5
+        contracts = [
+            (Market(S0=S0[i], rate=r[i], sigma=sigma[i]),
+             Option(K=K[i], opt_type='call' if is_call[i] else 'put',
+                    style='american' if american[i] else 'european', T=T[i]))
+            for i in range(M)
+        ]
+
+        for backend in Kernels.BACKENDS:
+            batch_time, batch_prices = time_call(
+                lambda: BatchTree(S0, K, T, r, sigma, is_call, american, N, backend=backend).price(), repeats)
+            loop_time, loop_prices = time_call(
+                lambda: [RollingTree(market, option, N, backend=backend).get_option_price()
+                         for market, option in contracts], repeats)
+            error = np.abs(batch_prices - np.array(loop_prices)).max()
+            print(f"{M:>7} | {backend:>8} | {batch_time * 1000:>10.1f} | {loop_time * 1000:>12.1f} | "
+                  f"{loop_time / batch_time:>6.1f}x | {error:>10.1e}")
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark des moteurs de l'arbre trinomial")
+    parser.add_argument('--steps', type=int, nargs='+', default=[50, 100, 500, 1000, 5000])
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--node-tree-max-N', type=int, default=100,
+                        help="N maximal pour l'arbre à nœuds (Tree), beaucoup plus lent")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[10, 100, 1000],
+                        help="Tailles de lot comparées pour BatchTree")
+    parser.add_argument('--batch-N', type=int, default=200, help="N des arbres du lot")
+    parser.add_argument('--reference-N', type=int, default=20001,
+                        help="N du binomial de référence pour les options américaines")
+    args = parser.parse_args()
+
+    benchmark_backends(args.steps, args.repeats, args.node_tree_max_N)
+    benchmark_engines(args.steps, args.repeats, args.reference_N)
+    benchmark_batch(args.batch_sizes, args.batch_N, args.repeats)
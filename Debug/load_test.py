@@ -0,0 +1,262 @@
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import numpy as np
+
+
+
+# Requête de base commune aux endpoints (mêmes paramètres que l'interface web)
+BASE_PAYLOAD = {
+    'S0': 100.0, 'K': 100.0, 'start_date': '2025-09-01', 'maturity_date': '2026-09-01',
+    'r': 0.05, 'sigma': 0.30, 'N': 200, 'option_type': 'call', 'option_style': 'european',
+    'dividend': 0.0, 'threshold': 0.0
+}
+
+# Endpoints rejoués : chemin et paramètres propres à chaque endpoint
+ENDPOINTS = {
+    'calculate': ('/api/calculate', {}),
+    'tree': ('/api/tree', {'N': 100, 'window_steps': 20}),
+    'convergence': ('/api/convergence', {})
+}
+
+# Mélanges de requêtes prédéfinis : endpoint -> poids
+MIXES = {
+    'calculate': {'calculate': 1},
+    'mixed': {'calculate': 6, 'tree': 2, 'convergence': 2},
+    'heavy': {'calculate': 2, 'tree': 4, 'convergence': 4}
+}
+
+
+
+class HttpClient:
+    """
+    Client HTTP (bibliothèque standard) vers une instance locale de l'application.
+    """
+
+    def __init__(self, base_url, timeout=120, accept_encoding=None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.headers = {'Content-Type': 'application/json'}
+        if accept_encoding:
+            self.headers['Accept-Encoding'] = accept_encoding
+
+
+    def post(self, path, payload):
+        """
+        Returns:
+            tuple: (statut HTTP, taille du corps de la réponse en octets, compressé le cas échéant)
+        """
+        request = urllib.request.Request(self.base_url + path, data=json.dumps(payload).encode(),
+                                         headers=self.headers)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.status, len(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, len(e.read())
+
+
+
+class TestClient:
+    """
+    Client Flask en processus (sans serveur) : un client de test par thread.
+    """
+
+    def __init__(self, accept_encoding=None):
+        from app import app
+        self.app = app
+        self.headers = {'Accept-Encoding': accept_encoding} if accept_encoding else {}
+        self._local = threading.local()
+
+
+    def post(self, path, payload):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.post(path, json=payload, headers=self.headers)
+        return response.status_code, len(response.get_data())
+
+
+
+def parse_mix(mix):
+    """
+    Lit un mélange prédéfini ("mixed") ou explicite ("calculate=6,tree=2,convergence=2").
+
+    Returns:
+        dict: Poids par endpoint.
+    """
+    if mix in MIXES:
+        return MIXES[mix]
+    weights = {}
+    for item in mix.split(','):
+        name, _, weight = item.partition('=')
+        if name not in ENDPOINTS:
+            raise ValueError(f"Endpoint inconnu : {name} (parmi {', '.join(ENDPOINTS)})")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+
+def make_payload(name, rng, distinct):
+    """
+    Construit la requête d'un endpoint. Avec distinct, le strike est tiré au hasard
+    pour que le cache de prix et le regroupement des requêtes identiques ne masquent pas le calcul.
+    """
+    payload = {**BASE_PAYLOAD, **ENDPOINTS[name][1]}
+    if distinct:
+        payload['K'] = round(rng.uniform(80.0, 120.0), 6)
+    return payload
+
+
+
+def run_level(client, weights, concurrency, requests_per_level, distinct, seed):
+    """
+    Rejoue requests_per_level requêtes réparties sur concurrency clients simultanés.
+
+    Returns:
+        tuple: (liste des mesures (endpoint, latence en s, statut, taille), durée totale en s)
+    """
+    names = list(weights)
+    cumulative = list(np.cumsum([weights[name] for name in names]))
+    counter = iter(range(requests_per_level))
+    counter_lock = threading.Lock()
+    samples = []
+    samples_lock = threading.Lock()
+
+    def worker(worker_id):
+        rng = random.Random(seed + worker_id)
+        while True:
+            with counter_lock:
+                if next(counter, None) is None:
+                    return
+            name = rng.choices(names, cum_weights=cumulative)[0]
+            payload = make_payload(name, rng, distinct)
+            start = time.perf_counter()
+            try:
+                status, size = client.post(ENDPOINTS[name][0], payload)
+            except Exception:
+                status, size = None, 0
+            elapsed = time.perf_counter() - start
+            with samples_lock:
+                samples.append((name, elapsed, status, size))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, range(concurrency)))
+    return samples, time.perf_counter() - start
+
+
+
+def summarize(samples, duration):
+    """
+    Débit, percentiles de latence, taux d'erreur et tailles de réponse, au global et par endpoint.
+    """
+    groups = defaultdict(list)
+    for sample in samples:
+        groups['all'].append(sample)
+        groups[sample[0]].append(sample)
+
+    summary = {}
+    for name, group in groups.items():
+        latencies = np.array([sample[1] for sample in group]) * 1000
+        sizes = np.array([sample[3] for sample in group])
+        errors = sum(1 for sample in group if sample[2] is None or sample[2] >= 400)
+        summary[name] = {
+            'requests': len(group),
+            'throughput': len(group) / duration,
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p95_ms': float(np.percentile(latencies, 95)),
+            'p99_ms': float(np.percentile(latencies, 99)),
+            'mean_ms': float(latencies.mean()),
+            'error_rate': errors / len(group),
+            'mean_bytes': float(sizes.mean()),
+            'max_bytes': int(sizes.max())
+        }
+    return summary
+
+
+
+def print_level(concurrency, summary, baseline=None):
+    """
+    Affiche les statistiques d'un niveau de concurrence (et l'écart de p95 face à une référence).
+    """
+    print(f"\n🔀 Concurrence {concurrency}")
+    print(f"{'endpoint':>12} | {'req':>5} | {'req/s':>7} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8} | "
+          f"{'erreurs':>7} | {'octets moy.':>11} | {'Δp95':>7}")
+    print("-" * 98)
+    for name, stats in summary.items():
+        delta = ''
+        if baseline is not None and name in baseline:
+            delta = f"{stats['p95_ms'] / baseline[name]['p95_ms'] - 1:+.0%}"
+        print(f"{name:>12} | {stats['requests']:>5} | {stats['throughput']:>7.1f} | {stats['p50_ms']:>8.1f} | "
+              f"{stats['p95_ms']:>8.1f} | {stats['p99_ms']:>8.1f} | {stats['error_rate']:>7.1%} | "
+              f"{stats['mean_bytes']:>11.0f} | {delta:>7}")
+
+
+
+def load_test(url, mix, concurrency_levels, requests_per_level, distinct, seed, output, compare, accept_encoding=None):
+    """
+    Lance la campagne de charge, affiche les résultats et les enregistre en JSON
+    (configuration + statistiques par niveau de concurrence) pour comparaison ultérieure.
+    """
+    weights = parse_mix(mix)
+    client = HttpClient(url, accept_encoding=accept_encoding) if url else TestClient(accept_encoding)
+    baseline = None
+    if compare:
+        with open(compare) as file:
+            baseline = {level['concurrency']: level['summary'] for level in json.load(file)['levels']}
+
+    print("=" * 98)
+    print(f"📈 TEST DE CHARGE - {url or 'client Flask en processus'} - mélange {weights}")
+    print("=" * 98)
+
+    levels = []
+    for concurrency in concurrency_levels:
+        samples, duration = run_level(client, weights, concurrency, requests_per_level, distinct, seed)
+        summary = summarize(samples, duration)
+        levels.append({'concurrency': concurrency, 'duration': duration, 'summary': summary})
+        print_level(concurrency, summary, baseline.get(concurrency) if baseline else None)
+
+    results = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'target': url or 'test_client',
+        'mix': weights,
+        'requests_per_level': requests_per_level,
+        'distinct_payloads': distinct,
+        'accept_encoding': accept_encoding,
+        'base_payload': BASE_PAYLOAD,
+        'levels': levels
+    }
+    if output:
+        with open(output, 'w') as file:
+            json.dump(results, file, indent=2)
+        print(f"\n💾 Résultats enregistrés dans {output}")
+    return results
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Test de charge de l'API du pricer")
+    parser.add_argument('--url', default=None,
+                        help="URL d'une instance lancée (ex: http://localhost:5001) ; par défaut client Flask en processus")
+    parser.add_argument('--mix', default='mixed',
+                        help=f"Mélange prédéfini ({', '.join(MIXES)}) ou explicite: calculate=6,tree=2,convergence=2")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--requests', type=int, default=100, help="Nombre de requêtes par niveau de concurrence")
+    parser.add_argument('--identical', action='store_true',
+                        help="Requêtes identiques (mesure le cache et le regroupement au lieu du calcul)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help="Fichier JSON des résultats")
+    parser.add_argument('--compare', default=None, help="Résultats JSON d'une campagne précédente (écart de p95)")
+    parser.add_argument('--accept-encoding', default=None,
+                        help="En-tête Accept-Encoding envoyé (ex: 'gzip, br') ; tailles mesurées après compression")
+    args = parser.parse_args()
+
+    load_test(args.url, args.mix, args.concurrency, args.requests, not args.identical,
+              args.seed, args.output, args.compare, args.accept_encoding)
@@ -1,5 +1,7 @@
 from flask import Flask, render_template
 from API.routes.routes import api_bp
+from API.serialization.json_provider import FastJSONProvider
+from Core import Kernels
 import os
 
 
@@ -7,9 +9,14 @@ app = Flask(__name__,
            template_folder='API/web/templates',
            static_folder='API/web/static')
 
+# Encodage JSON rapide (orjson si installé) pour tous les jsonify, inf/nan écrits null
+app.json = FastJSONProvider(app)
 
 app.register_blueprint(api_bp)
 
+# Chargement des noyaux compilés (cache disque) avant la première requête
+Kernels.warm_up()
+
 
 @app.route('/')
 def index():
@@ -0,0 +1,284 @@
+"""
+Pricing en lot d'un book d'options (CSV, ou Parquet si pyarrow est installé).
+
+Les lignes sont lues par paquets, chaque paquet est évalué par un processus du pool
+(Black-Scholes vectorisé pour les européennes vanilles sans dividende, un arbre partagé
+par groupe sous-jacent/maturité/N pour les autres, comme Core.Portfolio) et les résultats
+sont écrits au fil de l'eau, dans l'ordre d'entrée. Au plus 2 paquets par processus
+sont en mémoire, quelle que soit la taille du fichier.
+
+Colonnes d'entrée : S0, K, r, sigma, et T (années) ou start_date + maturity_date (YYYY-MM-DD) ;
+optionnelles : id, option_type, option_style, payoff_params (objet JSON, ex: {"cap": 20}),
+dividend, ex_div_date, N.
+
+Usage :
+    python batch_pricer.py book.csv prices.csv --chunk-size 5000 --workers 4
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+import numpy as np
+from Core.BlackScholes import BlackScholes
+from Core.Market import Market
+from Core.Option import Option
+from Core.Portfolio import Position, compute_group_risk
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+
+OUTPUT_FIELDS = ['id', 'price', 'delta', 'gamma', 'theta', 'vega', 'rho', 'bs_price', 'model', 'error']
+
+# Schéma Parquet fixe : un paquet sans erreur (ou sans prix Black-Scholes) ne doit pas typer ses colonnes null
+TEXT_FIELDS = ('id', 'model', 'error')
+PARQUET_SCHEMA = pa.schema([
+    (field, pa.string() if field in TEXT_FIELDS else pa.float64()) for field in OUTPUT_FIELDS
+]) if PARQUET_AVAILABLE else None
+
+
+
+def read_rows(path, chunk_size):
+    """
+    Lit le fichier d'entrée par paquets de chunk_size lignes (dictionnaires colonne -> valeur).
+    """
+    if path.endswith('.parquet'):
+        if not PARQUET_AVAILABLE:
+            raise ValueError("La lecture Parquet nécessite pyarrow (pip install pyarrow)")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pylist()
+        return
+
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f)
+        while True:
+            rows = list(islice(reader, chunk_size))
+            if not rows:
+                return
+            yield rows
+
+
+
+class ResultWriter:
+    """
+    Écriture incrémentale des résultats en CSV, ou en Parquet (un groupe de lignes par paquet).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith('.parquet')
+        if self.parquet:
+            if not PARQUET_AVAILABLE:
+                raise ValueError("L'écriture Parquet nécessite pyarrow (pip install pyarrow)")
+            self.writer = None
+        else:
+            self.file = open(path, 'w', newline='')
+            self.writer = csv.DictWriter(self.file, fieldnames=OUTPUT_FIELDS)
+            self.writer.writeheader()
+
+
+
+    def write(self, results):
+        if self.parquet:
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.path, PARQUET_SCHEMA)
+            self.writer.write_table(pa.Table.from_pylist(results, schema=PARQUET_SCHEMA))
+        else:
+            self.writer.writerows(results)
+            self.file.flush()
+
+
+
+    def close(self):
+        if self.parquet:
+            if self.writer is not None:
+                self.writer.close()
+        else:
+            self.file.close()
+
+
+
+def _optional(row, name, default=None):
+    value = row.get(name)
+    return default if value is None or value == '' else value
+
+
+
+def parse_row(row, default_N):
+    """
+    Construit la position (marché, option, N) d'une ligne du book.
+
+    Raises:
+        ValueError: Si une colonne requise manque ou est invalide.
+    """
+    for name in ['S0', 'K', 'r', 'sigma']:
+        if _optional(row, name) is None:
+            raise ValueError(f"Colonne manquante: {name}")
+
+    ex_div_date = _optional(row, 'ex_div_date')
+    if isinstance(ex_div_date, str):
+        ex_div_date = datetime.strptime(ex_div_date, '%Y-%m-%d')
+
+    market = Market(S0=float(row['S0']), rate=float(row['r']), sigma=float(row['sigma']),
+                    dividend=float(_optional(row, 'dividend', 0.0)), ex_div_date=ex_div_date)
+
+    option_type = _optional(row, 'option_type', 'call')
+    if option_type not in Option.PAYOFFS:
+        raise ValueError(f"Type d'option invalide: {option_type}")
+    option_style = _optional(row, 'option_style', 'european')
+    if option_style not in ('european', 'american'):
+        raise ValueError(f"Style d'option invalide: {option_style}")
+
+    payoff_params = _optional(row, 'payoff_params')
+    if isinstance(payoff_params, str):
+        try:
+            payoff_params = json.loads(payoff_params)
+        except json.JSONDecodeError:
+            raise ValueError(f"payoff_params invalide (objet JSON attendu): {payoff_params}")
+    if payoff_params is not None and not isinstance(payoff_params, dict):
+        raise ValueError("payoff_params doit être un objet JSON")
+
+    T = _optional(row, 'T')
+    option = Option(K=float(row['K']), opt_type=option_type, style=option_style,
+                    T=float(T) if T is not None else None, payoff_params=payoff_params,
+                    start_date=_optional(row, 'start_date'), maturity_date=_optional(row, 'maturity_date'))
+
+    if market.S0 <= 0 or option.K <= 0 or market.sigma <= 0 or option.T <= 0:
+        raise ValueError("S0, K, sigma et T doivent être positifs")
+    return Position(1.0, market, option, int(float(_optional(row, 'N', default_N))))
+
+
+
+def _uses_black_scholes(position, model):
+    has_dividend = position.market.dividend and position.market.ex_div_date is not None
+    return (model == 'auto' and position.option.type in ('call', 'put')
+            and position.option.style == 'european' and not has_dividend)
+
+
+
+def price_chunk(rows, start_index, default_N, model):
+    """
+    Évalue un paquet de lignes : Black-Scholes vectorisé en un seul appel pour les
+    européennes vanilles, un arbre partagé par groupe (même sous-jacent, maturité et N)
+    pour les autres. Une ligne invalide produit une erreur sans interrompre le paquet.
+
+    Returns:
+        list: Un dictionnaire de résultats par ligne, dans l'ordre d'entrée.
+    """
+    results = [None] * len(rows)
+    analytic, groups = [], {}
+
+    for i, row in enumerate(rows):
+        # Identifiant toujours textuel (colonne id du fichier ou rang de la ligne)
+        row_id = str(_optional(row, 'id', start_index + i))
+        try:
+            position = parse_row(row, default_N)
+        except (ValueError, TypeError) as e:
+            results[i] = {'id': row_id, 'error': str(e)}
+            continue
+        position.position_id = row_id
+        if _uses_black_scholes(position, model):
+            analytic.append((i, position))
+        else:
+            groups.setdefault(position.group_key(), []).append((i, position))
+
+    if analytic:
+        arrays = [np.array([getattr(p.market, name) for _, p in analytic]) for name in ('S0', 'rate', 'sigma')]
+        S0, rate, sigma = arrays
+        K = np.array([p.option.K for _, p in analytic])
+        T = np.array([p.option.T for _, p in analytic])
+        is_call = np.array([p.option.type == 'call' for _, p in analytic])
+        prices = BlackScholes.batch_price(S0, K, T, rate, sigma, is_call)
+        greeks = BlackScholes.batch_greeks(S0, K, T, rate, sigma, is_call)
+        for k, (i, position) in enumerate(analytic):
+            results[i] = {'id': position.position_id, 'price': float(prices[k]), 'bs_price': float(prices[k]),
+                          'model': 'black_scholes', **{name: float(values[k]) for name, values in greeks.items()}}
+
+    for members in groups.values():
+        market, N = members[0][1].market, members[0][1].N
+        try:
+            group_results = compute_group_risk(market, [p.option for _, p in members], N)
+        except (ValueError, ZeroDivisionError, OverflowError) as e:
+            for i, position in members:
+                results[i] = {'id': position.position_id, 'error': str(e)}
+            continue
+        for (i, position), result in zip(members, group_results):
+            results[i] = {'id': position.position_id, 'model': 'tree', **result}
+
+    return [{field: result.get(field) for field in OUTPUT_FIELDS} for result in results]
+
+
+
+def run(input_path, output_path, chunk_size, workers, default_N, model):
+    """
+    Lit, évalue et écrit le book paquet par paquet, avec un nombre borné de paquets en cours.
+
+    Returns:
+        dict: Résumé (lignes, erreurs, durée, débit).
+    """
+    workers = workers or os.cpu_count() or 1
+    writer = ResultWriter(output_path)
+    start = time.perf_counter()
+    rows_done = errors = 0
+    pending = deque()
+
+    def flush_oldest():
+        nonlocal rows_done, errors
+        results = pending.popleft().result()
+        writer.write(results)
+        rows_done += len(results)
+        errors += sum(1 for result in results if result['error'])
+        elapsed = time.perf_counter() - start
+        print(f"\r{rows_done:>10} lignes | {errors} erreurs | {rows_done / elapsed:,.0f} lignes/s",
+              end='', file=sys.stderr, flush=True)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            start_index = 0
+            for rows in read_rows(input_path, chunk_size):
+                # Mémoire bornée : au plus 2 paquets par processus en attente d'écriture
+                while len(pending) >= 2 * workers:
+                    flush_oldest()
+                pending.append(executor.submit(price_chunk, rows, start_index, default_N, model))
+                start_index += len(rows)
+            while pending:
+                flush_oldest()
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    print(file=sys.stderr)
+    return {
+        'rows': rows_done,
+        'errors': errors,
+        'seconds': elapsed,
+        'rows_per_second': rows_done / elapsed if elapsed > 0 else math.inf
+    }
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pricing en lot d'un book d'options CSV/Parquet")
+    parser.add_argument('input', help="Fichier d'entrée (.csv ou .parquet)")
+    parser.add_argument('output', help="Fichier de sortie (.csv ou .parquet)")
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=None, help="Nombre de processus (défaut : nombre de CPU)")
+    parser.add_argument('--steps', type=int, default=200, help="N par défaut si la colonne N est absente")
+    parser.add_argument('--model', choices=['auto', 'tree'], default='auto',
+                        help="auto : Black-Scholes pour les européennes vanilles sans dividende, arbre sinon")
+    args = parser.parse_args()
+
+    summary = run(args.input, args.output, args.chunk_size, args.workers, args.steps, args.model)
+    print(f"✅ {summary['rows']} lignes évaluées ({summary['errors']} erreurs) en {summary['seconds']:.2f} s "
+          f"- {summary['rows_per_second']:,.0f} lignes/s")
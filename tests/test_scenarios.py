@@ -0,0 +1,46 @@
+from datetime import datetime
+import pytest
+from Core.Market import Market
+from Core.Option import Option
+from Core.Portfolio import Position
+from Core.RollingTree import RollingTree
+from Core.Scenarios import ScenarioGrid
+
+
+N = 200
+
+
+def _direct_pnl(market, option, spot_shift):
+    """
+    P&L d'un choc de spot obtenu en réévaluant l'option sur un arbre construit au spot choqué.
+    """
+    shocked = market.with_overrides(S0=market.S0 * (1 + spot_shift))
+    return RollingTree(shocked, option, N).get_option_price() - RollingTree(market, option, N).get_option_price()
+
+
+@pytest.mark.parametrize('opt_type, K, payoff_params', [
+    ('digital_call', 100, {'cash': 10}),
+    ('capped_call', 100, {'cap': 5}),
+    ('power_call', 10000, {'power': 2.0}),
+    ('gap_call', 100, {'trigger': 110}),
+    ('put', 100, {}),
+])
+def test_grid_matches_direct_reprice(opt_type, K, payoff_params):
+    market = Market(S0=100, rate=0.05, sigma=0.2)
+    option = Option(K, opt_type, 'american', T=1.0, payoff_params=payoff_params)
+    spot_shifts = [-0.2, 0.2]
+
+    grid = ScenarioGrid([Position(1, market, option, N)], spot_shifts, [0.0]).compute()
+
+    for s, spot_shift in enumerate(spot_shifts):
+        assert grid['pnl'][0][s] == pytest.approx(_direct_pnl(market, option, spot_shift), abs=1e-9)
+
+
+def test_time_shift_keeps_dividend():
+    market = Market(S0=100, rate=0.05, sigma=0.2, dividend=5, ex_div_date=datetime(2025, 6, 1))
+    option = Option(100, 'put', 'american', start_date='2025-01-01', maturity_date='2026-01-01')
+
+    grid = ScenarioGrid([Position(1, market, option, N)], [0.0], [0.0], time_shift=1).compute()
+
+    # Un jour de theta, sans perte du dividende
+    assert abs(grid['pnl'][0][0]) < 0.05